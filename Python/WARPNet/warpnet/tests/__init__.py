@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""
+------------------------------------------------------------------------------
+WARPNet Tests
+------------------------------------------------------------------------------
+Authors:   Chris Hunter (chunter [at] mangocomm.com)
+           Patrick Murphy (murphpo [at] mangocomm.com)
+           Erik Welsh (welsh [at] mangocomm.com)
+License:   Copyright 2014, Mango Communications. All rights reserved.
+           Distributed under the WARP license (http://warpproject.org/license)
+------------------------------------------------------------------------------
+MODIFICATION HISTORY:
+
+Ver   Who  Date     Changes
+----- ---- -------- -----------------------------------------------------
+1.00a ejw  10/17/26 Initial release
+
+------------------------------------------------------------------------------
+
+This package contains the tests of the WARPNet framework.  The tests do not
+need any hardware:  they run against emulated nodes (see wn_emulator) on
+localhost with a fixed random seed.
+
+To run the tests:
+    python -m pytest warpnet/tests
+
+"""
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+------------------------------------------------------------------------------
+WARPNet Node Cache Tests
+------------------------------------------------------------------------------
+Authors:   Chris Hunter (chunter [at] mangocomm.com)
+           Patrick Murphy (murphpo [at] mangocomm.com)
+           Erik Welsh (welsh [at] mangocomm.com)
+License:   Copyright 2014, Mango Communications. All rights reserved.
+           Distributed under the WARP license (http://warpproject.org/license)
+------------------------------------------------------------------------------
+MODIFICATION HISTORY:
+
+Ver   Who  Date     Changes
+----- ---- -------- -----------------------------------------------------
+1.00a ejw  10/17/26 Initial release
+
+------------------------------------------------------------------------------
+
+Tests of the node descriptor cache of wn_config, alone and with the node
+initialization of emulated nodes.
+
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from warpnet import wn_util
+from warpnet import wn_config
+from warpnet import wn_emulator
+
+
+class TestWnNodeCache(unittest.TestCase):
+    """Tests of WnNodeCache."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.filename  = os.path.join(self.directory, 'node_cache.ini')
+
+
+    def test_default_file(self):
+        config_dir = os.path.dirname(wn_config.WnConfiguration().config_file)
+        node_cache = wn_config.WnNodeCache()
+
+        self.assertEqual(node_cache.config_file, os.path.join(config_dir, 'wn_node_cache.ini'))
+        self.assertEqual(wn_config.WnNodeCache(self.filename).config_file, self.filename)
+
+
+    def test_descriptors(self):
+        node_cache = wn_config.WnNodeCache(self.filename)
+        descriptor = {'fpga_dna' : 12345, 'max_payload' : 1000, 'ip_address' : '10.0.0.1'}
+
+        self.assertIsNone(node_cache.get_descriptor(1))
+
+        node_cache.set_descriptor(1, descriptor)
+        node_cache.set_descriptor(2, descriptor)
+        node_cache.set_descriptor(2, None)
+        node_cache.save_config()
+
+        # Integer values are read back as int
+        node_cache = wn_config.WnNodeCache(self.filename)
+
+        self.assertEqual(node_cache.get_descriptor(1), descriptor)
+        self.assertIsNone(node_cache.get_descriptor(2))
+        self.assertFalse(os.path.exists(self.filename + ".tmp"))
+
+
+    def test_invalid_file(self):
+        with open(self.filename, 'w') as fh:
+            fh.write("not a config file\n")
+
+        node_cache = wn_config.WnNodeCache(self.filename)
+        self.assertIsNone(node_cache.get_descriptor(1))
+
+
+    def test_init_nodes(self):
+        emulator = wn_emulator.WnEmulator(seed=1)
+        emulator.add_nodes(2)
+        emulator.start()
+        self.addCleanup(emulator.stop)
+
+        node_cache = wn_config.WnNodeCache(self.filename)
+
+        def init_nodes():
+            nodes = wn_util.wn_init_nodes(emulator.get_nodes_config(), node_cache=node_cache)
+            nodes.sort(key=lambda node: node.serial_number)
+            return nodes
+
+        nodes = init_nodes()
+
+        for node in nodes:
+            self.assertEqual(node_cache.get_descriptor(node.serial_number),
+                             node._get_cache_descriptor(False))
+
+        num_cmds = [node.stats.get_totals()['num_cmds'] for node in nodes]
+
+        # Nodes that match their descriptors skip the ping and payload test
+        nodes = init_nodes()
+
+        for (node, node_num_cmds) in zip(nodes, num_cmds):
+            self.assertLess(node.stats.get_totals()['num_cmds'], node_num_cmds)
+
+        # A node that does not match its descriptor is configured again
+        descriptor = node_cache.get_descriptor(nodes[0].serial_number)
+        descriptor['fpga_dna'] += 1
+        node_cache.set_descriptor(nodes[0].serial_number, descriptor)
+
+        nodes = init_nodes()
+
+        self.assertEqual(node_cache.get_descriptor(nodes[0].serial_number),
+                         nodes[0]._get_cache_descriptor(False))
+        self.assertEqual(node_cache.get_descriptor(nodes[0].serial_number)['fpga_dna'],
+                         descriptor['fpga_dna'] - 1)
+
+# End Class
+
+
+if __name__ == '__main__':
+    unittest.main()
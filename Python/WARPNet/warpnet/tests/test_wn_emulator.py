@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+------------------------------------------------------------------------------
+WARPNet Emulator Tests
+------------------------------------------------------------------------------
+Authors:   Chris Hunter (chunter [at] mangocomm.com)
+           Patrick Murphy (murphpo [at] mangocomm.com)
+           Erik Welsh (welsh [at] mangocomm.com)
+License:   Copyright 2014, Mango Communications. All rights reserved.
+           Distributed under the WARP license (http://warpproject.org/license)
+------------------------------------------------------------------------------
+MODIFICATION HISTORY:
+
+Ver   Who  Date     Changes
+----- ---- -------- -----------------------------------------------------
+1.00a ejw  10/17/26 Initial release
+
+------------------------------------------------------------------------------
+
+Tests of the emulated nodes of wn_emulator, with and without packet loss,
+latency and reordering.
+
+"""
+
+import unittest
+
+from warpnet import wn_cmds
+from warpnet import wn_util
+from warpnet import wn_message
+from warpnet import wn_emulator
+from warpnet import wn_exception as ex
+
+
+class TestWnEmulator(unittest.TestCase):
+    """Tests of WnEmulator."""
+
+    def start_emulator(self, num_nodes, **kwargs):
+        emulator = wn_emulator.WnEmulator(seed=1, **kwargs)
+        emulator.add_nodes(num_nodes)
+        emulator.start()
+        self.addCleanup(emulator.stop)
+        return emulator
+
+
+    def test_init_nodes(self):
+        emulator = self.start_emulator(4)
+        nodes    = wn_util.wn_init_nodes(emulator.get_nodes_config())
+
+        self.assertEqual(len(nodes), 4)
+        self.assertEqual(sorted(node.serial_number for node in nodes),
+                         [node.serial_number for node in emulator.nodes])
+        self.assertEqual(emulator.num_dropped_pkts, 0)
+
+
+    def test_init_nodes_with_loss_and_reorder(self):
+        emulator = self.start_emulator(4, loss=0.05, latency=0.0005, reorder=0.1)
+        nodes    = wn_util.wn_init_nodes(emulator.get_nodes_config())
+
+        self.assertEqual(len(nodes), 4)
+
+        for node in nodes:
+            for _ in range(50):
+                node.send_cmd(wn_cmds.WnCmdPing(), max_attempts=10)
+
+        num_retransmissions = sum(node.stats.get_totals()['num_retransmissions']
+                                  for node in nodes)
+
+        self.assertGreater(emulator.num_dropped_pkts, 0)
+        self.assertGreater(num_retransmissions, 0)
+
+
+    def test_payload_size(self):
+        emulator = self.start_emulator(1)
+        node     = wn_util.wn_init_nodes(emulator.get_nodes_config())[0]
+
+        self.assertEqual(node.send_cmd(wn_cmds.WnCmdTestPayloadSize(100)), 400)
+
+
+    def test_max_payload(self):
+        emulator = wn_emulator.WnEmulator(seed=1)
+        emulated = emulator.add_nodes(1, mtu=1000)[0]
+        emulator.start()
+        self.addCleanup(emulator.stop)
+
+        node = wn_util.wn_init_nodes(emulator.get_nodes_config())[0]
+
+        # Largest test payload (in 32 bit words) in a packet of the MTU
+        overhead = 2 + node.transport.hdr.sizeof() + wn_message.WnCmd().sizeof()
+        expected = 4 * ((emulated.get_max_packet_size() - overhead) // 4)
+
+        node.transport.test_payload_size(node, refresh=True)
+        self.assertEqual(node.transport.get_max_payload(), expected)
+
+        # Lost tests or responses do not shrink the max_payload
+        emulator.loss = 0.1
+
+        for _ in range(3):
+            node.transport.test_payload_size(node, refresh=True)
+            self.assertEqual(node.transport.get_max_payload(), expected)
+
+
+    def test_dropped_pkts(self):
+        emulator = self.start_emulator(1)
+        node     = wn_util.wn_init_nodes(emulator.get_nodes_config())[0]
+        emulated = emulator.nodes[0]
+        sock     = emulator._node_socks[emulated.serial_number]
+        addr     = sock.getsockname()
+
+        # Every lost packet is counted once
+        emulator.loss = 1.0
+        num_dropped_pkts = emulator.num_dropped_pkts
+
+        with self.assertRaises(ex.WnTransportError):
+            node.send_cmd(wn_cmds.WnCmdPing(), max_attempts=3)
+
+        self.assertEqual(emulator.num_dropped_pkts - num_dropped_pkts, 3)
+
+        emulator._send(emulated, sock, b'\x00' * 100, addr)
+        self.assertEqual(emulator.num_dropped_pkts - num_dropped_pkts, 4)
+
+        # Packets larger than the MTU are dropped
+        emulator.loss = 0.0
+        emulator._send(emulated, sock, b'\x00' * (emulated.get_max_packet_size() + 1), addr)
+        self.assertEqual(emulator.num_dropped_pkts - num_dropped_pkts, 5)
+
+# End Class
+
+
+if __name__ == '__main__':
+    unittest.main()
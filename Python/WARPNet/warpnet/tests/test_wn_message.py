@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+------------------------------------------------------------------------------
+WARPNet Message Tests
+------------------------------------------------------------------------------
+Authors:   Chris Hunter (chunter [at] mangocomm.com)
+           Patrick Murphy (murphpo [at] mangocomm.com)
+           Erik Welsh (welsh [at] mangocomm.com)
+License:   Copyright 2014, Mango Communications. All rights reserved.
+           Distributed under the WARP license (http://warpproject.org/license)
+------------------------------------------------------------------------------
+MODIFICATION HISTORY:
+
+Ver   Who  Date     Changes
+----- ---- -------- -----------------------------------------------------
+1.00a ejw  10/17/26 Initial release
+
+------------------------------------------------------------------------------
+
+Tests of the WARPNet buffers of wn_message and the commands of wn_cmds.
+
+"""
+
+import struct
+import inspect
+import unittest
+
+from warpnet import wn_cmds
+from warpnet import wn_message
+
+
+def get_cmd_classes(module):
+    """Return the command classes defined in module."""
+    return [cls for (_, cls) in inspect.getmembers(module, inspect.isclass)
+            if issubclass(cls, wn_message.WnCmdMessage) and (cls.__module__ == module.__name__)]
+
+# End of get_cmd_classes()
+
+
+def buffer_data(data, start_byte=0, buffer_id=1, flags=0):
+    """Return data with the wire format of a WnBuffer."""
+    return struct.pack('!I 2H 4I', 0, 16, 4, buffer_id, flags, start_byte, len(data)) + data
+
+# End of buffer_data()
+
+
+class TestWnBuffer(unittest.TestCase):
+    """Tests of the byte ranges of WnBuffer."""
+
+    def test_missing_byte_ranges(self):
+        resp = wn_message.WnBuffer(1, 0, 100)
+        self.assertEqual(resp.get_missing_byte_ranges(), [(0, 100)])
+
+        resp.add_data_to_buffer(buffer_data(b'\x01' * 10, 20))
+        resp.add_data_to_buffer(buffer_data(b'\x02' * 10, 50))
+
+        self.assertEqual(resp.num_bytes, 20)
+        self.assertEqual(resp.get_missing_byte_ranges(), [(0, 20), (30, 20), (60, 40)])
+
+        # Part of the buffer
+        self.assertEqual(resp.get_missing_byte_ranges(25, 30), [(30, 20)])
+        self.assertEqual(resp.get_missing_byte_ranges(20, 10), [])
+        self.assertEqual(resp.get_missing_byte_ranges(55), [(60, 40)])
+        self.assertEqual(resp.get_missing_byte_ranges(90, 50), [(90, 10)])
+
+
+    def test_overlapping_data(self):
+        resp = wn_message.WnBuffer(1, 0, 100)
+
+        resp.add_data_to_buffer(buffer_data(b'\x01' * 40, 0))
+        resp.add_data_to_buffer(buffer_data(b'\x01' * 40, 20))
+        resp.add_data_to_buffer(buffer_data(b'\x01' * 40, 20))
+
+        self.assertEqual(resp.num_bytes, 60)
+        self.assertEqual(resp.byte_ranges, [(0, 60)])
+        self.assertFalse(resp.is_buffer_complete())
+
+        # Adjacent ranges are merged
+        resp.add_data_to_buffer(buffer_data(b'\x01' * 40, 60))
+
+        self.assertEqual(resp.num_bytes, 100)
+        self.assertEqual(resp.byte_ranges, [(0, 100)])
+        self.assertTrue(resp.is_buffer_complete())
+
+
+    def test_offset(self):
+        data = bytes(bytearray(range(100)))
+        resp = wn_message.WnBuffer(1, 0, 100)
+
+        # Responses to a request of the range [40, 100) of the buffer
+        resp.add_data_to_buffer(buffer_data(data[70:], 30), offset=40)
+        resp.add_data_to_buffer(buffer_data(data[40:70], 0), offset=40)
+
+        self.assertEqual(resp.get_missing_byte_ranges(), [(0, 40)])
+        self.assertEqual(bytes(resp.get_bytes()[40:]), data[40:])
+
+        resp.add_data_to_buffer(buffer_data(data[:40], 0))
+
+        self.assertTrue(resp.is_buffer_complete())
+        self.assertEqual(bytes(resp.get_bytes()), data)
+
+
+    def test_other_buffer(self):
+        resp = wn_message.WnBuffer(1, 0, 100)
+
+        resp.add_data_to_buffer(buffer_data(b'\x01' * 10, 0, buffer_id=2))
+        resp.add_data_to_buffer(buffer_data(b'\x01' * 10, 0)[:-1])
+
+        self.assertEqual(resp.num_bytes, 0)
+
+# End Class
+
+
+class TestWnCmds(unittest.TestCase):
+    """Tests of the commands of wn_cmds."""
+
+    def assert_slots(self, cls):
+        for base in cls.__mro__[:-1]:
+            self.assertIn('__slots__', vars(base), base.__name__)
+
+
+    def test_slots(self):
+        classes = get_cmd_classes(wn_cmds)
+        self.assertGreater(len(classes), 0)
+
+        for cls in classes:
+            self.assert_slots(cls)
+
+        for cmd in [wn_cmds.WnCmdPing(), wn_cmds.WnCmdIdentify(1),
+                    wn_cmds.WnCmdTestPayloadSize(10), wn_cmds.WnCmdAddNodeGrpId(1)]:
+            self.assertFalse(hasattr(cmd, '__dict__'), cmd.__class__.__name__)
+
+# End Class
+
+
+if __name__ == '__main__':
+    unittest.main()
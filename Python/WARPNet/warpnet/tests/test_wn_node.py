@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+------------------------------------------------------------------------------
+WARPNet Node Tests
+------------------------------------------------------------------------------
+Authors:   Chris Hunter (chunter [at] mangocomm.com)
+           Patrick Murphy (murphpo [at] mangocomm.com)
+           Erik Welsh (welsh [at] mangocomm.com)
+License:   Copyright 2014, Mango Communications. All rights reserved.
+           Distributed under the WARP license (http://warpproject.org/license)
+------------------------------------------------------------------------------
+MODIFICATION HISTORY:
+
+Ver   Who  Date     Changes
+----- ---- -------- -----------------------------------------------------
+1.00a ejw  10/17/26 Initial release
+
+------------------------------------------------------------------------------
+
+Tests of the commands of WnNode against emulated nodes (see wn_emulator)
+with packet loss and reordering.
+
+"""
+
+import unittest
+
+from warpnet import wn_cmds
+from warpnet import wn_util
+from warpnet import wn_emulator
+
+
+class TestWnNode(unittest.TestCase):
+    """Tests of WnNode over a lossy network that reorders packets."""
+
+    def setUp(self):
+        self.emulator = wn_emulator.WnEmulator(seed=1)
+        self.emulator.add_nodes(1)
+        self.emulator.start()
+        self.addCleanup(self.emulator.stop)
+
+        self.node = wn_util.wn_init_nodes(self.emulator.get_nodes_config())[0]
+
+        self.emulator.loss    = 0.05
+        self.emulator.latency = 0.0005
+        self.emulator.reorder = 0.1
+
+
+    def get_cmd_stats(self, cmd):
+        return self.node.stats.get_cmd_stats(cmd.command, cmd.__class__.__name__)
+
+
+    def test_send_cmd_pipelined(self):
+        cmds         = [wn_cmds.WnCmdTestPayloadSize(1 + (i % 50)) for i in range(500)]
+        cmd_stats    = self.get_cmd_stats(cmds[0])
+        num_cmds     = cmd_stats.num_cmds
+        num_failures = cmd_stats.num_failures
+
+        resps = self.node.send_cmd_pipelined(cmds, max_attempts=10)
+
+        self.assertEqual(resps, [4 * (1 + (i % 50)) for i in range(500)])
+        self.assertEqual(cmd_stats.num_cmds - num_cmds, 500)
+        self.assertEqual(cmd_stats.num_failures, num_failures)
+        self.assertGreater(cmd_stats.num_retransmissions, 0)
+
+
+    def test_send_cmd_pipelined_window(self):
+        cmds = [wn_cmds.WnCmdTestPayloadSize(1 + (i % 10)) for i in range(100)]
+
+        resps = self.node.send_cmd_pipelined(cmds, window=4, max_attempts=10)
+
+        self.assertEqual(resps, [4 * (1 + (i % 10)) for i in range(100)])
+
+
+    def test_send_cmds(self):
+        cmds = []
+        for i in range(1000):
+            cmds.append(wn_cmds.WnCmdTestPayloadSize(1 + (i % 20)))
+            cmds.append(wn_cmds.WnCmdPing())
+
+        cmd_stats   = self.get_cmd_stats(cmds[1])
+        num_cmds    = cmd_stats.num_cmds
+        num_rx_pkts = self.emulator.num_rx_pkts
+
+        resps = self.node.send_cmds(cmds, max_attempts=10)
+
+        self.assertEqual(resps[0::2], [4 * (1 + (i % 20)) for i in range(1000)])
+        self.assertEqual(resps[1::2], [None] * 1000)
+
+        # The commands are batched into far fewer packets than commands
+        self.assertLess(self.emulator.num_rx_pkts - num_rx_pkts, len(cmds) // 10)
+
+        self.assertEqual(cmd_stats.num_cmds - num_cmds, 1000)
+        self.assertEqual(cmd_stats.num_failures, 0)
+
+# End Class
+
+
+if __name__ == '__main__':
+    unittest.main()
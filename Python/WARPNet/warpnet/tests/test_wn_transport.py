@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+------------------------------------------------------------------------------
+WARPNet Transport Tests
+------------------------------------------------------------------------------
+Authors:   Chris Hunter (chunter [at] mangocomm.com)
+           Patrick Murphy (murphpo [at] mangocomm.com)
+           Erik Welsh (welsh [at] mangocomm.com)
+License:   Copyright 2014, Mango Communications. All rights reserved.
+           Distributed under the WARP license (http://warpproject.org/license)
+------------------------------------------------------------------------------
+MODIFICATION HISTORY:
+
+Ver   Who  Date     Changes
+----- ---- -------- -----------------------------------------------------
+1.00a ejw  10/17/26 Initial release
+
+------------------------------------------------------------------------------
+
+Tests of the round trip time estimator and the receive timeouts of the 
+WARPNet transports.
+
+"""
+
+import unittest
+
+from warpnet import wn_transport as tp
+from warpnet import wn_transport_eth_udp_py
+
+
+class TestWnRttEstimator(unittest.TestCase):
+    """Tests of WnRttEstimator."""
+
+    def test_update(self):
+        rtt = tp.WnRttEstimator(initial_rto=1.0)
+
+        self.assertIsNone(rtt.srtt)
+        self.assertEqual(rtt.rto, 1.0)
+
+        # First sample:  SRTT = RTT, RTTVAR = RTT / 2
+        rtt.update(0.1)
+
+        self.assertAlmostEqual(rtt.srtt, 0.1)
+        self.assertAlmostEqual(rtt.rttvar, 0.05)
+        self.assertAlmostEqual(rtt.rto, 0.1 + 4 * 0.05)
+
+        # RTTVAR is updated with the previous SRTT
+        rtt.update(0.2)
+
+        self.assertAlmostEqual(rtt.rttvar, 0.75 * 0.05 + 0.25 * 0.1)
+        self.assertAlmostEqual(rtt.srtt, 0.875 * 0.1 + 0.125 * 0.2)
+        self.assertAlmostEqual(rtt.rto, rtt.srtt + 4 * rtt.rttvar)
+
+        # Constant samples converge to the RTT
+        for _ in range(200):
+            rtt.update(0.05)
+
+        self.assertAlmostEqual(rtt.srtt, 0.05)
+        self.assertAlmostEqual(rtt.rttvar, 0.0)
+        self.assertAlmostEqual(rtt.rto, 0.05)
+
+
+    def test_rto_bounds(self):
+        rtt = tp.WnRttEstimator()
+
+        rtt.update(0.0001)
+        self.assertEqual(rtt.rto, tp.RTT_MIN_RTO)
+
+        rtt = tp.WnRttEstimator()
+
+        rtt.update(10.0)
+        self.assertEqual(rtt.rto, tp.RTT_MAX_RTO)
+
+
+    def test_backoff(self):
+        rtt = tp.WnRttEstimator()
+        rtt.update(0.1)
+        base_rto = rtt.rto
+
+        rtt.backoff()
+        rtt.backoff()
+        self.assertAlmostEqual(rtt.rto, 4 * base_rto)
+
+        # The backoff is bounded by the max RTO
+        for _ in range(10):
+            rtt.backoff()
+        self.assertEqual(rtt.rto, tp.RTT_MAX_RTO)
+
+        rtt.clear_backoff()
+        self.assertEqual(rtt.rto, base_rto)
+
+        # A new sample also clears the backoff
+        rtt.backoff()
+        rtt.update(0.1)
+        self.assertLess(rtt.rto, 2 * base_rto)
+
+
+    def test_rx_timeout(self):
+        transport = wn_transport_eth_udp_py.WnTransportEthUdpPy()
+        transport.rtt.update(0.01)
+
+        self.assertEqual(transport.get_rx_timeout(), transport.rtt.rto)
+
+        # The last attempt waits at least the transport timeout
+        self.assertEqual(transport.get_rx_timeout(last_attempt=True), transport.timeout)
+
+        transport.timeout = 0.001
+        self.assertEqual(transport.get_rx_timeout(last_attempt=True), transport.rtt.rto)
+
+# End Class
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+------------------------------------------------------------------------------
+WARPNet Unicast Transport Tests
+------------------------------------------------------------------------------
+Authors:   Chris Hunter (chunter [at] mangocomm.com)
+           Patrick Murphy (murphpo [at] mangocomm.com)
+           Erik Welsh (welsh [at] mangocomm.com)
+License:   Copyright 2014, Mango Communications. All rights reserved.
+           Distributed under the WARP license (http://warpproject.org/license)
+------------------------------------------------------------------------------
+MODIFICATION HISTORY:
+
+Ver   Who  Date     Changes
+----- ---- -------- -----------------------------------------------------
+1.00a ejw  10/17/26 Initial release
+
+------------------------------------------------------------------------------
+
+Tests of the receive methods of WnTransportEthUdpPy against a plain UDP
+socket that sends hand crafted packets.
+
+"""
+
+import socket
+import struct
+import unittest
+
+from warpnet import wn_transport_eth_udp_py
+
+
+HOST_ID = 250
+NODE_ID = 1
+
+
+class TestWnTransportEthUdpPy(unittest.TestCase):
+    """Tests of the receive methods of WnTransportEthUdpPy."""
+
+    def setUp(self):
+        self.peer = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.peer.bind(('127.0.0.1', 0))
+        self.peer.settimeout(1)
+        self.addCleanup(self.peer.close)
+
+        self.transport = wn_transport_eth_udp_py.WnTransportEthUdpPy()
+        self.transport.wn_open('127.0.0.1', self.peer.getsockname()[1])
+        self.transport.hdr.set_src_id(HOST_ID)
+        self.transport.hdr.set_dest_id(NODE_ID)
+        self.addCleanup(self.transport.wn_close)
+
+        # The first packet binds the transport socket to its address
+        self.transport.send(b'\x00' * 4)
+        (_, self.addr) = self.peer.recvfrom(2048)
+
+
+    def reply(self, seq_num, payload=b'', src_id=NODE_ID):
+        hdr = struct.pack('!2H 2B 3H', HOST_ID, src_id, 0, 0, len(payload), seq_num, 0)
+        self.peer.sendto(b'\x00\x00' + hdr + payload, self.addr)
+
+
+    def test_receive_batch_pipelined(self):
+        self.reply(3, b'\x05\x06\x07\x08', src_id=NODE_ID + 1)
+        self.reply(9)
+        self.reply(1, b'\x01\x02\x03\x04')
+        self.reply(2)
+
+        replies = []
+        while len(replies) < 2:
+            replies.extend([(seq_num, bytes(reply)) for (seq_num, reply)
+                            in self.transport.receive_batch_pipelined([1, 2, 3], timeout=1)])
+
+        # A header without payload is a reply; a reply from another node or 
+        #   for another sequence number is a mismatch
+        self.assertEqual(sorted(replies), [(1, b'\x01\x02\x03\x04'), (2, b'')])
+        self.assertEqual(self.transport.hdr.num_mismatches, 2)
+
+
+    def test_short_datagrams(self):
+        self.peer.sendto(b'\x00\x00' + b'\x00' * 4, self.addr)
+        self.reply(self.transport.hdr.seq_num, b'\x01\x02\x03\x04')
+
+        self.assertEqual(bytes(self.transport.receive(timeout=1)), b'\x01\x02\x03\x04')
+
+        self.peer.sendto(b'\x00', self.addr)
+        self.reply(5)
+
+        self.assertEqual([(seq_num, bytes(reply)) for (seq_num, reply)
+                          in self.transport.receive_batch_pipelined([5], timeout=1)],
+                         [(5, b'')])
+
+# End Class
+
+
+if __name__ == '__main__':
+    unittest.main()
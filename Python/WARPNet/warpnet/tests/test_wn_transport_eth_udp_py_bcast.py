@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+------------------------------------------------------------------------------
+WARPNet Broadcast Transport Tests
+------------------------------------------------------------------------------
+Authors:   Chris Hunter (chunter [at] mangocomm.com)
+           Patrick Murphy (murphpo [at] mangocomm.com)
+           Erik Welsh (welsh [at] mangocomm.com)
+License:   Copyright 2014, Mango Communications. All rights reserved.
+           Distributed under the WARP license (http://warpproject.org/license)
+------------------------------------------------------------------------------
+MODIFICATION HISTORY:
+
+Ver   Who  Date     Changes
+----- ---- -------- -----------------------------------------------------
+1.00a ejw  10/17/26 Initial release
+
+------------------------------------------------------------------------------
+
+Tests of broadcast commands with and without acknowledgements (see 
+wn_util.wn_send_cmd_bcast()) to emulated nodes (see wn_emulator) with packet
+loss and reordering.
+
+"""
+
+import unittest
+
+from warpnet import wn_cmds
+from warpnet import wn_util
+from warpnet import wn_emulator
+from warpnet import wn_exception as ex
+
+
+NUM_NODES = 8
+
+
+class TestWnTransportEthUdpPyBcast(unittest.TestCase):
+    """Tests of wn_send_cmd_bcast()."""
+
+    def setUp(self):
+        self.emulator = wn_emulator.WnEmulator(seed=4)
+        self.emulator.add_nodes(NUM_NODES)
+        self.emulator.start()
+        self.addCleanup(self.emulator.stop)
+
+        self.nodes = wn_util.wn_init_nodes(self.emulator.get_nodes_config())
+        self.nodes.sort(key=lambda node: node.serial_number)
+
+        self.assertEqual(len(self.nodes), NUM_NODES)
+
+
+    def count_cmds(self, command):
+        """Count the commands processed by each emulated node.  Returns the 
+        list of counts (in the order of the emulated nodes)."""
+        counts = [0] * len(self.emulator.nodes)
+
+        for (index, emulated) in enumerate(self.emulator.nodes):
+            handler = emulated.cmd_handlers[command]
+
+            def count_cmd(args, index=index, handler=handler):
+                counts[index] += 1
+                return handler(args)
+
+            emulated.cmd_handlers[command] = count_cmd
+
+        return counts
+
+
+    def test_bcast(self):
+        results = wn_util.wn_send_cmd_bcast(self.nodes, wn_cmds.WnCmdPing())
+
+        self.assertEqual([result['serial_number'] for result in results],
+                         [node.serial_number for node in self.nodes])
+        self.assertEqual([result['bcast'] for result in results], [True] * NUM_NODES)
+        self.assertEqual([result['error'] for result in results], [None] * NUM_NODES)
+
+
+    def test_bcast_no_ack(self):
+        # Nodes are initialized with the capabilities of the emulated nodes
+        self.assertEqual([node.transport.bcast_ack_support for node in self.nodes],
+                         [True] * NUM_NODES)
+
+        self.emulator.nodes[-1].bcast_ack_support = False
+
+        nodes = wn_util.wn_init_nodes(self.emulator.get_nodes_config())
+        nodes.sort(key=lambda node: node.serial_number)
+
+        self.assertEqual([node.transport.bcast_ack_support for node in nodes],
+                         [True] * (NUM_NODES - 1) + [False])
+
+        cmd    = wn_cmds.WnCmdTestPayloadSize(10)
+        counts = self.count_cmds(cmd.command)
+
+        # Without acknowledgements from every node, the command is sent in
+        #   one plain broadcast and is not sent again by unicast
+        results = wn_util.wn_send_cmd_bcast(nodes, cmd, timeout=0.2)
+
+        self.assertEqual([result['bcast'] for result in results], [False] * NUM_NODES)
+        self.assertEqual([result['response'] for result in results], [None] * NUM_NODES)
+        self.assertEqual([result['error'] for result in results], [None] * NUM_NODES)
+
+        # Wait for the emulator to process the broadcast
+        for node in nodes:
+            node.send_cmd(wn_cmds.WnCmdPing())
+
+        self.assertEqual(counts, [1] * NUM_NODES)
+
+
+    def test_bcast_loss(self):
+        self.emulator.loss    = 0.3
+        self.emulator.latency = 0.0005
+        self.emulator.reorder = 0.1
+
+        results = wn_util.wn_send_cmd_bcast(self.nodes, wn_cmds.WnCmdTestPayloadSize(10),
+                                            max_attempts=20)
+
+        # Nodes that miss the broadcast (or whose response is lost) are 
+        #   sent the command again by unicast
+        self.assertIn(False, [result['bcast'] for result in results])
+        self.assertEqual([result['error'] for result in results], [None] * NUM_NODES)
+        self.assertEqual([result['response'] for result in results], [40] * NUM_NODES)
+
+
+    def test_bcast_group(self):
+        group_nodes = self.nodes[:5]
+
+        for node in group_nodes:
+            node.transport.add_node_group_id(node, 7)
+
+        # Without node group filtering by the nodes, the broadcast is refused
+        with self.assertRaises(ex.WnTransportError):
+            wn_util.wn_send_cmd_bcast(self.nodes, wn_cmds.WnCmdPing(), group_id=7)
+
+        self.nodes[0].transport_bcast.group_id_support = True
+
+        results = wn_util.wn_send_cmd_bcast(self.nodes, wn_cmds.WnCmdPing(), group_id=7,
+                                            timeout=0.2)
+
+        self.assertEqual([result['bcast'] for result in results],
+                         [True] * len(group_nodes) + [False] * (NUM_NODES - len(group_nodes)))
+        self.assertEqual([result['error'] for result in results], [None] * NUM_NODES)
+
+# End Class
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+------------------------------------------------------------------------------
+WARPNet Shared Transport Tests
+------------------------------------------------------------------------------
+Authors:   Chris Hunter (chunter [at] mangocomm.com)
+           Patrick Murphy (murphpo [at] mangocomm.com)
+           Erik Welsh (welsh [at] mangocomm.com)
+License:   Copyright 2014, Mango Communications. All rights reserved.
+           Distributed under the WARP license (http://warpproject.org/license)
+------------------------------------------------------------------------------
+MODIFICATION HISTORY:
+
+Ver   Who  Date     Changes
+----- ---- -------- -----------------------------------------------------
+1.00a ejw  10/17/26 Initial release
+
+------------------------------------------------------------------------------
+
+Tests of the demultiplexing of the responses of many emulated nodes (see
+wn_emulator) that share one socket (see wn_transport_eth_udp_py_hub) with
+packet loss and reordering.
+
+"""
+
+import threading
+import unittest
+from unittest import mock
+
+from warpnet import wn_cmds
+from warpnet import wn_util
+from warpnet import wn_config
+from warpnet import wn_emulator
+from warpnet import wn_transport_eth_udp_py_hub
+
+
+NUM_NODES = 4
+
+
+class TestWnTransportEthUdpPyHub(unittest.TestCase):
+    """Tests of nodes using the 'python_shared' transport."""
+
+    def setUp(self):
+        self.emulator = wn_emulator.WnEmulator(seed=3)
+        self.emulator.add_nodes(NUM_NODES)
+        self.emulator.start()
+        self.addCleanup(self.emulator.stop)
+
+        get_param = wn_config.WnConfiguration.get_param
+
+        def get_shared_param(config, section, parameter):
+            if (section == 'network') and (parameter == 'transport_type'):
+                return 'python_shared'
+            return get_param(config, section, parameter)
+
+        with mock.patch.object(wn_config.WnConfiguration, 'get_param', get_shared_param):
+            self.nodes = wn_util.wn_init_nodes(self.emulator.get_nodes_config())
+
+        self.assertEqual(len(self.nodes), NUM_NODES)
+
+        self.emulator.loss    = 0.05
+        self.emulator.latency = 0.0005
+        self.emulator.reorder = 0.1
+
+
+    def run_nodes(self, function):
+        """Call function(index, node) for each node in its own thread and
+        return the list of results (or raised exceptions)."""
+        results = [None] * len(self.nodes)
+
+        def run(index, node):
+            try:
+                results[index] = function(index, node)
+            except Exception as err:
+                results[index] = err
+
+        threads = [threading.Thread(target=run, args=(index, node))
+                   for (index, node) in enumerate(self.nodes)]
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return results
+
+
+    def test_shared_socket(self):
+        hub = wn_transport_eth_udp_py_hub.get_hub()
+
+        for node in self.nodes:
+            self.assertIsInstance(node.transport, wn_transport_eth_udp_py_hub.WnTransportEthUdpPyShared)
+            self.assertIs(node.transport.sock, hub.sock)
+
+
+    def test_send_cmd_threads(self):
+        # Each node is sent a different payload size so that a response
+        #   delivered to the wrong node is detected
+        def send_cmds(index, node):
+            return [node.send_cmd(wn_cmds.WnCmdTestPayloadSize(index + 1), max_attempts=10)
+                    for _ in range(100)]
+
+        results = self.run_nodes(send_cmds)
+
+        for (index, result) in enumerate(results):
+            self.assertEqual(result, [4 * (index + 1)] * 100)
+
+
+    def test_send_cmd_pipelined_threads(self):
+        def send_cmds(index, node):
+            cmds = [wn_cmds.WnCmdTestPayloadSize(index + 1) for _ in range(200)]
+            return node.send_cmd_pipelined(cmds, max_attempts=10)
+
+        results = self.run_nodes(send_cmds)
+
+        for (index, result) in enumerate(results):
+            self.assertEqual(result, [4 * (index + 1)] * 200)
+
+
+    def test_mismatches(self):
+        hub  = wn_transport_eth_udp_py_hub.get_hub()
+        node = self.nodes[0]
+        cmd  = wn_cmds.WnCmdPing()
+
+        self.emulator.loss = 0.0
+
+        cmd_stats      = node.stats.get_cmd_stats(cmd.command, cmd.__class__.__name__)
+        num_mismatches = cmd_stats.num_mismatches
+
+        # A held response for an old sequence number is discarded and 
+        #   counted as a mismatch by the next command
+        hub._add((node.node_id, (node.transport.hdr.seq_num - 10) & 0xFFFF, False), b'')
+        node.send_cmd(cmd)
+
+        self.assertEqual(cmd_stats.num_mismatches - num_mismatches, 1)
+
+
+    def test_pending_limit(self):
+        hub = wn_transport_eth_udp_py_hub.WnTransportEthUdpPyHub()
+        self.addCleanup(hub.close)
+
+        limit = wn_transport_eth_udp_py_hub.MAX_PENDING_SEQ_NUMS
+
+        for seq_num in range(limit + 2):
+            hub._add((NUM_NODES + 1, seq_num, False), b'')
+
+        # The oldest sequence numbers are discarded first
+        self.assertFalse(hub._has((NUM_NODES + 1, 0, False)))
+        self.assertFalse(hub._has((NUM_NODES + 1, 1, False)))
+        self.assertTrue(hub._has((NUM_NODES + 1, 2, False)))
+        self.assertTrue(hub._has((NUM_NODES + 1, limit + 1, False)))
+
+
+    def test_wait(self):
+        hub = wn_transport_eth_udp_py_hub.get_hub()
+
+        self.emulator.loss = 0.0
+
+        keys = []
+        for node in self.nodes:
+            node.transport.send(wn_cmds.WnCmdPing().serialize())
+            keys.append((node.transport.hdr.dest_id, node.transport.hdr.seq_num, False))
+
+        self.assertEqual(sorted(hub.wait(keys, 1.0).keys()), sorted(keys))
+
+
+    def test_bcast_acks(self):
+        hub             = wn_transport_eth_udp_py_hub.get_hub()
+        transport_bcast = self.nodes[0].transport_bcast
+        node_ids        = [node.node_id for node in self.nodes]
+
+        self.emulator.loss = 0.0
+
+        self.assertIsInstance(transport_bcast, wn_transport_eth_udp_py_hub.WnTransportEthUdpPyBcastShared)
+
+        transport_bcast.send(wn_cmds.WnCmdPing().serialize(), response_required=True)
+        seq_num = transport_bcast.hdr.seq_num
+
+        # Hold the broadcast responses in the hub without collecting them
+        keys = [(node_id, seq_num, True) for node_id in node_ids]
+        self.assertEqual(sorted(hub._wait(keys, 1.0, wait_all=True)), sorted(keys))
+
+        # Unicast commands with the same sequence number neither collect nor
+        #   discard the broadcast responses
+        for node in self.nodes:
+            node.transport.hdr.seq_num = seq_num - 1
+            self.assertEqual(node.send_cmd(wn_cmds.WnCmdTestPayloadSize(3)), 12)
+
+        self.assertEqual(sorted(transport_bcast.receive_acks(node_ids, 0).keys()), sorted(node_ids))
+
+# End Class
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+"""
+------------------------------------------------------------------------------
+WARPNet Benchmarks
+------------------------------------------------------------------------------
+Authors:   Chris Hunter (chunter [at] mangocomm.com)
+           Patrick Murphy (murphpo [at] mangocomm.com)
+           Erik Welsh (welsh [at] mangocomm.com)
+License:   Copyright 2014, Mango Communications. All rights reserved.
+           Distributed under the WARP license (http://warpproject.org/license)
+------------------------------------------------------------------------------
+MODIFICATION HISTORY:
+
+Ver   Who  Date     Changes
+----- ---- -------- -----------------------------------------------------
+1.00a ejw  10/17/26 Initial release
+
+------------------------------------------------------------------------------
+
+This module provides benchmarks for the WARPNet framework.  The benchmarks
+do not need any hardware:  the transport benchmarks run against emulated
+nodes (see wn_emulator) on localhost, with a fixed random seed so that the
+scenarios are reproducible.
+
+To run all benchmarks (and optionally save the results as JSON or CSV):
+    python -m warpnet.wn_bench [results.json | results.csv]
+
+Each benchmark returns a dictionary of metric to value.  wn_bench_save()
+writes a dictionary of benchmark name to these results as one row per
+(benchmark, metric, value), so that results can be compared across runs.
+
+Functions (see below for more information):
+    wn_bench_messages() -- Messages per second of the message classes
+    wn_bench_ping() -- Ping latency distribution of a node
+    wn_bench_cmds() -- Command throughput of a node
+    wn_bench_init() -- Initialization time of a fleet of nodes
+    wn_bench_emulated_nodes() -- Start an emulator and initialize its nodes
+    wn_bench_emulator() -- Start an emulator
+    wn_bench_save() -- Save benchmark results as JSON or CSV
+    wn_bench_all() -- Run all benchmarks
+
+"""
+
+import csv
+import sys
+import json
+import time
+import platform
+
+from . import wn_cmds
+from . import wn_message
+from . import wn_util
+from . import wn_emulator
+
+
+__all__ = ['wn_bench_messages', 'wn_bench_ping', 'wn_bench_cmds',
+           'wn_bench_init', 'wn_bench_emulated_nodes', 'wn_bench_emulator',
+           'wn_bench_save', 'wn_bench_all']
+
+
+# Default number of messages per benchmark
+WN_BENCH_NUM_MSGS       = 200000
+
+# Default number of pings / commands per transport benchmark
+WN_BENCH_NUM_PINGS      = 1000
+WN_BENCH_NUM_CMDS       = 5000
+
+# Default fleet sizes of the initialization benchmark
+WN_BENCH_NUM_NODES      = [1, 8, 32]
+
+# Seed and MTU (jumbo frames) of the emulated nodes
+WN_BENCH_SEED           = 1
+WN_BENCH_MTU            = 9000
+
+
+def _rate(func, num_msgs):
+    """Internal method to return the number of calls of func per second."""
+    start_time = time.time()
+
+    for _ in range(num_msgs):
+        func()
+
+    return num_msgs / (time.time() - start_time)
+
+
+def _percentile(samples, percent):
+    """Internal method to return the percentile of a sorted list."""
+    idx = int(round((percent / 100.0) * (len(samples) - 1)))
+    return samples[idx]
+
+
+def wn_bench_messages(num_msgs=WN_BENCH_NUM_MSGS, output=True):
+    """Benchmark the messages per second of the hot path of a command:
+    creating, serializing and matching a transport header, creating and
+    serializing a command, and creating and deserializing a response.
+
+    Returns a dictionary of benchmark name to messages per second.
+
+    Attributes:
+        num_msgs -- Number of messages per benchmark
+        output -- Print the results
+    """
+    hdr      = wn_message.WnTransportHeader(dest_id=1, src_id=250)
+    reply    = wn_message.WnTransportHeader(dest_id=250, src_id=1).serialize()
+    resp     = wn_message.WnCmdMessage(command=1, length=8, num_args=2, args=[1, 2]).serialize()
+
+    def header():
+        hdr.set_length(8)
+        hdr.serialize()
+        hdr.is_reply(reply[0:hdr.sizeof()])
+
+    def new_header():
+        wn_message.WnTransportHeader(dest_id=1, src_id=250).serialize()
+
+    def command():
+        cmd = wn_message.WnCmd(command=1)
+        cmd.set_args(1, 2, 3)
+        cmd.serialize()
+
+    def response():
+        wn_message.WnResp().deserialize(resp)
+
+    def buffer_cmd():
+        wn_message.WnBufferCmd(command=1, start_byte=0, size=1000).serialize()
+
+    results = {}
+
+    results['header']     = _rate(header, num_msgs)
+    results['new_header'] = _rate(new_header, num_msgs)
+    results['command']    = _rate(command, num_msgs)
+    results['response']   = _rate(response, num_msgs)
+    results['buffer_cmd'] = _rate(buffer_cmd, num_msgs)
+
+    if output:
+        print("WARPNet message benchmark ({0} messages):".format(num_msgs))
+        for name in sorted(results.keys()):
+            print("    {0:12s} : {1:12.0f} msgs/sec".format(name, results[name]))
+
+    return results
+
+# End of wn_bench_messages()
+
+
+
+def wn_bench_ping(node, num_pings=WN_BENCH_NUM_PINGS, output=True):
+    """Benchmark the ping latency distribution (in ms) of a node.
+
+    Returns a dictionary with the keys min, mean, p50, p90, p99 and max.
+
+    Attributes:
+        node -- Initialized WnNode
+        num_pings -- Number of pings
+        output -- Print the results
+    """
+    samples = sorted([1000 * node.transport.ping(node) for _ in range(num_pings)])
+
+    results = {'min'  : samples[0],
+               'mean' : sum(samples) / len(samples),
+               'p50'  : _percentile(samples, 50),
+               'p90'  : _percentile(samples, 90),
+               'p99'  : _percentile(samples, 99),
+               'max'  : samples[-1]}
+
+    if output:
+        print("WARPNet ping benchmark ({0} pings):".format(num_pings))
+        for name in ['min', 'mean', 'p50', 'p90', 'p99', 'max']:
+            print("    {0:12s} : {1:12.3f} ms".format(name, results[name]))
+
+    return results
+
+# End of wn_bench_ping()
+
+
+def wn_bench_cmds(node, num_cmds=WN_BENCH_NUM_CMDS, output=True):
+    """Benchmark the command throughput (in commands per second) of a node.
+
+    Returns a dictionary with the keys:
+        send_cmd -- One command per packet (WnNode.send_cmd())
+        send_cmds -- Many commands per packet (WnNode.send_cmds())
+
+    Attributes:
+        node -- Initialized WnNode
+        num_cmds -- Number of commands
+        output -- Print the results
+    """
+    results = {}
+
+    results['send_cmd'] = _rate(lambda: node.send_cmd(wn_cmds.WnCmdPing()), num_cmds)
+
+    start_time = time.time()
+    node.send_cmds([wn_cmds.WnCmdPing() for _ in range(num_cmds)])
+    results['send_cmds'] = num_cmds / (time.time() - start_time)
+
+    if output:
+        print("WARPNet command benchmark ({0} commands):".format(num_cmds))
+        for name in sorted(results.keys()):
+            print("    {0:12s} : {1:12.0f} cmds/sec".format(name, results[name]))
+
+    return results
+
+# End of wn_bench_cmds()
+
+
+def wn_bench_init(num_nodes=WN_BENCH_NUM_NODES, max_workers=wn_util.WN_INIT_MAX_WORKERS,
+                  emulator_class=wn_emulator.WnEmulator, output=True, **kwargs):
+    """Benchmark the initialization time (in sec) of a fleet of emulated
+    nodes versus the number of nodes.
+
+    Returns a dictionary of number of nodes to initialization time.
+
+    Attributes:
+        num_nodes -- List of fleet sizes
+        max_workers -- Number of nodes to initialize in parallel
+        emulator_class -- WnEmulator (or sub-class) to use
+        output -- Print the results
+        kwargs -- Additional arguments of the emulator (ie loss, latency)
+    """
+    results      = {}
+    node_factory = kwargs.pop('node_factory', None)
+
+    for count in num_nodes:
+        emulator = wn_bench_emulator(count, emulator_class, **kwargs)
+
+        try:
+            nodes_config = emulator.get_nodes_config()
+
+            # Only the initialization of the nodes is timed
+            start_time = time.time()
+            nodes = wn_util.wn_init_nodes(nodes_config, node_factory,
+                                          max_workers=max_workers)
+            results[count] = time.time() - start_time
+        finally:
+            emulator.stop()
+
+        if (len(nodes) != count):
+            print("WARNING:  Initialized {0} of {1} nodes".format(len(nodes), count))
+
+    if output:
+        print("WARPNet initialization benchmark:")
+        for count in sorted(results.keys()):
+            print("    {0:5d} nodes : {1:12.3f} sec".format(count, results[count]))
+
+    return results
+
+# End of wn_bench_init()
+
+
+def wn_bench_emulated_nodes(num_nodes, max_workers=wn_util.WN_INIT_MAX_WORKERS,
+                            emulator_class=wn_emulator.WnEmulator, seed=WN_BENCH_SEED,
+                            mtu=WN_BENCH_MTU, node_factory=None, **kwargs):
+    """Start an emulator with num_nodes nodes and initialize the nodes.
+
+    Returns (emulator, nodes).  The emulator must be stopped by the caller.
+
+    Attributes:
+        num_nodes -- Number of emulated nodes
+        max_workers -- Number of nodes to initialize in parallel
+        emulator_class -- WnEmulator (or sub-class) to use
+        seed -- Random seed of the emulator
+        mtu -- MTU of the emulated nodes
+        node_factory -- WnNodeFactory (or sub-class) to use
+        kwargs -- Additional arguments of the emulator (ie loss, latency)
+    """
+    emulator = wn_bench_emulator(num_nodes, emulator_class, seed, mtu, **kwargs)
+
+    nodes = wn_util.wn_init_nodes(emulator.get_nodes_config(), node_factory,
+                                  max_workers=max_workers)
+
+    return (emulator, nodes)
+
+# End of wn_bench_emulated_nodes()
+
+
+def wn_bench_emulator(num_nodes, emulator_class=wn_emulator.WnEmulator,
+                      seed=WN_BENCH_SEED, mtu=WN_BENCH_MTU, **kwargs):
+    """Start an emulator with num_nodes nodes.
+
+    Returns the emulator.  The emulator must be stopped by the caller.
+
+    Attributes:
+        num_nodes -- Number of emulated nodes
+        emulator_class -- WnEmulator (or sub-class) to use
+        seed -- Random seed of the emulator
+        mtu -- MTU of the emulated nodes
+        kwargs -- Additional arguments of the emulator (ie loss, latency)
+    """
+    emulator = emulator_class(seed=seed, **kwargs)
+    emulator.add_nodes(num_nodes, mtu=mtu)
+    emulator.start()
+
+    return emulator
+
+# End of wn_bench_emulator()
+
+
+def wn_bench_save(results, filename):
+    """Save the results of benchmarks to a JSON or CSV file (based on the
+    file extension).
+
+    The file contains one row per (benchmark, metric, value).  The JSON file
+    also records the time and platform of the run.
+
+    Attributes:
+        results -- Dictionary of benchmark name to results of the benchmark
+        filename -- Name of the file
+    """
+    rows = []
+
+    for benchmark in sorted(results.keys()):
+        for metric in sorted(results[benchmark].keys()):
+            rows.append({'benchmark' : benchmark,
+                         'metric'    : str(metric),
+                         'value'     : results[benchmark][metric]})
+
+    try:
+        if filename.lower().endswith('.csv'):
+            with open(filename, 'w') as csv_file:
+                writer = csv.DictWriter(csv_file, ['benchmark', 'metric', 'value'])
+                writer.writeheader()
+                writer.writerows(rows)
+        else:
+            with open(filename, 'w') as json_file:
+                json.dump({'time'     : time.strftime("%Y-%m-%d %H:%M:%S"),
+                           'platform' : platform.platform(),
+                           'python'   : platform.python_version(),
+                           'results'  : rows}, json_file, indent=4)
+    except IOError as err:
+        print("Error writing benchmark results: {0}".format(err))
+
+# End of wn_bench_save()
+
+
+def wn_bench_all(filename=None, output=True):
+    """Run all benchmarks and optionally save the results (see
+    wn_bench_save()).  Returns a dictionary of benchmark name to results.
+    """
+    results = {}
+
+    results['messages'] = wn_bench_messages(output=output)
+
+    (emulator, nodes) = wn_bench_emulated_nodes(1)
+
+    try:
+        results['ping'] = wn_bench_ping(nodes[0], output=output)
+        results['cmds'] = wn_bench_cmds(nodes[0], output=output)
+    finally:
+        emulator.stop()
+
+    results['init'] = wn_bench_init(output=output)
+
+    if filename is not None:
+        wn_bench_save(results, filename)
+
+    return results
+
+# End of wn_bench_all()
+
+
+
+if __name__ == '__main__':
+    if (len(sys.argv) > 1):
+        wn_bench_all(sys.argv[1])
+    else:
+        wn_bench_all()
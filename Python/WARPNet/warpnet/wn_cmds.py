@@ -89,6 +89,8 @@ CMD_NODE_GRPID_CLEAR    = 0x000006
 
 class WnCmdGetWarpNetNodeType(wn_message.WnCmd):
     """Command to get the WARPNet Node Type of the node"""
+    __slots__ = ()
+
     def __init__(self):
         super(WnCmdGetWarpNetNodeType, self).__init__()
         self.command = (GRPID_WARPNET << 24) | CMD_WARPNET_TYPE
@@ -105,6 +107,8 @@ class WnCmdGetWarpNetNodeType(wn_message.WnCmd):
 
 class WnCmdIdentify(wn_message.WnCmd):
     """Command to blink the WARPNet Node LEDs."""
+    __slots__ = ('node_id',)
+
     def __init__(self, node_id):
         super(WnCmdIdentify, self).__init__()
         self.command = (GRPID_NODE << 24) | CMD_IDENTIFY
@@ -118,6 +122,8 @@ class WnCmdIdentify(wn_message.WnCmd):
 
 class WnCmdGetHwInfo(wn_message.WnCmd):
     """Command to get the hardware parameters from the node."""
+    __slots__ = ()
+
     def __init__(self):
         super(WnCmdGetHwInfo, self).__init__()
         self.command = (GRPID_NODE << 24) | CMD_INFO
@@ -130,6 +136,8 @@ class WnCmdGetHwInfo(wn_message.WnCmd):
 
 class WnCmdNetworkSetup(wn_message.WnCmd):
     """Command to perform initial network setup of a node."""
+    __slots__ = ()
+
     def __init__(self, node):
         super(WnCmdNetworkSetup, self).__init__()
         self.command = (GRPID_NODE << 24) | CMD_NODE_NETWORK_SETUP
@@ -147,6 +155,8 @@ class WnCmdNetworkSetup(wn_message.WnCmd):
 
 class WnCmdNetworkReset(wn_message.WnCmd):
     """Command to reset the network configuration of a node."""
+    __slots__ = ()
+
     def __init__(self, node):
         super(WnCmdNetworkReset, self).__init__()
         self.command = (GRPID_NODE << 24) | CMD_NODE_NETWORK_RESET
@@ -160,6 +170,8 @@ class WnCmdNetworkReset(wn_message.WnCmd):
 
 class WnCmdPing(wn_message.WnCmd):
     """Command to ping the node."""
+    __slots__ = ()
+
     def __init__(self):
         super(WnCmdPing, self).__init__()
         self.command = (GRPID_TRANS << 24) | CMD_PING
@@ -171,13 +183,22 @@ class WnCmdPing(wn_message.WnCmd):
 
 
 class WnCmdTestPayloadSize(wn_message.WnCmd):
-    """Command to perform a payload size test on a node."""
+    """Command to perform a payload size test on a node.
+    
+    Attributes:
+        size -- Number of 32 bit arguments of the test payload
+    """
+    __slots__ = ()
+
     def __init__(self, size):
         super(WnCmdTestPayloadSize, self).__init__()
         self.command = (GRPID_TRANS << 24) | CMD_PAYLOAD_SIZE_TEST
         
-        for i in range(size):
-            self.add_args(i)
+        # Set all arguments at once (the payload is packed by a single
+        #   struct when the command is serialized)
+        self.args     = list(range(size))
+        self.num_args = size
+        self.length   = 4 * size
     
     def process_resp(self, resp):
         args = resp.get_args()
@@ -192,6 +213,8 @@ class WnCmdTestPayloadSize(wn_message.WnCmd):
 class WnCmdAddNodeGrpId(wn_message.WnCmd):
     """Command to add a Node Group ID to the node so that it can process
     broadcast commands that are received from that node group."""
+    __slots__ = ()
+
     def __init__(self, group):
         super(WnCmdAddNodeGrpId, self).__init__()
         self.command = (GRPID_NODE << 24) | CMD_NODE_GRPID_ADD
@@ -206,6 +229,8 @@ class WnCmdAddNodeGrpId(wn_message.WnCmd):
 class WnCmdClearNodeGrpId(wn_message.WnCmd):
     """Command to clear a Node Group ID to the node so that it can ignore
     broadcast commands that are received from that node group."""
+    __slots__ = ()
+
     def __init__(self, group):
         super(WnCmdClearNodeGrpId, self).__init__()
         self.command = (GRPID_NODE << 24) | CMD_NODE_GRPID_CLEAR
@@ -22,12 +22,15 @@ This module provides class definitions to manage the WARPNet configuration.
 Functions (see below for more information):
     WnConfiguration() -- Allows interaction with wn_config.ini file
     WnNodesConfiguration() -- Allows interaction with a nodes configuration file
+    WnNodeCache() -- Allows interaction with a node descriptor cache file
+    write_config_file() -- Atomically writes a config to a file
 
 """
 
 import os
 import inspect
 import datetime
+import threading
 import re
 
 try:                 # Python 3
@@ -41,7 +44,8 @@ from . import wn_util
 from . import wn_exception
 
 
-__all__ = ['WnConfiguration', 'WnNodesConfiguration']
+__all__ = ['WnConfiguration', 'WnNodesConfiguration', 'WnNodeCache',
+           'write_config_file']
 
 
 
@@ -60,7 +64,7 @@ class WnConfiguration(object):
             host_id -- Host indentifier
             unicast_port -- Default unicast port
             bcast_port -- Default broadcast port
-            transport_type -- Type of transport
+            transport_type -- Type of transport (python, python_shared)
             jumbo_frame_support -- Use jumbo Ethernet frames?
     """
     config              = None
@@ -246,6 +250,11 @@ class WnNodesConfiguration(object):
             self.node_id_counter = 0
             self.node_id_map = {}
         
+        # A filename of None creates an empty config (see add_node())
+        if filename is None:
+            self.set_default_config()
+            return
+
         try:
             self.load_config(filename)
         except wn_exception.WnConfigError as err:
@@ -279,6 +288,7 @@ class WnNodesConfiguration(object):
             print("Node {} exists.  Please use set_param to modify the node.".format(serial_number))
         else:
             # Populate required parameters
+            self.config.add_section(sn)
             self.config.set(sn, 'ip_address', ip_address)
             
             # Populate optional parameters
@@ -434,3 +444,121 @@ class WnNodesConfiguration(object):
 
 
 # End Class WnNodesConfiguration
+
+
+
+class WnNodeCache(object):
+    """Class for the descriptors of WARPNet nodes cached across sessions.
+    
+    A node descriptor holds the information that node initialization gets
+    from the node (see WnNode.get_descriptor()):  the FPGA DNA, node type, 
+    hardware version and max payload of the node, the IP address and jumbo
+    frame support it was found with, and any information of sub-classes 
+    (ie the event log size of WLAN Exp nodes).  A node with a descriptor is
+    initialized with a single get node info command if the FPGA DNA and the
+    rest of the node info still match the descriptor (see 
+    WnNode.configure_node()).
+    
+    Like the WARPNet configuration file, the cache file is in the config 
+    directory of the package (a relative filename is relative to that 
+    directory).
+    
+    Attributes:
+        Node serial number
+            fpga_dna -- FPGA DNA of the node
+            ... -- Other fields of the node descriptor
+    """
+    config              = None
+    config_file         = None
+
+    def __init__(self, filename=wn_defaults.WN_DEFAULT_NODE_CACHE_FILE):
+        base_dir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+        self.config_file = os.path.normpath(os.path.join(base_dir, "config", filename))
+        self.config      = configparser.ConfigParser()
+        self._lock       = threading.Lock()
+
+        # The file does not exist until the first save_config()
+        if os.path.isfile(self.config_file):
+            try:
+                self.config.read(self.config_file)
+            except configparser.Error as err:
+                print("WARNING:  Could not read {0}.".format(filename),
+                      "\n    Starting with an empty node cache.\n    {0}".format(err))
+                self.config = configparser.ConfigParser()
+
+
+    def get_descriptor(self, serial_number):
+        """Returns the descriptor (dictionary) of the node or None if the
+        node is not in the cache.  Integer values are returned as int."""
+        sn = "W3-a-{0:05d}".format(serial_number)
+
+        with self._lock:
+            if not self.config.has_section(sn):
+                return None
+
+            descriptor = {}
+
+            for (option, value) in self.config.items(sn):
+                try:
+                    descriptor[option] = int(value)
+                except ValueError:
+                    descriptor[option] = value
+
+        return descriptor
+
+
+    def set_descriptor(self, serial_number, descriptor):
+        """Sets the descriptor of the node (None removes the node)."""
+        sn = "W3-a-{0:05d}".format(serial_number)
+
+        with self._lock:
+            self.config.remove_section(sn)
+
+            if descriptor is not None:
+                self.config.add_section(sn)
+                for option in sorted(descriptor.keys()):
+                    self.config.set(sn, option, str(descriptor[option]))
+
+
+    def save_config(self, output=False):
+        """Saves the node cache to the file (see write_config_file())."""
+        if output:
+            print("Saving node cache to: \n{0}".format(self.config_file))
+
+        try:
+            with self._lock:
+                write_config_file(self.config, self.config_file)
+        except (IOError, OSError) as err:
+            print("Error writing node cache file: {0}".format(err))
+
+
+    def __str__(self):
+        msg = str(self.config_file + ": \n")
+        for section in self.config.sections():
+            msg += "    {0}: {1}\n".format(section, dict(self.config.items(section)))
+        return msg
+
+# End Class WnNodeCache
+
+
+
+def write_config_file(config, filename):
+    """Writes the config (a ConfigParser) to the file filename.
+
+    The config is written to a temporary file that then replaces filename in
+    one step, so filename holds either the previous or the new config even 
+    if the write is interrupted.  Raises an IOError / OSError on failure.
+    """
+    temp_file = filename + ".tmp"
+
+    with open(temp_file, 'w') as configfile:
+        config.write(configfile)
+        configfile.flush()
+        os.fsync(configfile.fileno())
+
+    if hasattr(os, 'replace'):
+        os.replace(temp_file, filename)          # Python 3
+    else:
+        os.rename(temp_file, filename)           # Python 2 (atomic on POSIX)
+
+# End of write_config_file()
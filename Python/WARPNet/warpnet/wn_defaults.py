@@ -27,6 +27,7 @@ PACKAGE_NAME                      = 'warpnet'
 # WARPNet INI Files
 WN_DEFAULT_INI_FILE               = 'wn_config.ini'
 WN_DEFAULT_NODES_CONFIG_INI_FILE  = 'nodes_config.ini'
+WN_DEFAULT_NODE_CACHE_FILE        = 'wn_node_cache.ini'
 
 
 # WARPNet Node Types
@@ -0,0 +1,692 @@
+# -*- coding: utf-8 -*-
+"""
+------------------------------------------------------------------------------
+WARPNet Node Emulator
+------------------------------------------------------------------------------
+Authors:   Chris Hunter (chunter [at] mangocomm.com)
+           Patrick Murphy (murphpo [at] mangocomm.com)
+           Erik Welsh (welsh [at] mangocomm.com)
+License:   Copyright 2014, Mango Communications. All rights reserved.
+           Distributed under the WARP license (http://warpproject.org/license)
+------------------------------------------------------------------------------
+MODIFICATION HISTORY:
+
+Ver   Who  Date     Changes
+----- ---- -------- -----------------------------------------------------
+1.00a ejw  10/17/26 Initial release
+
+------------------------------------------------------------------------------
+
+This module provides a software emulator of WARPNet nodes so that the
+framework can be exercised (and benchmarked) without WARP hardware.
+
+A WnEmulator runs a fleet of emulated nodes in a background thread.  The
+fleet listens for broadcast commands on one shared socket and each node
+listens for unicast commands on its own socket.  On Linux, every address in
+127.0.0.0/8 is local, so each node can use its own 127.0.0.x address with
+the default ports:
+
+    emulator = wn_emulator.WnEmulator(loss=0.01)
+    emulator.add_nodes(16)
+    emulator.start()
+
+    nodes = wn_util.wn_init_nodes(emulator.get_nodes_config())
+    ...
+    emulator.stop()
+
+The emulated nodes answer the WARPNet commands (see wn_cmds).  Sub-classes
+of WnEmulatedNode add the commands of other node types by adding handlers to
+cmd_handlers (see wlan_exp.wlan_exp_emulator).  Unlike WARP hardware, the
+emulated nodes answer broadcast messages that require a response unless
+bcast_ack_support of the node is cleared.
+
+Loss, latency and reordering are applied to every packet:
+    loss -- Each packet to or from a node is dropped with this probability
+    latency -- Delay (in sec) before a node sends each response packet
+    reorder -- Probability that a response packet is delayed by an extra
+               reorder_delay (in sec) so that later packets overtake it
+Packets larger than the MTU of a node are dropped.
+
+Functions (see below for more information):
+    WnEmulatedNode() -- Emulated WARPNet node
+    WnEmulator() -- Fleet of emulated nodes
+
+Integer constants:
+    EMULATOR_DEFAULT_MTU -- Default MTU of an emulated node (in bytes)
+    EMULATOR_UPDATE_INTERVAL -- Interval (in sec) of WnEmulatedNode.update()
+
+"""
+
+import time
+import heapq
+import random
+import select
+import socket
+import struct
+import threading
+
+from . import wn_defaults
+from . import wn_util
+from . import wn_config
+from . import wn_cmds
+from . import wn_node
+from . import wn_message
+from . import wn_transport
+from . import wn_transport_eth_udp
+
+
+__all__ = ['WnEmulatedNode', 'WnEmulator']
+
+
+EMULATOR_DEFAULT_MTU         = 1500
+EMULATOR_UPDATE_INTERVAL     = 0.1
+
+# Size of the IP / UDP headers
+_IP_UDP_HDR_LEN              = 28
+
+_TRANSPORT_HDR_STRUCT        = struct.Struct('!2H 2B 3H')
+_CMD_HDR_STRUCT              = struct.Struct('!I 2H')
+_BUFFER_HDR_STRUCT           = struct.Struct('!I 2H 4I')
+_HDR_LEN                     = 2 + _TRANSPORT_HDR_STRUCT.size
+
+
+class WnEmulatedNode(object):
+    """Class for an emulated WARPNet node.
+
+    Commands are processed by the handlers in cmd_handlers, a dictionary of
+    32-bit command (ie (group << 24) | command ID) to a method that takes
+    the list of command arguments and returns either a list of response
+    arguments (for a WnResp) or the bytes of a buffer (for a WnBuffer).
+
+    Attributes:
+        node_type -- WARPNet node type reported by the node
+        serial_number -- Serial number of the node
+        fpga_dna -- FPGA DNA of the node
+        hw_ver -- WARP hardware version of the node
+        node_id -- Node ID (set by the network setup command)
+        ip_address -- IP address of the node
+        unicast_port -- Unicast port of the node
+        bcast_port -- Broadcast port of the node
+        mac_address -- MAC address of the node
+        group_ids -- List of node group IDs of the node
+        bcast_ack_support -- True if the node answers broadcast messages 
+                             that require a response (WARP hardware does not)
+        mtu -- Maximum size of the IP packets of the node (in bytes)
+        cmd_handlers -- Dictionary of command to handler method
+    """
+    node_type     = None
+    serial_number = None
+    fpga_dna      = None
+    hw_ver        = None
+    node_id       = None
+    ip_address    = None
+    unicast_port  = None
+    bcast_port    = None
+    mac_address   = None
+    group_ids     = None
+    bcast_ack_support = None
+    mtu           = None
+    cmd_handlers  = None
+
+    def __init__(self, serial_number, ip_address=None,
+                 unicast_port=wn_defaults.WN_NODE_DEFAULT_UNICAST_PORT,
+                 bcast_port=wn_defaults.WN_NODE_DEFAULT_BCAST_PORT,
+                 mtu=EMULATOR_DEFAULT_MTU):
+        self.node_type     = wn_defaults.WN_NODE_TYPE
+        self.serial_number = serial_number
+        self.fpga_dna      = (0x5A5A << 48) + serial_number
+        self.hw_ver        = 3
+        self.node_id       = wn_defaults.WN_NODE_DEFAULT_NODE_ID
+        self.ip_address    = ip_address
+        self.unicast_port  = unicast_port
+        self.bcast_port    = bcast_port
+        self.mac_address   = (0x40D855 << 24) + (serial_number & 0xFFFFFF)
+        self.group_ids     = []
+        self.bcast_ack_support = True
+        self.mtu           = mtu
+
+        warpnet   = wn_cmds.GRPID_WARPNET << 24
+        node      = wn_cmds.GRPID_NODE << 24
+        transport = wn_cmds.GRPID_TRANS << 24
+
+        self.cmd_handlers = {
+            warpnet   | wn_cmds.CMD_WARPNET_TYPE       : self.cmd_warpnet_type,
+            node      | wn_cmds.CMD_INFO               : self.cmd_info,
+            node      | wn_cmds.CMD_IDENTIFY           : self.cmd_identify,
+            node      | wn_cmds.CMD_NODE_NETWORK_SETUP : self.cmd_network_setup,
+            node      | wn_cmds.CMD_NODE_NETWORK_RESET : self.cmd_network_reset,
+            node      | wn_cmds.CMD_NODE_GRPID_ADD     : self.cmd_group_id_add,
+            node      | wn_cmds.CMD_NODE_GRPID_CLEAR   : self.cmd_group_id_clear,
+            transport | wn_cmds.CMD_PING               : self.cmd_ping,
+            transport | wn_cmds.CMD_PAYLOAD_SIZE_TEST  : self.cmd_payload_size_test}
+
+    def __repr__(self):
+        return str("Emulated W3-a-{0:05d}: ID {1:5d} ".format(self.serial_number, self.node_id) +
+                   "({0}:{1})".format(self.ip_address, self.unicast_port))
+
+
+    def get_max_packet_size(self):
+        """Return the maximum UDP payload size of the node."""
+        return self.mtu - _IP_UDP_HDR_LEN
+
+
+    def process_cmds(self, payload):
+        """Process all commands in a packet payload.
+
+        Returns (resp, buffers):  the concatenated WnResp messages of all
+        commands with a WnResp response and a list of (cmd, args, data) for
+        each command with a WnBuffer response.
+        """
+        resp    = []
+        buffers = []
+        offset  = 0
+
+        while (offset + _CMD_HDR_STRUCT.size) <= len(payload):
+            (cmd, length, num_args) = _CMD_HDR_STRUCT.unpack_from(payload, offset)
+            offset += _CMD_HDR_STRUCT.size
+
+            if (offset + 4 * num_args) > len(payload):
+                break
+
+            args = list(struct.unpack_from('!%dI' % num_args, payload, offset))
+            offset += 4 * num_args
+
+            handler = self.cmd_handlers.get(cmd)
+
+            if handler is None:
+                # Unknown commands get an empty response
+                resp_args = []
+            else:
+                resp_args = handler(args)
+
+            if isinstance(resp_args, (bytes, bytearray, memoryview)):
+                buffers.append((cmd, args, resp_args))
+            else:
+                resp.append(struct.pack('!I 2H %dI' % len(resp_args), cmd,
+                                        4 * len(resp_args), len(resp_args),
+                                        *resp_args))
+
+        return (b''.join(resp), buffers)
+
+
+    def get_buffer_packets(self, cmd, args, data):
+        """Return the list of WnBuffer packet payloads that carry data in
+        response to a buffer command with the given arguments."""
+        (buffer_id, flags) = (args[0], args[1])
+        max_size = (self.get_max_packet_size() - _HDR_LEN - _BUFFER_HDR_STRUCT.size) & ~0x3
+        data     = memoryview(data)
+        output   = []
+
+        for start_byte in range(0, max(len(data), 1), max_size):
+            size = min(max_size, len(data) - start_byte)
+            output.append(_BUFFER_HDR_STRUCT.pack(cmd, 16, 4, buffer_id, flags,
+                                                  start_byte, size) +
+                          data[start_byte:(start_byte + size)].tobytes())
+
+        return output
+
+
+    def update(self):
+        """Update the state of the node in the background (called by the
+        emulator about every EMULATOR_UPDATE_INTERVAL sec).
+
+        Returns a list of (packet, (IP address, port)) of asynchronous packets
+        (ie log entry streams) that the node sends.
+        """
+        return []
+
+
+    def get_parameters(self):
+        """Return the hardware parameters of the node (see
+        WnNode.process_parameters() for the format)."""
+        (major, minor, revision) = (wn_util.WN_MAJOR, wn_util.WN_MINOR, wn_util.WN_REVISION)
+
+        node      = wn_cmds.GRPID_NODE
+        transport = wn_cmds.GRPID_TRANS
+
+        # WARP hardware does not answer broadcast messages
+        if self.bcast_ack_support:
+            bcast_ack = self._parameter(transport, wn_transport.TRANSPORT_BCAST_ACK, [1])
+        else:
+            bcast_ack = []
+
+        return (self._parameter(node, wn_node.NODE_TYPE, [self.node_type]) +
+                self._parameter(node, wn_node.NODE_ID, [self.node_id]) +
+                self._parameter(node, wn_node.NODE_HW_GEN, [self.hw_ver]) +
+                self._parameter(node, wn_node.NODE_DESIGN_VER, [(major << 16) | (minor << 8) | revision]) +
+                self._parameter(node, wn_node.NODE_SERIAL_NUM, [self.serial_number]) +
+                self._parameter(node, wn_node.NODE_FPGA_DNA, [self.fpga_dna & 0xFFFFFFFF, self.fpga_dna >> 32]) +
+                self._parameter(transport, wn_transport.TRANSPORT_TYPE, [0]) +
+                self._parameter(transport, wn_transport.TRANSPORT_HW_ADDR, [self.mac_address >> 32, self.mac_address & 0xFFFFFFFF]) +
+                self._parameter(transport, wn_transport.TRANSPORT_IP_ADDR, [wn_transport_eth_udp.ip2int(self.ip_address)]) +
+                self._parameter(transport, wn_transport.TRANSPORT_UNICAST_PORT, [self.unicast_port]) +
+                self._parameter(transport, wn_transport.TRANSPORT_BCAST_PORT, [self.bcast_port]) +
+                self._parameter(transport, wn_transport.TRANSPORT_GRP_ID, [self.group_ids[0] if self.group_ids else 0]) +
+                bcast_ack)
+
+
+    #-------------------------------------------------------------------------
+    # WARPNet command handlers
+    #-------------------------------------------------------------------------
+    def cmd_warpnet_type(self, args):
+        return [self.node_type]
+
+    def cmd_info(self, args):
+        return self.get_parameters()
+
+    def cmd_identify(self, args):
+        return []
+
+    def cmd_network_setup(self, args):
+        # Only the node with the given serial number is configured
+        if (len(args) == 5) and (args[0] == self.serial_number):
+            self.node_id      = args[1]
+            self.ip_address   = wn_transport_eth_udp.int2ip(args[2])
+            self.unicast_port = args[3]
+            self.bcast_port   = args[4]
+        return []
+
+    def cmd_network_reset(self, args):
+        if args and (args[0] == self.serial_number):
+            self.node_id = wn_defaults.WN_NODE_DEFAULT_NODE_ID
+        return []
+
+    def cmd_group_id_add(self, args):
+        for group_id in args:
+            if not group_id in self.group_ids:
+                self.group_ids.append(group_id)
+        return []
+
+    def cmd_group_id_clear(self, args):
+        for group_id in args:
+            if group_id in self.group_ids:
+                self.group_ids.remove(group_id)
+        return []
+
+    def cmd_ping(self, args):
+        return []
+
+    def cmd_payload_size_test(self, args):
+        return [4 * len(args)]
+
+
+    #-------------------------------------------------------------------------
+    # Internal helper methods
+    #-------------------------------------------------------------------------
+    def _parameter(self, group, identifier, values):
+        """Internal method to return the words of a hardware parameter."""
+        return [(group << 16) | len(values), identifier] + list(values)
+
+
+# End Class WnEmulatedNode
+
+
+
+class WnEmulator(object):
+    """Class for a fleet of emulated WARPNet nodes.
+
+    One background thread receives the packets of all nodes (one shared
+    broadcast socket and a unicast socket per node) and a second thread
+    sends the delayed response packets.
+
+    Attributes:
+        nodes -- List of emulated nodes
+        node_class -- WnEmulatedNode sub-class created by add_node()
+        bcast_port -- Broadcast port of the fleet
+        loss -- Probability that a packet to or from a node is dropped
+        latency -- Delay (in sec) of each response packet
+        reorder -- Probability that a response packet is delayed by an extra
+                   reorder_delay (in sec)
+        reorder_delay -- Extra delay (in sec) of reordered packets
+        num_rx_pkts -- Number of packets received by the fleet
+        num_tx_pkts -- Number of packets sent by the fleet
+        num_dropped_pkts -- Number of packets dropped (loss or MTU)
+    """
+    nodes            = None
+    node_class       = WnEmulatedNode
+    bcast_port       = None
+    loss             = None
+    latency          = None
+    reorder          = None
+    reorder_delay    = None
+    num_rx_pkts      = None
+    num_tx_pkts      = None
+    num_dropped_pkts = None
+
+    def __init__(self, bcast_port=wn_defaults.WN_DEFAULT_BCAST_PORT, loss=0.0,
+                 latency=0.0, reorder=0.0, reorder_delay=0.001, seed=None):
+        self.nodes            = []
+        self.bcast_port       = bcast_port
+        self.loss             = loss
+        self.latency          = latency
+        self.reorder          = reorder
+        self.reorder_delay    = reorder_delay
+        self.num_rx_pkts      = 0
+        self.num_tx_pkts      = 0
+        self.num_dropped_pkts = 0
+
+        self._random     = random.Random(seed)
+        self._lock       = threading.Lock()
+        self._socks      = {}          # socket -> node (None for broadcast)
+        self._node_socks = {}          # serial number -> socket
+        self._tx_queue   = []          # heap of (send time, index, sock, data, addr)
+        self._tx_index   = 0
+        self._tx_cond    = threading.Condition()
+        self._running    = False
+        self._threads    = []
+
+        self._bcast_sock = self._open_socket(('', bcast_port))
+        self._socks[self._bcast_sock] = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+    def add_node(self, serial_number, ip_address, **kwargs):
+        """Add an emulated node (of type node_class) with the given serial
+        number and IP address.  Additional keyword arguments are passed to
+        the node_class.  Returns the node."""
+        node = self.node_class(serial_number, ip_address, **kwargs)
+        self.nodes.append(node)
+        self._bind_node(node)
+        return node
+
+
+    def add_nodes(self, num_nodes, first_serial_number=1, base_ip_address='127.0.0.',
+                  first_ip=1, **kwargs):
+        """Add num_nodes emulated nodes with consecutive serial numbers and
+        IP addresses (base_ip_address + first_ip, ...).  Returns the list of
+        nodes."""
+        output = []
+
+        for i in range(num_nodes):
+            ip_address = "{0}{1}".format(base_ip_address, first_ip + i)
+            output.append(self.add_node(first_serial_number + i, ip_address, **kwargs))
+
+        return output
+
+
+    def get_nodes_config(self):
+        """Return a WnNodesConfiguration of all emulated nodes."""
+        nodes_config = wn_config.WnNodesConfiguration(filename=None)
+
+        for node in self.nodes:
+            nodes_config.add_node(node.serial_number, node.ip_address,
+                                  unicast_port=str(node.unicast_port),
+                                  bcast_port=str(self.bcast_port))
+
+        return nodes_config
+
+
+    def start(self):
+        """Start the emulator threads."""
+        if not self._running:
+            self._running = True
+            self._threads = [threading.Thread(target=self._rx_thread),
+                             threading.Thread(target=self._tx_thread)]
+            for thread in self._threads:
+                thread.daemon = True
+                thread.start()
+
+
+    def stop(self):
+        """Stop the emulator threads and close all sockets."""
+        self._running = False
+
+        with self._tx_cond:
+            self._tx_cond.notify_all()
+
+        for thread in self._threads:
+            thread.join()
+
+        self._threads = []
+
+        with self._lock:
+            for sock in self._socks:
+                sock.close()
+            self._socks = {}
+            self._node_socks = {}
+
+
+    #-------------------------------------------------------------------------
+    # Internal helper methods
+    #-------------------------------------------------------------------------
+    def _open_socket(self, address):
+        """Internal method to open a UDP socket bound to address."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        sock.bind(address)
+        return sock
+
+
+    def _bind_node(self, node):
+        """Internal method to (re)bind the unicast socket of a node to its
+        IP address and unicast port."""
+        with self._lock:
+            old_sock = self._node_socks.pop(node.serial_number, None)
+
+            if old_sock is not None:
+                if (old_sock.getsockname() == (node.ip_address, node.unicast_port)):
+                    self._node_socks[node.serial_number] = old_sock
+                    return
+                del self._socks[old_sock]
+                old_sock.close()
+
+            if node.ip_address is not None:
+                try:
+                    sock = self._open_socket((node.ip_address, node.unicast_port))
+                except socket.error as err:
+                    print("WARNING:  Unable to bind emulated node",
+                          "W3-a-{0:05d} to".format(node.serial_number),
+                          "{0}:{1}:  {2}".format(node.ip_address, node.unicast_port, err))
+                else:
+                    self._node_socks[node.serial_number] = sock
+                    self._socks[sock] = node
+
+
+    def _rx_thread(self):
+        """Internal method to receive and process the packets of all nodes."""
+        update_time = time.time()
+
+        while self._running:
+            if (time.time() >= update_time):
+                update_time += EMULATOR_UPDATE_INTERVAL
+                for node in self.nodes:
+                    for (data, addr) in node.update():
+                        with self._lock:
+                            sock = self._node_socks.get(node.serial_number, self._bcast_sock)
+                        self._send(node, sock, data, addr)
+
+            with self._lock:
+                socks = list(self._socks.keys())
+
+            try:
+                (readable, _, _) = select.select(socks, [], [], EMULATOR_UPDATE_INTERVAL)
+            except (select.error, ValueError):
+                # A socket was closed
+                continue
+
+            # Process broadcast packets first (ie network setup is sent just
+            #   before the first unicast packet to a node)
+            if self._bcast_sock in readable:
+                self._receive(self._bcast_sock)
+
+            for sock in readable:
+                if sock is not self._bcast_sock:
+                    self._receive(sock)
+
+
+    def _receive(self, sock):
+        """Internal method to receive and process one packet from sock."""
+        try:
+            (data, addr) = sock.recvfrom(2**16)
+        except socket.error:
+            return
+
+        self.num_rx_pkts += 1
+
+        with self._lock:
+            if not sock in self._socks:
+                return
+            node = self._socks[sock]
+
+        if node is None:
+            nodes = self.nodes
+        else:
+            nodes = [node]
+
+        for node in nodes:
+            try:
+                self._process_packet(node, sock, data, addr)
+            except Exception as err:
+                # Malformed commands must not stop the emulator
+                print("WARNING:  Emulated node W3-a-{0:05d}".format(node.serial_number),
+                      "could not process packet:  {0}".format(err))
+
+
+    def _receive_bcast(self):
+        """Internal method to process the pending broadcast packets.  Returns
+        True if there were any."""
+        received = False
+
+        try:
+            while select.select([self._bcast_sock], [], [], 0)[0]:
+                self._receive(self._bcast_sock)
+                received = True
+        except (select.error, ValueError):
+            pass
+
+        return received
+
+
+    def _process_packet(self, node, sock, data, addr):
+        """Internal method for a node to process a received packet."""
+        if (len(data) < _HDR_LEN) or (len(data) > node.get_max_packet_size()):
+            return
+
+        if self._drop():
+            return
+
+        (dest_id, src_id, group_id, pkt_type, _, seq_num, flags) = _TRANSPORT_HDR_STRUCT.unpack_from(data, 2)
+
+        # Broadcast packets for a node group (in the reserved field of the
+        #   header) are only processed by the nodes in the group.  This is
+        #   only done by emulated nodes (see group_id_support of
+        #   WnTransportEthUdpPyBcast).
+        if (dest_id == 0xFFFF) and group_id and not (group_id in node.group_ids):
+            return
+
+        if (dest_id != node.node_id) and (dest_id != 0xFFFF):
+            # The network setup of the node may still be pending
+            if (sock is self._bcast_sock) or not self._receive_bcast():
+                return
+            if (dest_id != node.node_id):
+                return
+
+        ip_address   = node.ip_address
+        unicast_port = node.unicast_port
+
+        (resp, buffers) = node.process_cmds(data[_HDR_LEN:])
+
+        # Network setup may have changed the address of the node
+        if (ip_address != node.ip_address) or (unicast_port != node.unicast_port):
+            self._bind_node(node)
+            with self._lock:
+                sock = self._node_socks.get(node.serial_number, sock)
+
+        # Packets that do not require a response are not answered
+        if not (flags & 0x1):
+            return
+
+        resp_flags = 0
+
+        # Broadcast packets are answered from the unicast socket of the node
+        #   with the FLAG_BCAST_ACK flag (if the node supports it)
+        if (sock is self._bcast_sock):
+            if not node.bcast_ack_support:
+                return
+
+            with self._lock:
+                sock = self._node_socks.get(node.serial_number, sock)
+
+            resp_flags = wn_message.FLAG_BCAST_ACK
+
+        payloads = []
+
+        if resp:
+            payloads.append(resp)
+
+        for (cmd, args, buffer_data) in buffers:
+            payloads.extend(node.get_buffer_packets(cmd, args, buffer_data))
+
+        for payload in payloads:
+            hdr = _TRANSPORT_HDR_STRUCT.pack(src_id, node.node_id, 0,
+                                             wn_message.PKTTYPE_NTOH_MSG,
+                                             len(payload), seq_num, resp_flags)
+            self._send(node, sock, b'\x00\x00' + hdr + payload, addr)
+
+
+    def _drop(self):
+        """Internal method to decide if a packet is lost."""
+        if (self.loss > 0) and (self._random.random() < self.loss):
+            self.num_dropped_pkts += 1
+            return True
+        return False
+
+
+    def _send(self, node, sock, data, addr):
+        """Internal method to send (or schedule) a response packet."""
+        if (len(data) > node.get_max_packet_size()):
+            self.num_dropped_pkts += 1
+            return
+
+        if self._drop():
+            return
+
+        delay = self.latency
+
+        if (self.reorder > 0) and (self._random.random() < self.reorder):
+            delay += self.reorder_delay
+
+        if (delay <= 0):
+            self._sendto(sock, data, addr)
+        else:
+            with self._tx_cond:
+                heapq.heappush(self._tx_queue, (time.time() + delay, self._tx_index, sock, data, addr))
+                self._tx_index += 1
+                self._tx_cond.notify()
+
+
+    def _sendto(self, sock, data, addr):
+        try:
+            sock.sendto(data, addr)
+            self.num_tx_pkts += 1
+        except socket.error:
+            pass
+
+
+    def _tx_thread(self):
+        """Internal method to send the delayed response packets."""
+        while self._running:
+            with self._tx_cond:
+                if not self._tx_queue:
+                    self._tx_cond.wait(0.1)
+                    continue
+
+                time_left = self._tx_queue[0][0] - time.time()
+
+                if (time_left > 0):
+                    self._tx_cond.wait(time_left)
+                    continue
+
+                (_, _, sock, data, addr) = heapq.heappop(self._tx_queue)
+
+            self._sendto(sock, data, addr)
+
+
+# End Class WnEmulator
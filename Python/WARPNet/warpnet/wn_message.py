@@ -30,9 +30,12 @@ Functions (see below for more information):
 Integer constants:
     PKTTYPE_TRIGGER, PKTTYPE_HTON_MSG, PKTTYPE_NTOH_MSG, PKTTYPE_NTOH_MSG_ASYNC
       - Transport Header Packet Types
+    FLAG_BCAST_ACK - Transport Header flag of a response to a broadcast
+      message
 
 """
 
+import bisect
 import struct
 
 from . import wn_transport
@@ -45,9 +48,34 @@ PKTTYPE_HTON_MSG             = 1
 PKTTYPE_NTOH_MSG             = 2
 PKTTYPE_NTOH_MSG_ASYNC       = 3
 
+# Transport Header flags (bit 0 is set if a response is required)
+FLAG_BCAST_ACK               = 0x2
+
+
+# Precompiled wire formats
+_TRANSPORT_HDR_STRUCT        = struct.Struct('!2H 2B 3H')
+_CMD_HDR_STRUCT              = struct.Struct('!I 2H')
+_BUFFER_HDR_STRUCT           = struct.Struct('!I 2H 4I')
+
+# Cache of command / response wire formats by number of arguments
+_cmd_structs                 = {0 : _CMD_HDR_STRUCT}
+
+
+def _get_cmd_struct(num_args):
+    """Internal method to return the struct.Struct of a command / response
+    with num_args arguments."""
+    try:
+        return _cmd_structs[num_args]
+    except KeyError:
+        cmd_struct = struct.Struct('!I 2H %dI' % num_args)
+        _cmd_structs[num_args] = cmd_struct
+        return cmd_struct
+
 
 class WnMessage(object):
     """Base class for WARPNet messages."""
+    __slots__ = ()
+
     def serialize(self,): raise NotImplementedError
     def deserialize(self,): raise NotImplementedError
     def sizeof(self,): raise NotImplementedError
@@ -66,7 +94,11 @@ class WnTransportHeader(WnMessage):
         length -- (uint16) Length of the payload in bytes
         seq_num -- (uint16) Sequence number of the message
         flags -- (uint16) Flags of the message
+        num_mismatches -- Number of packets received by is_reply() that were
+                          not a reply to the last outgoing packet
     """
+    __slots__ = ('dest_id', 'src_id', 'reserved', 'pkt_type', 'length', 
+                 'seq_num', 'flags', 'num_mismatches')
     
     def __init__(self, dest_id=0, src_id=0, reserved=0, 
                  pkt_type=PKTTYPE_HTON_MSG, length=0, seq_num=0, flags=0):
@@ -77,13 +109,14 @@ class WnTransportHeader(WnMessage):
         self.length = length
         self.seq_num = seq_num
         self.flags = flags
+        self.num_mismatches = 0
 
     def serialize(self):
         """Return a bytes object of a packed transport header."""
-        return struct.pack('!2H 2B 3H',
-                           self.dest_id, self.src_id,
-                           self.reserved, self.pkt_type, self.length, 
-                           self.seq_num, self.flags)
+        return _TRANSPORT_HDR_STRUCT.pack(self.dest_id, self.src_id,
+                                          self.reserved, self.pkt_type, 
+                                          self.length, self.seq_num, 
+                                          self.flags)
 
     def deserialize(self, buffer):
         """Not used for Transport headers"""
@@ -91,7 +124,7 @@ class WnTransportHeader(WnMessage):
     
     def sizeof(self):
         """Return the size of the transport header."""
-        return struct.calcsize('!2H 2B 3H')
+        return _TRANSPORT_HDR_STRUCT.size
     
     def increment(self, step=1):
         """Increment the sequence number of the header by a given step."""
@@ -146,15 +179,18 @@ class WnTransportHeader(WnMessage):
             input_data.dest_id == self.src_id
             input_data.src_id  == self.dest_id
             input_data.seq_num == self.seq_num
+        
+        Mismatches are counted in num_mismatches.
             
         Raises a TypeError excpetion if input data is not the correct size.
         """
-        if len(input_data) == self.sizeof():
-            dataTuple = struct.unpack('!2H 2B 3H', input_data[0:12])
+        if len(input_data) == _TRANSPORT_HDR_STRUCT.size:
+            dataTuple = _TRANSPORT_HDR_STRUCT.unpack(input_data)
             
             if ((self.dest_id != dataTuple[1]) or
                     (self.src_id  != dataTuple[0]) or
                     (self.seq_num != dataTuple[5])):
+                self.num_mismatches += 1
                 print("WARNING:  transport header mismatch:",
                       "[{0:d} {1:d}]".format(self.dest_id, dataTuple[1]),
                       "[{0:d} {1:d}]".format(self.src_id, dataTuple[0]),
@@ -166,6 +202,28 @@ class WnTransportHeader(WnMessage):
             raise TypeError(str("WnTransportHeader:  length of header " +
                                 "did not match size of transport header"))
 
+    def get_reply_seq_num(self, input_data):
+        """Returns the sequence number of input_data if it is a reply from
+        the destination of this header; otherwise returns None.
+
+        Unlike is_reply(), this does not require the sequence number to
+        match the last outgoing packet so that it can be used to match
+        replies when multiple packets are outstanding.
+
+        Raises a TypeError excpetion if input data is not the correct size.
+        """
+        if len(input_data) == _TRANSPORT_HDR_STRUCT.size:
+            dataTuple = _TRANSPORT_HDR_STRUCT.unpack(input_data)
+
+            if ((self.dest_id != dataTuple[1]) or
+                    (self.src_id  != dataTuple[0])):
+                return None
+            else:
+                return dataTuple[5]
+        else:
+            raise TypeError(str("WnTransportHeader:  length of header " +
+                                "did not match size of transport header"))
+
 # End Class WnTransportHeader
 
 
@@ -178,6 +236,7 @@ class WnCmdMessage(WnMessage):
         num_args -- (uint16) Number of uint32 arguments
         args -- (list of uint32) Arguments of the command / reponse
     """
+    __slots__ = ('command', 'length', 'num_args', 'args')
     
     def __init__(self, command=0, length=0, num_args=0, args=None):
         self.command = command
@@ -189,27 +248,20 @@ class WnCmdMessage(WnMessage):
         """Return a bytes object of a packed command / response."""
         # self.print()              # For Debug
         
-        if self.num_args == 0:
-            return struct.pack('!I 2H',
-                               self.command,
-                               self.length,
-                               self.num_args)
-        else:
-            return struct.pack('!I 2H %dI' % self.num_args,
-                               self.command,
-                               self.length,
-                               self.num_args,
-                               *self.args)
+        return _get_cmd_struct(self.num_args).pack(self.command,
+                                                   self.length,
+                                                   self.num_args,
+                                                   *self.args)
 
     def deserialize(self, buffer):
         """Populate the fields of a WnCmdResp from a buffer."""
         try:
-            dataTuple = struct.unpack('!I 2H', buffer[0:8])
+            num_args = _CMD_HDR_STRUCT.unpack_from(buffer)[2]
+            dataTuple = _get_cmd_struct(num_args).unpack_from(buffer)
             self.command = dataTuple[0]
             self.length = dataTuple[1]
-            self.num_args = dataTuple[2]
-            self.args = list(struct.unpack_from('!%dI' % self.num_args, 
-                                                buffer, offset=8))
+            self.num_args = num_args
+            self.args = list(dataTuple[3:])
         except struct.error as err:
             # Reset Cmd/Resp.  We want predictable behavior on error
             self.reset()
@@ -217,10 +269,7 @@ class WnCmdMessage(WnMessage):
     
     def sizeof(self):
         """Return the size of the cmd/resp including all attributes."""
-        if self.num_args == 0:
-            return struct.calcsize('!I 2H')
-        else:        
-            return struct.calcsize('!I 2H %dI' % self.num_args)
+        return _get_cmd_struct(self.num_args).size
 
     def reset(self):
         """Reset the WnCmdResp object to a default state (all zeros)"""
@@ -242,7 +291,7 @@ class WnCmd(WnCmdMessage):
 
     See documentation of WnCmdResp for additional attributes
     """
-    resp_type = None
+    __slots__ = ('resp_type',)
     
     def __init__(self, command=0, length=0, num_args=0, 
                  args=None, resp_type=None):
@@ -296,11 +345,7 @@ class WnBufferCmd(WnCmdMessage):
 
     See documentation of WnCmdResp for additional attributes
     """
-    resp_type  = None
-    buffer_id  = None
-    flags      = None
-    start_byte = None
-    size       = None
+    __slots__ = ('resp_type', 'buffer_id', 'flags', 'start_byte', 'size')
     
     def __init__(self, command=0, buffer_id=0, flags=0, start_byte=0, size=0):
         super(WnBufferCmd, self).__init__(command=command,
@@ -318,6 +363,7 @@ class WnBufferCmd(WnCmdMessage):
     def get_buffer_size(self): return self.size    
     def get_buffer_id(self): return self.buffer_id
     def get_buffer_flags(self): return self.flags
+    def get_buffer_start_byte(self): return self.start_byte
 
     def process_resp(self, resp):
         """Process the response of the WARPNet command."""
@@ -340,6 +386,7 @@ class WnResp(WnCmdMessage):
     
     See documentation of WnCmdResp for attributes
     """
+    __slots__ = ()
     
     def get_args(self):
         """Return the response arguments."""
@@ -367,6 +414,10 @@ class WnBuffer(WnMessage):
         complete -- Flag to indicate if buffer contains all of the bytes
                       indicated by the size parameter
         num_bytes -- Number of bytes currently contained within the buffer
+        byte_ranges -- Sorted list of non-overlapping (start, end) byte
+                      ranges that have been added to the buffer
+        buffer -- Content of the buffer (a bytearray or the writable storage 
+                  of size bytes provided to the constructor)
 
     Wire Data Format:
         command -- (uint32) WARPNet command / response
@@ -377,25 +428,27 @@ class WnBuffer(WnMessage):
         size -- (uint32) Size of the buffer in bytes
         buffer -- (list of uint8) Content of the buffer 
     """
-    complete    = None
-    num_bytes   = None
-    buffer_id   = None
-    flags       = None
-    size        = None
-    buffer      = None
+    __slots__ = ('complete', 'num_bytes', 'byte_ranges', 'buffer_id', 'flags',
+                 'size', 'buffer')
 
 
-    def __init__(self, buffer_id=0, flags=0, size=0, buffer=None):
+    def __init__(self, buffer_id=0, flags=0, size=0, buffer=None, storage=None):
         self.buffer_id = buffer_id
         self.flags = flags
         self.size = size
 
-        if buffer is None:
-            # Create an empty buffer of the specified size
-            self.complete = False
-            self.num_bytes = 0
+        # Create an empty buffer of the specified size (or use the storage
+        #   provided by the caller, ie a memoryview of an mmap of a file)
+        self.complete = False
+        self.num_bytes = 0
+        self.byte_ranges = []
+
+        if storage is None:
             self.buffer = bytearray(self.size)
         else:
+            self.buffer = storage
+
+        if buffer is not None:
             self._add_buffer_data(0, buffer)
 
     def serialize(self, command=0, start_byte=0):
@@ -409,12 +462,15 @@ class WnBuffer(WnMessage):
         """Populate the fields of a WnBuffer with a message raw_data."""
         try:
             # Interpret the raw_data
-            dataTuple = struct.unpack('!I 2H 4I', raw_data[0:24])
+            dataTuple = _BUFFER_HDR_STRUCT.unpack_from(raw_data)
             self.buffer_id = dataTuple[3]
             self.flags = dataTuple[4]
             start_byte = dataTuple[5]
             size = dataTuple[6]
-            buffer = struct.unpack_from('!%dB' % size, raw_data, offset=24)
+            buffer = memoryview(raw_data)[24:(24 + size)]
+
+            if (len(buffer) != size):
+                raise struct.error("unpack requires {0} bytes of data".format(size))
             
             self._update_size(start_byte + size)
             self._add_buffer_data(start_byte, buffer)
@@ -424,30 +480,40 @@ class WnBuffer(WnMessage):
             print("Error unpacking WARPNet buffer: {0}\n".format(err),
                   "    Ignorning data.")
 
-    def add_data_to_buffer(self, raw_data):
+    def add_data_to_buffer(self, raw_data, offset=0):
         """Add the raw data (with the format of a WnBuffer) to the current
         WnBuffer.
         
+        Attributes:
+            raw_data -- Data with the wire format of a WnBuffer
+            offset -- Offset added to the start_byte of the raw_data (ie
+                      when raw_data is a response to a request for only 
+                      part of the buffer) (optional)
+        
         Note:  This will check to make sure that data is for the given buffer
         as well as place it in the appropriate place indicated by the
         start_byte.        
         """
         try:
             # Interpret the raw_data
-            dataTuple = struct.unpack('!I 2H 4I', raw_data[0:24])
+            dataTuple = _BUFFER_HDR_STRUCT.unpack_from(raw_data)
             buffer_id = dataTuple[3]
             flags = dataTuple[4]
             start_byte = dataTuple[5]
             size = dataTuple[6]
-            buffer = struct.unpack_from('!%dB' % size, raw_data, offset=24)
+            buffer = memoryview(raw_data)[24:(24 + size)]
+
+            if (len(buffer) != size):
+                raise struct.error("unpack requires {0} bytes of data".format(size))
         except struct.error as err:
             # Ignore the data.  We want predictable behavior on error
             print("Error unpacking WARPNet buffer: {0}\n".format(err),
                   "    Ignorning data.")
+            return
 
         if (buffer_id == self.buffer_id):
-            self._update_size(start_byte + size)
-            self._add_buffer_data(start_byte, buffer)
+            self._update_size(offset + start_byte + size)
+            self._add_buffer_data(offset + start_byte, buffer)
             self._set_buffer_complete()            
  
             self.set_flags(flags)
@@ -494,12 +560,46 @@ class WnBuffer(WnMessage):
         """Return if the buffer is complete."""
         return self.complete
 
+    def get_missing_byte_ranges(self, start_byte=0, size=None):
+        """Return a list of (start_byte, size) tuples for each part of the
+        buffer that has not been received.
+        
+        Attributes:
+            start_byte -- Start of the part of the buffer to check (optional)
+            size -- Size of the part of the buffer to check (optional).  By
+                    default, the rest of the buffer is checked.
+        """
+        if size is None:
+            end_byte = self.size
+        else:
+            end_byte = min(start_byte + size, self.size)
+
+        missing = []
+        curr_byte = start_byte
+
+        for (range_start, range_end) in self.byte_ranges:
+            if (range_end <= curr_byte):
+                continue
+            if (range_start >= end_byte):
+                break
+            if (range_start > curr_byte):
+                missing.append((curr_byte, range_start - curr_byte))
+            curr_byte = range_end
+
+        if (curr_byte < end_byte):
+            missing.append((curr_byte, end_byte - curr_byte))
+
+        return missing
+
     def reset(self):
         """Reset the WnBuffer object to a default state (all zeros)"""
         self.buffer_id = 0
         self.flags = 0
         self.size = 0
+        self.num_bytes = 0
+        self.byte_ranges = []
         self.buffer = bytearray(self.size)
+        self._set_buffer_complete()
 
     def __str__(self):
         """Pretty print the WnBuffer"""
@@ -530,32 +630,42 @@ class WnBuffer(WnMessage):
         NOTE:  If the provided buffer data is greater than specified buffer
             size, then the data will be truncated.
         """
-        buffer_size = len(buffer)
-        num_bytes = self._num_bytes_to_add(buffer_size)        
-        end_byte = num_bytes + start_byte
+        end_byte = min(start_byte + len(buffer), self.size)
+        num_bytes = end_byte - start_byte
 
         if (num_bytes > 0):
             self.buffer[start_byte:end_byte] = buffer[:num_bytes]
+            self._add_byte_range(start_byte, end_byte)
             
         self._set_buffer_complete()
 
-    def _num_bytes_to_add(self, buffer_size):
-        """Internal function to determine how many bytes we can add to the 
-        buffer.
+    def _add_byte_range(self, start_byte, end_byte):
+        """Internal method to record that [start_byte, end_byte) of the 
+        buffer has been received.
         
-        NOTE:  If the provided buffer data is greater than specified buffer
-            size, then the data will be truncated.
+        Overlapping and adjacent ranges are merged so that num_bytes does
+        not count duplicate data (ie from a retransmission) twice.
         """
-        num_bytes = buffer_size
-        end_byte = self.num_bytes + buffer_size
-        
-        if (end_byte <= self.size):
-            self.num_bytes = end_byte
-        else:
-            num_bytes = self.size - self.num_bytes
-            self.num_bytes = self.size
-
-        return num_bytes
+        ranges = self.byte_ranges
+
+        # Index of the first range that starts at or after start_byte
+        idx = bisect.bisect_left(ranges, (start_byte,))
+
+        # Merge with the previous range if they overlap or are adjacent
+        if (idx > 0) and (ranges[idx - 1][1] >= start_byte):
+            idx -= 1
+            start_byte = ranges[idx][0]
+
+        # Merge with all following ranges that overlap or are adjacent
+        end_idx = idx
+        removed = 0
+        while (end_idx < len(ranges)) and (ranges[end_idx][0] <= end_byte):
+            end_byte = max(end_byte, ranges[end_idx][1])
+            removed += ranges[end_idx][1] - ranges[end_idx][0]
+            end_idx += 1
+
+        ranges[idx:end_idx] = [(start_byte, end_byte)]
+        self.num_bytes += (end_byte - start_byte) - removed
 
     def _set_buffer_complete(self):
         """Internal method to set the complete flag on the buffer."""
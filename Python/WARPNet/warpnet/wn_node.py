@@ -26,12 +26,20 @@ Functions (see below for more information):
 Integer constants:
     NODE_TYPE, NODE_ID, NODE_HW_GEN, NODE_DESIGN_VER, NODE_SERIAL_NUM, 
       NODE_FPGA_DNA -- Node hardware parameter constants 
+    BUFFER_CHUNK_PKTS, BUFFER_WINDOW_SIZE -- Default chunk size (in packets)
+      and number of outstanding chunks of send_cmd_chunked()
+    BUFFER_RETRY_COPIES -- Number of copies of each request for a missing 
+      byte range of a buffer after a timeout
 
 If additional hardware parameters are needed for sub-classes of WnNode, please
 make sure that the values of these hardware parameters are not reused.
 
 """
 
+import copy
+import time
+import collections
+
 from . import wn_defaults
 from . import wn_util
 from . import wn_config
@@ -41,6 +49,8 @@ from . import wn_exception as ex
 from . import wn_transport
 from . import wn_transport_eth_udp_py
 from . import wn_transport_eth_udp_py_bcast
+from . import wn_transport_eth_udp_py_hub
+from . import wn_stats
 
 
 __all__ = ['WnNode', 'WnNodeFactory']
@@ -55,6 +65,18 @@ NODE_DESIGN_VER         = 3
 NODE_SERIAL_NUM         = 4
 NODE_FPGA_DNA           = 5
 
+# Default number of packets per chunk and number of outstanding chunks of a
+#   chunked buffer transfer (see send_cmd_chunked()).  Both are reduced so
+#   that the outstanding chunks fit in the receive buffer of the socket.
+BUFFER_CHUNK_PKTS       = 64
+BUFFER_WINDOW_SIZE      = 4
+
+# Number of copies of each request for a missing byte range of a buffer after
+#   a timeout.  The ranges that are still missing after a timeout are usually
+#   small, so sending each request twice costs little and a round of requests
+#   only fails if every copy (or its response) is lost.
+BUFFER_RETRY_COPIES     = 2
+
 
 
 class WnNode(object):
@@ -81,6 +103,7 @@ class WnNode(object):
         
         transport -- Node's transport object
         transport_bcast -- Node's broadcast transport object
+        stats -- Statistics of the commands sent to the node (WnNodeStats)
     """
     node_type       = None
     node_id         = None
@@ -95,9 +118,13 @@ class WnNode(object):
 
     transport       = None
     transport_bcast = None
+    stats           = None
+
+    _node_info      = None
     
     def __init__(self):
         (self.wn_ver_major, self.wn_ver_minor, self.wn_ver_revision) = wn_util.wn_ver(output=0)
+        self.stats = wn_stats.WnNodeStats()
 
 
     def __del__(self):
@@ -120,12 +147,19 @@ class WnNode(object):
                                bcast_port=wn_defaults.WN_NODE_DEFAULT_BCAST_PORT):
         """Set the initial configuration of the node."""
         config =  wn_config.WnConfiguration()
+        transport_type = config.get_param('network', 'transport_type')
         
-        if (config.get_param('network', 'transport_type') == 'python'):
+        if (transport_type == 'python'):
             if self.transport is None:
                 self.transport = wn_transport_eth_udp_py.WnTransportEthUdpPy()
             if self.transport_bcast is None:
                 self.transport_bcast = wn_transport_eth_udp_py_bcast.WnTransportEthUdpPyBcast()
+        elif (transport_type == 'python_shared'):
+            # All nodes share the socket of the default transport hub
+            if self.transport is None:
+                self.transport = wn_transport_eth_udp_py_hub.WnTransportEthUdpPyShared()
+            if self.transport_bcast is None:
+                self.transport_bcast = wn_transport_eth_udp_py_hub.WnTransportEthUdpPyBcastShared()
         else:
             print("Transport not defined\n")
         
@@ -147,19 +181,62 @@ class WnNode(object):
         self.transport_bcast.hdr.set_dest_id(0xFFFF)
 
 
-    def configure_node(self, jumbo_frame_support=False):
-        """Get remaining information from the node and set remaining parameters."""
+    def configure_node(self, jumbo_frame_support=False, node_cache=None):
+        """Get remaining information from the node and set remaining parameters.
         
-        self.transport.ping(self)
-        self.transport.test_payload_size(self, jumbo_frame_support)        
+        If the node_cache (a WnNodeCache) has a descriptor of the node that
+        matches the node info (including the FPGA DNA), the ping and the 
+        payload size test are skipped and the max payload of the descriptor
+        is used.  Otherwise the node is configured from scratch and its 
+        descriptor is stored in the node_cache (call save_config() to save
+        the node cache to its file).
+        """
+        # Node info received by the node factory (see create_node())
+        resp = self._node_info
+        self._node_info = None
+
+        descriptor = None
+
+        if node_cache is not None:
+            descriptor = node_cache.get_descriptor(self.serial_number)
+
+        if descriptor is not None:
+            if resp is None:
+                resp = self.get_node_info()
+
+            self.process_parameters(resp)
+            self.transport.set_max_payload(descriptor.get('max_payload'))
+
+            if (descriptor != self._get_cache_descriptor(jumbo_frame_support)):
+                descriptor = None
 
-        resp = self.get_node_info()
-        self.process_parameters(resp)
+        if descriptor is None:
+            self.transport.ping(self)
+            self.transport.test_payload_size(self, jumbo_frame_support)        
+
+            if resp is None:
+                resp = self.get_node_info()
+
+            self.process_parameters(resp)
+
+            if node_cache is not None:
+                node_cache.set_descriptor(self.serial_number, 
+                                          self._get_cache_descriptor(jumbo_frame_support))
 
         # Set description
         self.description = str("WARP v{} Node - ID {}".format(self.hw_ver, self.node_id))
 
 
+    def get_descriptor(self):
+        """Return a dictionary of the information that configure_node() gets
+        from the node (see WnNodeCache)."""
+        return {'fpga_dna'    : self.fpga_dna,
+                'node_type'   : self.node_type,
+                'hw_ver'      : self.hw_ver,
+                'max_payload' : self.transport.get_max_payload(),
+                'ip_address'  : self.transport.ip_address}
+
+
     #-------------------------------------------------------------------------
     # WARPNet Commands for the Node
     #-------------------------------------------------------------------------
@@ -291,6 +368,9 @@ class WnNode(object):
     def send_cmd(self, cmd, max_attempts=2):
         """Send the provided command.
         
+        The latency, retransmissions, timeouts, bytes and transport header
+        mismatches of the command are recorded in stats.
+        
         Attributes:
             cmd -- WnCommand to send
             max_attempts -- Maximum number of attempts to send a given command
@@ -298,87 +378,554 @@ class WnNode(object):
         resp_type = cmd.get_resp_type()
         payload = cmd.serialize()
         
+        cmd_stats = self.stats.get_cmd_stats(cmd.command, cmd.__class__.__name__)
+        cmd_stats.num_cmds += 1
+
         if  (resp_type == wn_transport.TRANSPORT_NO_RESP):
+            cmd_stats.tx_bytes += len(payload)
             self.transport.send(payload, robust=False)
+            return
+
+        num_mismatches = self.transport.hdr.num_mismatches
+        start_time = time.time()
+
+        try:
+            if (resp_type == wn_transport.TRANSPORT_WN_RESP):
+                resp = self._receive_resp(payload, max_attempts, cmd_stats)
+
+            elif (resp_type == wn_transport.TRANSPORT_WN_BUFFER):
+                resp = self._receive_buffer(cmd, payload, max_attempts, cmd_stats)
+
+            else:
+                raise ex.WnTransportError(self.transport,
+                                          "Unknown response type for command")
+        except ex.WnTransportError:
+            cmd_stats.num_failures += 1
+            raise
+        finally:
+            cmd_stats.num_mismatches += self.transport.hdr.num_mismatches - num_mismatches
+
+        cmd_stats.add_latency(time.time() - start_time)
+
+        return cmd.process_resp(resp)
+
+
+    def send_cmd_chunked(self, cmd, chunk_size=None, window=BUFFER_WINDOW_SIZE,
+                         max_attempts=2, storage=None):
+        """Send the provided buffer command as many requests for chunks of 
+        the buffer with several requests outstanding at a time.
+        
+        Each chunk is requested with a separate packet (ie its own sequence
+        number) and the data of each response is written directly into the
+        buffer at the offset of its chunk.  Only the missing byte ranges of 
+        a chunk are requested again, either when the end of the chunk has 
+        been received or when a timeout occurs.
+        
+        Returns the processed response of the command (see send_cmd()).  A 
+        buffer that fits in one chunk is sent with send_cmd() (unless 
+        storage is provided).
+        
+        The window (and the default chunk size) are reduced so that the data
+        of the outstanding chunks fits in the receive buffer granted to the
+        socket by the operating system (see rx_buffer_size of the transport).
+
+        Attributes:
+            cmd -- WnBufferCmd to send
+            chunk_size -- Size of each chunk in bytes (optional; defaults to
+                          BUFFER_CHUNK_PKTS packets of data)
+            window -- Maximum number of outstanding chunk requests
+            max_attempts -- Maximum number of attempts without any data
+                            received from the node
+            storage -- Writable buffer of the size of the buffer of cmd (ie
+                       a memoryview of an mmap of a file) that receives the
+                       data instead of memory allocated by the WnBuffer
+                       (optional)
+        """
+        if (cmd.get_resp_type() != wn_transport.TRANSPORT_WN_BUFFER):
+            raise ex.WnTransportError(self.transport,
+                                      "Only commands with a WnBuffer response can be chunked")
+
+        (chunk_size, window) = self._get_chunk_window(chunk_size, window)
+
+        if (cmd.get_buffer_size() <= chunk_size) and (storage is None):
+            return self.send_cmd(cmd, max_attempts)
+
+        cmd_stats = self.stats.get_cmd_stats(cmd.command, cmd.__class__.__name__)
+        cmd_stats.num_cmds += 1
+
+        num_mismatches = self.transport.hdr.num_mismatches
+        start_time = time.time()
+
+        try:
+            resp = self._receive_buffer_chunks(cmd, chunk_size, window, 
+                                               max_attempts, cmd_stats, storage)
+        except ex.WnTransportError:
+            cmd_stats.num_failures += 1
+            raise
+        finally:
+            cmd_stats.num_mismatches += self.transport.hdr.num_mismatches - num_mismatches
+
+        cmd_stats.add_latency(time.time() - start_time)
+
+        return cmd.process_resp(resp)
+
+
+    def send_cmd_pipelined(self, cmds, window=None, max_attempts=2):
+        """Send the provided list of commands without waiting for the
+        response of one command before sending the next.
+
+        Returns the list of processed responses in the same order as cmds.
+        All commands must require a WnResp response (ie buffer commands
+        cannot be pipelined).
 
-        elif (resp_type == wn_transport.TRANSPORT_WN_RESP):
-            resp = self._receive_resp(payload, max_attempts)
-            return cmd.process_resp(resp)
+        Attributes:
+            cmds -- List of WnCommands to send
+            window -- Maximum number of outstanding commands (optional)
+            max_attempts -- Maximum number of attempts to send a given command
+        """
+        payloads = []
+
+        for cmd in cmds:
+            if (cmd.get_resp_type() != wn_transport.TRANSPORT_WN_RESP):
+                raise ex.WnTransportError(self.transport,
+                                          "Only commands with a WnResp response can be pipelined")
+            payloads.append(cmd.serialize())
+
+        pkt_stats      = []
+        replies        = None
+        num_mismatches = self.transport.hdr.num_mismatches
+
+        try:
+            if window is None:
+                replies = self.transport.send_pipelined(payloads, max_attempts=max_attempts,
+                                                        stats=pkt_stats)
+            else:
+                replies = self.transport.send_pipelined(payloads, window, max_attempts,
+                                                        stats=pkt_stats)
+        finally:
+            for (idx, (cmd, payload)) in enumerate(zip(cmds, payloads)):
+                (attempts, latency) = pkt_stats[idx] if pkt_stats else (0, None)
+                rx_bytes = len(replies[idx]) if replies else 0
+                self._add_batch_stats(cmd, len(payload), rx_bytes, attempts, latency)
+
+            self._add_mismatch_stats(cmds, self.transport.hdr.num_mismatches - num_mismatches)
+
+        output = []
+
+        for (cmd, reply) in zip(cmds, replies):
+            resp = wn_message.WnResp()
+            resp.deserialize(reply)
+            output.append(cmd.process_resp(resp))
+
+        return output
+
+
+    def send_cmds(self, cmds, max_attempts=2):
+        """Send the provided list of commands in as few packets as possible.
+
+        The serialized commands are packed into packets of up to the 
+        max_payload of the transport.  The node processes each command of a 
+        packet in order and returns the concatenated responses in a single
+        packet, which are split and passed to the process_resp() of each 
+        command.  If more than one packet is needed, the packets are 
+        pipelined (see send_cmd_pipelined()).
+
+        Returns the list of processed responses in the same order as cmds.
+        All commands must require a WnResp response.
+        
+        Attributes:
+            cmds -- List of WnCommands to send
+            max_attempts -- Maximum number of attempts to send each packet
+        
+        NOTE:  If a packet is retransmitted, all of its commands may be 
+        executed again by the node.
+        """
+        packets     = []           # List of [payload, number of commands]
+        payloads    = []           # Serialized payload of each command
+        max_payload = self.transport.get_max_payload()
+
+        for cmd in cmds:
+            if (cmd.get_resp_type() != wn_transport.TRANSPORT_WN_RESP):
+                raise ex.WnTransportError(self.transport,
+                                          "Only commands with a WnResp response can be batched")
+
+            payload = cmd.serialize()
+            payloads.append(payload)
 
-        elif (resp_type == wn_transport.TRANSPORT_WN_BUFFER):
-            resp = self._receive_buffer(cmd, payload, max_attempts)
-            return cmd.process_resp(resp)
+            if packets and ((len(packets[-1][0]) + len(payload)) <= max_payload):
+                packets[-1][0] += payload
+                packets[-1][1] += 1
+            else:
+                packets.append([payload, 1])
+
+        pkt_stats      = []
+        num_mismatches = self.transport.hdr.num_mismatches
+
+        try:
+            replies = self.transport.send_pipelined([packet[0] for packet in packets], 
+                                                    max_attempts=max_attempts,
+                                                    stats=pkt_stats)
+        except ex.WnTransportError:
+            self._add_packets_stats(cmds, payloads, packets, pkt_stats)
+            raise
+        finally:
+            self._add_mismatch_stats(cmds, self.transport.hdr.num_mismatches - num_mismatches)
+
+        resps = [self._split_resp(reply) for reply in replies]
+
+        self._add_packets_stats(cmds, payloads, packets, pkt_stats, resps)
+
+        output = []
+        cmd_idx = 0
+
+        for (packet, packet_resps) in zip(packets, resps):
+            if (len(packet_resps) != packet[1]):
+                raise ex.WnTransportError(self.transport,
+                                          "Received {0} responses for {1} commands".format(len(packet_resps), packet[1]))
+
+            for resp in packet_resps:
+                output.append(cmds[cmd_idx].process_resp(resp))
+                cmd_idx += 1
+
+        return output
+
+
+    def _add_batch_stats(self, cmd, tx_bytes, rx_bytes, attempts, latency):
+        """Internal method to add a command of a batch of pipelined packets
+        (see send_pipelined() of the transport) to stats.
 
+        A packet is only retransmitted after a timeout, so each attempt 
+        after the first is a timeout and a retransmission.  The latency is 
+        the latency of the packet of the command (or None if there was no
+        response).  Commands that were not sent (attempts of 0) are not
+        added.
+        """
+        if (attempts == 0):
+            return
+
+        cmd_stats = self.stats.get_cmd_stats(cmd.command, cmd.__class__.__name__)
+        cmd_stats.num_cmds            += 1
+        cmd_stats.num_retransmissions += attempts - 1
+        cmd_stats.tx_bytes            += attempts * tx_bytes
+        cmd_stats.rx_bytes            += rx_bytes
+
+        if latency is None:
+            cmd_stats.num_timeouts += attempts
+            cmd_stats.num_failures += 1
         else:
-            raise ex.WnTransportError(self.transport, 
-                                      "Unknown response type for command")
+            cmd_stats.num_timeouts += attempts - 1
+            cmd_stats.add_latency(latency)
+
+
+    def _add_mismatch_stats(self, cmds, num_mismatches):
+        """Internal method to add the transport header mismatches of a batch
+        of pipelined packets to stats.  The mismatches (ie late duplicates of
+        the responses) cannot be matched to a command, so they are added to 
+        the first command of the batch.
+        """
+        if cmds and num_mismatches:
+            cmd_stats = self.stats.get_cmd_stats(cmds[0].command, cmds[0].__class__.__name__)
+            cmd_stats.num_mismatches += num_mismatches
+
+
+    def _add_packets_stats(self, cmds, payloads, packets, pkt_stats, resps=None):
+        """Internal method to add the commands of the packets of send_cmds()
+        to stats.  The latency of each command is the latency of its packet.
+        """
+        cmd_idx = 0
+
+        for (idx, packet) in enumerate(packets):
+            (attempts, latency) = pkt_stats[idx] if pkt_stats else (0, None)
+
+            for num in range(packet[1]):
+                rx_bytes = 0
 
+                if resps and (num < len(resps[idx])):
+                    rx_bytes = resps[idx][num].sizeof()
 
-    def _receive_resp(self, payload, max_attempts):
-        """Internal method to receive a response for a given command payload"""
+                self._add_batch_stats(cmds[cmd_idx], len(payloads[cmd_idx]), 
+                                      rx_bytes, attempts, latency)
+                cmd_idx += 1
+
+
+    def _receive_resp(self, payload, max_attempts, cmd_stats):
+        """Internal method to receive a response for a given command payload
+        
+        Each attempt waits for the retransmission timeout of the transport 
+        (see get_rx_timeout()).  Since every attempt is sent with a new 
+        sequence number, the response always belongs to the last attempt and
+        its round trip time is used to update the RTT estimate.
+        """
         reply = b''
         curr_tx = 1
         done = False
         resp = wn_message.WnResp()
 
+        start_time = time.time()
         self.transport.send(payload)
+        cmd_stats.tx_bytes += len(payload)
 
         while not done:
             try:
-                reply = self.transport.receive()
+                reply = self.transport.receive(self.transport.get_rx_timeout(curr_tx == max_attempts))
             except ex.WnTransportError:
+                cmd_stats.num_timeouts += 1
+
                 if curr_tx == max_attempts:
                     raise ex.WnTransportError(self.transport, 
                                               "Max retransmissions without reply from node")
 
+                self.transport.rtt.backoff()
+
+                start_time = time.time()
                 self.transport.send(payload)
+                cmd_stats.tx_bytes += len(payload)
+                cmd_stats.num_retransmissions += 1
                 curr_tx += 1
             else:
+                self.transport.rtt.update(time.time() - start_time)
+                cmd_stats.rx_bytes += len(reply)
                 resp.deserialize(reply)
                 done = True
                 
         return resp
 
 
-    def _receive_buffer(self, cmd, payload, max_attempts):
-        """Internal method to receive a buffer for a given command payload"""
-        reply = b''
+    def _receive_buffer(self, cmd, payload, max_attempts, cmd_stats):
+        """Internal method to receive a buffer for a given command payload
+        
+        All packets that are queued on the transport are received and added
+        to the buffer as a batch (see receive_batch_pipelined()).
+        
+        If a timeout occurs before the buffer is complete, all missing byte
+        ranges of the buffer are requested again in one round (with 
+        BUFFER_RETRY_COPIES requests per range).  The start_byte of each 
+        response is relative to the start_byte of its request, so data for a
+        range request is offset by the start of that range within the 
+        buffer.  Responses to requests of earlier rounds (ie late packets) 
+        are still added to the buffer.
+        
+        NOTE:  Attempts are counted per round without new data, so a lost
+        range request or response only costs an attempt if no other data of
+        the round is received, and a transfer that continues to make 
+        progress will not fail.
+        
+        NOTE:  The time to the first packet of a buffer includes the time 
+        the node needs to prepare it, so it is not used as an RTT sample.
+        """
         curr_tx = 1
         resp = wn_message.WnBuffer(cmd.get_buffer_id(),
                                    cmd.get_buffer_flags(),
                                    cmd.get_buffer_size())
 
         self.transport.send(payload)
+        cmd_stats.tx_bytes += len(payload)
+
+        offsets = {self.transport.hdr.seq_num : 0}  # seq_num -> offset of the request
 
         while not resp.is_buffer_complete():
             try:
-                reply = self.transport.receive()
+                replies = self.transport.receive_batch_pipelined(offsets, 
+                              timeout=self.transport.get_rx_timeout(curr_tx == max_attempts))
             except ex.WnTransportError:
-                # If there is a timeout, then request missing part of the buffer
+                cmd_stats.num_timeouts += 1
+
+                # If there is a timeout, then request the missing parts of 
+                #   the buffer
                 if curr_tx == max_attempts:
                     raise ex.WnTransportError(self.transport, 
                                               "Max retransmissions without reply from node")
 
-                # TODO:  Currently, we are just requesting the entire buffer
-                #   over.  This is not a good long term solution and should 
-                #   eventually be changed to only request the missing piece
-                #   of the buffer
-                resp = wn_message.WnBuffer(cmd.get_buffer_id(),
-                                           cmd.get_buffer_flags(),
-                                           cmd.get_buffer_size())
-                
-                self.transport.send(payload)
+                self.transport.rtt.backoff()
+                self._request_buffer_ranges(cmd, resp, offsets, cmd_stats,
+                                            BUFFER_RETRY_COPIES)
                 curr_tx += 1
             else:
-                resp.add_data_to_buffer(reply)
-                    
+                num_bytes = resp.num_bytes
+
+                for (seq_num, reply) in replies:
+                    resp.add_data_to_buffer(reply, offsets[seq_num])
+                    cmd_stats.rx_bytes += len(reply)
+
+                # Only new data counts as progress (ie not late duplicates)
+                if (resp.num_bytes > num_bytes):
+                    curr_tx = 1
+                    self.transport.rtt.clear_backoff()
+
         return resp
+
+
+    def _get_chunk_window(self, chunk_size, window):
+        """Internal method to return the (chunk_size, window) of a chunked 
+        buffer transfer such that the outstanding chunks fit in the receive
+        buffer of the transport.
+
+        Only half of rx_buffer_size is used since Linux reports twice the 
+        requested size (the other half is bookkeeping overhead of the 
+        kernel) and every packet also uses memory for its headers.
+        """
+        # Data of a buffer packet follows the 24 byte buffer header
+        max_payload = self.transport.get_max_payload()
+        pkt_data    = (max_payload - 24) & ~0x3
+        rx_size     = self.transport.rx_buffer_size
+
+        if rx_size:
+            max_pkts = max(1, (rx_size // 2) // max_payload)
+        else:
+            max_pkts = None
+
+        if chunk_size is None:
+            num_pkts = BUFFER_CHUNK_PKTS
+
+            if max_pkts is not None:
+                num_pkts = max(1, min(num_pkts, max_pkts // max(1, window)))
+
+            chunk_size = num_pkts * pkt_data
+
+        if max_pkts is not None:
+            chunk_pkts = -(-chunk_size // pkt_data)
+            window     = max(1, min(window, max_pkts // chunk_pkts))
+
+        return (chunk_size, window)
+
+
+    def _receive_buffer_chunks(self, cmd, chunk_size, window, max_attempts, cmd_stats,
+                               storage=None):
+        """Internal method to receive a buffer as chunks (see 
+        send_cmd_chunked()).
+        
+        The start_byte of each response is relative to the start_byte of 
+        its chunk request, so the data is offset by the start of the chunk 
+        within the buffer.  Responses to chunk requests that were already
+        requested again (ie late packets) are still added to the buffer.
+        
+        NOTE:  Attempts are counted since the last time new data was 
+        received, so a transfer that continues to make progress will not 
+        fail.
+        """
+        curr_tx     = 1
+        size        = cmd.get_buffer_size()
+        chunks      = collections.deque([(offset, min(chunk_size, size - offset)) 
+                                         for offset in range(0, size, chunk_size)])
+        offsets     = {}           # seq_num -> offset of the chunk in the buffer
+                                   #   (kept after a timeout for late packets)
+        outstanding = {}           # seq_num -> (offset, size) of the chunk
+        resp = wn_message.WnBuffer(cmd.get_buffer_id(),
+                                   cmd.get_buffer_flags(),
+                                   size, storage=storage)
+
+        while (size > 0) and not resp.is_buffer_complete():
+            # Fill the window
+            while chunks and (len(outstanding) < window):
+                chunk = chunks.popleft()
+                seq_num = self._request_buffer_chunk(cmd, chunk, cmd_stats)
+                offsets[seq_num] = chunk[0]
+                outstanding[seq_num] = chunk
+
+            # Request the missing part of the buffer if all chunks are done
+            #   (ie data was lost but all outstanding chunks look complete)
+            if not outstanding:
+                chunks.extend(resp.get_missing_byte_ranges())
+                cmd_stats.num_retransmissions += 1
+                continue
+
+            try:
+                replies = self.transport.receive_batch_pipelined(offsets, 
+                              timeout=self.transport.get_rx_timeout(curr_tx == max_attempts))
+            except ex.WnTransportError:
+                cmd_stats.num_timeouts += 1
+
+                if curr_tx == max_attempts:
+                    raise ex.WnTransportError(self.transport, 
+                                              "Max retransmissions without reply from node")
+
+                # Request the missing part of each outstanding chunk again
+                #   (see BUFFER_RETRY_COPIES)
+                self.transport.rtt.backoff()
+
+                missing = set()
+
+                for chunk in outstanding.values():
+                    missing.update(resp.get_missing_byte_ranges(*chunk))
+
+                for chunk in sorted(missing, reverse=True):
+                    chunks.extendleft([chunk] * BUFFER_RETRY_COPIES)
+                    cmd_stats.num_retransmissions += BUFFER_RETRY_COPIES
+
+                outstanding.clear()
+                curr_tx += 1
+            else:
+                updated   = set()
+                num_bytes = resp.num_bytes
+
+                for (seq_num, reply) in replies:
+                    resp.add_data_to_buffer(reply, offsets[seq_num])
+                    cmd_stats.rx_bytes += len(reply)
+                    updated.add(seq_num)
+
+                # Only new data counts as progress (ie not empty responses)
+                if (resp.num_bytes > num_bytes):
+                    curr_tx = 1
+                    self.transport.rtt.clear_backoff()
+
+                # Free the window slot of each chunk that is complete (ie 
+                #   also by the response to another copy of the request).  
+                #   The node sends the packets of a chunk in order, so if the
+                #   end of a chunk has been received, the missing parts of 
+                #   the chunk were lost and are requested again without 
+                #   waiting for a timeout.
+                for seq_num in list(outstanding.keys()):
+                    chunk   = outstanding[seq_num]
+                    missing = resp.get_missing_byte_ranges(*chunk)
+
+                    if not missing:
+                        del outstanding[seq_num]
+                        del offsets[seq_num]
+                    elif (seq_num in updated) and (sum(missing[-1]) < sum(chunk)):
+                        del outstanding[seq_num]
+                        chunks.extendleft(reversed(missing))
+                        cmd_stats.num_retransmissions += len(missing)
+
+        return resp
+
+
+    def _request_buffer_chunk(self, cmd, chunk, cmd_stats):
+        """Internal method to request the (start_byte, size) chunk of the
+        buffer of cmd.  Returns the sequence number of the request."""
+        chunk_cmd = wn_message.WnBufferCmd(command=cmd.command,
+                                           buffer_id=cmd.get_buffer_id(),
+                                           flags=cmd.get_buffer_flags(),
+                                           start_byte=(cmd.get_buffer_start_byte() + chunk[0]),
+                                           size=chunk[1])
+
+        payload = chunk_cmd.serialize()
+        self.transport.send(payload)
+        cmd_stats.tx_bytes += len(payload)
+
+        return self.transport.hdr.seq_num
+
+
+    def _request_buffer_ranges(self, cmd, resp, offsets, cmd_stats, copies=1):
+        """Internal method to request all missing byte ranges of the 
+        WnBuffer resp (each with the given number of copies).  The offset of
+        each request is added to offsets.
+        """
+        ranges = resp.get_missing_byte_ranges()
+
+        for curr_range in ranges:
+            for _ in range(copies):
+                seq_num = self._request_buffer_chunk(cmd, curr_range, cmd_stats)
+                offsets[seq_num] = curr_range[0]
+
+        cmd_stats.num_retransmissions += copies * len(ranges)
         
     
     def send_cmd_bcast(self, cmd):
         """Send the provided command over the broadcast transport.
 
-        NOTE:  Currently, broadcast commands cannot have a response.
+        NOTE:  Broadcast commands sent with this method cannot have a 
+        response.  See wn_util.wn_send_cmd_bcast() to send a broadcast 
+        command to many nodes and collect their responses.
         
         Attributes:
             cmd -- WnCommand to send
@@ -391,13 +938,17 @@ class WnNode(object):
         receive queue.  It will empty the queue and return them all the 
         calling method."""
         
-        output = []
-        
         resp = self.transport.receive()
         
+        return self._split_resp(resp)
+
+
+    def _split_resp(self, resp):
+        """Internal method to return the list of WnResp objects in resp (ie 
+        when the bytes of resp are a concatenation of many responses)."""
+        output = []
+        
         if resp:
-            # Create a list of response object if the list of bytes is a 
-            # concatenation of many responses
             done = False
             
             while not done:
@@ -415,6 +966,14 @@ class WnNode(object):
         return output
 
 
+    def _get_cache_descriptor(self, jumbo_frame_support):
+        """Internal method to return the descriptor of the node for the node
+        cache (ie the descriptor and the jumbo frame support)."""
+        descriptor = self.get_descriptor()
+        descriptor['jumbo_frame_support'] = str(jumbo_frame_support)
+        return descriptor
+
+
     #-------------------------------------------------------------------------
     # Misc methods for the Node
     #-------------------------------------------------------------------------
@@ -474,8 +1033,13 @@ class WnNodeFactory(WnNode):
     
     Attributes:
         warpnet_dict -- Dictionary of WARPNet Node Types to class names
+        node_cache -- WnNodeCache of the nodes (optional; with a node cache,
+                      the node info is requested instead of the WARPNet 
+                      type so that a cached node is configured without 
+                      further commands)
     """
     wn_dict             = None
+    node_cache          = None
 
 
     def __init__(self):
@@ -502,17 +1066,23 @@ class WnNodeFactory(WnNode):
                                     bcast_port=node_dict['bcast_port'])
 
 
-    def create_node(self):
+    def create_node(self, raise_errors=False):
         """Based on the WARPNet Node Type, dynamically create and return 
-        the correct WARPNet node."""        
+        the correct WARPNet node.
+        
+        Attributes:
+            raise_errors -- Raise a WnTransportError (node is not responding)
+                            or WnNodeError (unknown WARPNet type) exception
+                            instead of printing the error and returning None
+        """        
         node = None
 
-        # Send broadcast command to initialize WARPNet node
-        self.setup_node_network_inf()
-
         try:
+            # Send broadcast command to initialize WARPNet node
+            self.setup_node_network_inf()
+
             # Send unicast command to get the WARPNet type
-            wn_node_type = self.get_warpnet_node_type()
+            (wn_node_type, node_info) = self.get_node_type_info()
             
             # Get the node class from the Factory dictionary
             node_class = self.get_node_class(wn_node_type)
@@ -526,12 +1096,21 @@ class WnNodeFactory(WnNode):
                                             ip_address=self.transport.ip_address,
                                             unicast_port=self.transport.unicast_port,
                                             bcast_port=self.transport.bcast_port)
+                node._node_info = node_info
             else:
-                print("ERROR:  Unknown WARPNet type: {0}".format(wn_node_type))
-                print("    Unable to initialize node", 
-                      "W3-a-{0:05d}".format(self.serial_number))
+                raise ex.WnNodeError("W3-a-{0:05d}".format(self.serial_number),
+                                     "Unknown WARPNet type: {0}".format(wn_node_type))
+
+        except ex.WnNodeError as err:
+            if raise_errors:
+                raise
+            print("ERROR:  {0}".format(err.message))
+            print("    Unable to initialize node", 
+                  "W3-a-{0:05d}".format(self.serial_number))
 
         except ex.WnTransportError:
+            if raise_errors:
+                raise
             print("ERROR:  Node W3-a-{0:05d}".format(self.serial_number),
                   "is not responding.")
             print("    Please ensure the node is powered on and is properly",
@@ -540,6 +1119,33 @@ class WnNodeFactory(WnNode):
         return node
 
 
+    def get_node_type_info(self):
+        """Return (WARPNet node type, node info) of the node.
+        
+        With a node cache, the node type is taken from the node info (the 
+        node info is kept for configure_node()); otherwise only the node 
+        type is requested and the node info is None.
+        """
+        if self.node_cache is not None:
+            node_info = self.get_node_info()
+            values    = _get_parameter_values(node_info, wn_cmds.GRPID_NODE, NODE_TYPE)
+
+            if values:
+                return (values[0], node_info)
+
+        return (self.get_warpnet_node_type(), None)
+
+
+    def copy(self):
+        """Return a copy of the factory with its own transports (ie so that 
+        nodes can be created in parallel with one factory per thread)."""
+        factory = copy.copy(self)
+        factory.transport = None
+        factory.transport_bcast = None
+        factory.stats = wn_stats.WnNodeStats()
+        return factory
+
+
     def add_node_class(self, wn_node_type, class_name):
         if (wn_node_type in self.wn_dict):
             print("WARNING: Changing definition of {0}".format(wn_node_type))
@@ -567,17 +1173,23 @@ class WnNodeFactory(WnNode):
 
 
 
+#-----------------------------------------------------------------------------
+# Internal helper methods
+#-----------------------------------------------------------------------------
+def _get_parameter_values(parameters, group, identifier):
+    """Internal method to return the values of a parameter (see 
+    WnNode.process_parameters()) or None if the parameter is not present."""
+    param_start = 0
 
+    while ((param_start + 1) < len(parameters)):
+        param_group      = (parameters[param_start] & 0x00FF0000) >> 16
+        param_length     = (parameters[param_start] & 0x0000FFFF)
+        param_identifier = parameters[param_start + 1]
+        value_start      = param_start + 2
 
+        if (param_group == group) and (param_identifier == identifier):
+            return parameters[value_start:(value_start + param_length)]
 
+        param_start = value_start + param_length
 
-
-
-
-
-
-
-
-
-
-
+    return None
@@ -0,0 +1,438 @@
+# -*- coding: utf-8 -*-
+"""
+------------------------------------------------------------------------------
+WARPNet Node - asyncio Interface
+------------------------------------------------------------------------------
+Authors:   Chris Hunter (chunter [at] mangocomm.com)
+           Patrick Murphy (murphpo [at] mangocomm.com)
+           Erik Welsh (welsh [at] mangocomm.com)
+License:   Copyright 2014, Mango Communications. All rights reserved.
+           Distributed under the WARP license (http://warpproject.org/license)
+------------------------------------------------------------------------------
+MODIFICATION HISTORY:
+
+Ver   Who  Date     Changes
+----- ---- -------- -----------------------------------------------------
+1.00a ejw  10/17/26 Initial release
+
+------------------------------------------------------------------------------
+
+This module provides an asyncio interface for WARPNet nodes (Python 3 only).
+
+All nodes share one WnTransportEthUdpAsync, an asyncio.DatagramProtocol that
+demultiplexes responses by the (src_id, seq_num) of their transport header.
+WnNodeAsync wraps a WnNode that has already been initialized (ie by
+wn_util.wn_init_nodes()) and provides coroutine versions of its commands, so
+that commands to many nodes can run concurrently with asyncio.gather():
+
+    async def main(nodes):
+        async_nodes = await wn_node_async.create_nodes(nodes)
+        await asyncio.gather(*[n.send_cmd(cmd) for n in async_nodes])
+
+NOTE:  A WnNodeAsync uses the transport header (and therefore the sequence
+number) of the WnNode it wraps.  Do not send commands with the WnNode while
+commands of the WnNodeAsync are outstanding.
+
+Functions (see below for more information):
+    WnTransportEthUdpAsync() -- asyncio Ethernet UDP transport for all nodes
+    WnNodeAsync() -- asyncio interface for a WARPNet node
+    create_transport() -- Coroutine to open a WnTransportEthUdpAsync
+    create_nodes() -- Coroutine to create a WnNodeAsync for each node
+
+"""
+
+import time
+import errno
+import socket
+import struct
+import asyncio
+
+from . import wn_node
+from . import wn_message
+from . import wn_exception as ex
+from . import wn_transport
+from . import wn_transport_eth_udp_py
+
+
+__all__ = ['WnTransportEthUdpAsync', 'WnNodeAsync', 'create_transport',
+           'create_nodes']
+
+
+class WnTransportEthUdpAsync(asyncio.DatagramProtocol):
+    """Class for an asyncio Ethernet UDP transport shared by many nodes.
+
+    Packets are only kept for the (src_id, seq_num) keys that are being
+    waited on (ie from send() until release()).
+
+    Attributes:
+        transport -- asyncio.DatagramTransport of the socket
+        hdr_len -- Length of the padding and transport header of a packet
+        rx_buffer_size -- OS's receive buffer size (in bytes)
+        tx_buffer_size -- OS's transmit buffer size (in bytes)
+    """
+    transport      = None
+    hdr_len        = None
+    rx_buffer_size = None
+    tx_buffer_size = None
+
+    def __init__(self):
+        self.hdr_len = 2 + struct.calcsize('!2H 2B 3H')
+        self._queues = {}
+
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+        sock = transport.get_extra_info('socket')
+
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, wn_transport_eth_udp_py.REQUESTED_BUF_SIZE)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, wn_transport_eth_udp_py.REQUESTED_BUF_SIZE)
+        except socket.error as serr:
+            # On some HW we cannot set the buffer size
+            if serr.errno != errno.ENOBUFS:
+                raise serr
+
+        self.tx_buffer_size = sock.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF)
+        self.rx_buffer_size = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+
+
+    def datagram_received(self, data, addr):
+        if (len(data) >= self.hdr_len):
+            hdr = struct.unpack('!2H 2B 3H', data[2:self.hdr_len])
+            queue = self._queues.get((hdr[1], hdr[5]))
+
+            if queue is not None:
+                queue.put_nowait(data[self.hdr_len:])
+
+
+    def error_received(self, exc):
+        print("Transport error:  {0}".format(exc))
+
+
+    def close(self):
+        """Closes the socket."""
+        if self.transport:
+            self.transport.close()
+            self.transport = None
+
+
+    def send(self, hdr, payload, address, robust=True):
+        """Send a message with the given WnTransportHeader to address.
+
+        Returns the (src_id, seq_num) key of the response if robust (the key
+        must be released with release()); otherwise returns None.
+        """
+        if robust:
+            hdr.response_required()
+        else:
+            hdr.response_not_required()
+
+        hdr.set_length(len(payload))
+        hdr.increment()
+
+        key = None
+
+        if robust:
+            key = (hdr.dest_id, hdr.seq_num)
+            if not key in self._queues:
+                self._queues[key] = asyncio.Queue()
+
+        # Pad the data with two extra bytes for 32 bit alignment after the
+        #   ethernet header
+        self.transport.sendto(bytes(b'\x00\x00' + hdr.serialize() + payload), address)
+
+        return key
+
+
+    async def receive(self, key, timeout):
+        """Return the next response for key.
+
+        Raises a WnTransportError exception if a timeout occurs.
+        """
+        try:
+            return await asyncio.wait_for(self._queues[key].get(), timeout)
+        except asyncio.TimeoutError:
+            raise ex.WnTransportError(self, "Transport receive timed out.")
+
+
+    async def receive_batch_any(self, keys, timeout):
+        """Return a list of (key, response) of all responses that have been
+        received for any of the keys.
+
+        Waits for at least one response.  Raises a WnTransportError exception
+        if a timeout occurs.
+        """
+        output = self._get_nowait(keys)
+
+        if not output:
+            getters = dict([(asyncio.ensure_future(self._queues[key].get()), key) 
+                            for key in keys])
+            try:
+                await asyncio.wait(list(getters.keys()), timeout=timeout,
+                                   return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for getter in getters.keys():
+                    if not getter.done():
+                        getter.cancel()
+
+            for (getter, key) in getters.items():
+                if getter.done() and not getter.cancelled():
+                    output.append((key, getter.result()))
+
+            if not output:
+                raise ex.WnTransportError(self, "Transport receive timed out.")
+
+            output.extend(self._get_nowait(keys))
+
+        return output
+
+
+    def release(self, key):
+        """Stop keeping responses for key."""
+        self._queues.pop(key, None)
+
+
+    #-------------------------------------------------------------------------
+    # Internal helper methods
+    #-------------------------------------------------------------------------
+    def _get_nowait(self, keys):
+        """Internal method to return a list of (key, response) of the 
+        responses that are already queued for the keys."""
+        output = []
+
+        for key in keys:
+            queue = self._queues[key]
+            while not queue.empty():
+                output.append((key, queue.get_nowait()))
+
+        return output
+
+
+# End Class WnTransportEthUdpAsync
+
+
+
+class WnNodeAsync(object):
+    """Class for the asyncio interface of a WARPNet node.
+
+    Attributes:
+        node -- WnNode (already initialized) that is wrapped
+        transport -- WnTransportEthUdpAsync used to communicate with the node
+        node_id -- Unique identification for this node
+        name -- User specified name for this node
+        serial_number -- Node's serial number
+    """
+    node          = None
+    transport     = None
+    node_id       = None
+    name          = None
+    serial_number = None
+
+    def __init__(self, node, transport):
+        self.node          = node
+        self.transport     = transport
+        self.node_id       = node.node_id
+        self.name          = node.name
+        self.serial_number = node.serial_number
+
+    def __repr__(self):
+        return "{0}({1})".format(self.__class__.__name__, repr(self.node))
+
+
+    #-------------------------------------------------------------------------
+    # Transmit / Receive methods for the Node
+    #-------------------------------------------------------------------------
+    async def send_cmd(self, cmd, max_attempts=2):
+        """Send the provided command (see WnNode.send_cmd()).
+
+        The command is recorded in the stats of the wrapped node.
+
+        Attributes:
+            cmd -- WnCommand to send
+            max_attempts -- Maximum number of attempts to send a given command
+        """
+        resp_type = cmd.get_resp_type()
+        payload = cmd.serialize()
+
+        cmd_stats = self.node.stats.get_cmd_stats(cmd.command, cmd.__class__.__name__)
+        cmd_stats.num_cmds += 1
+
+        if  (resp_type == wn_transport.TRANSPORT_NO_RESP):
+            cmd_stats.tx_bytes += len(payload)
+            self._send(payload, robust=False)
+            return
+
+        start_time = time.time()
+
+        try:
+            if (resp_type == wn_transport.TRANSPORT_WN_RESP):
+                resp = await self._receive_resp(payload, max_attempts, cmd_stats)
+
+            elif (resp_type == wn_transport.TRANSPORT_WN_BUFFER):
+                resp = await self._receive_buffer(cmd, payload, max_attempts, cmd_stats)
+
+            else:
+                raise ex.WnTransportError(self.transport,
+                                          "Unknown response type for command")
+        except ex.WnTransportError:
+            cmd_stats.num_failures += 1
+            raise
+
+        cmd_stats.add_latency(time.time() - start_time)
+
+        return cmd.process_resp(resp)
+
+
+    #-------------------------------------------------------------------------
+    # Internal helper methods
+    #-------------------------------------------------------------------------
+    def _send(self, payload, robust=True):
+        """Internal method to send a payload to the node."""
+        node_transport = self.node.transport
+
+        return self.transport.send(node_transport.hdr, payload,
+                                   (node_transport.ip_address, node_transport.unicast_port),
+                                   robust)
+
+
+    async def _receive_resp(self, payload, max_attempts, cmd_stats):
+        """Internal method to receive a response for a given command payload
+
+        Retransmission timeouts and RTT samples follow WnNode._receive_resp()
+        (using the RTT estimator of the wrapped node's transport).
+        """
+        node_transport = self.node.transport
+
+        for curr_tx in range(1, max_attempts + 1):
+            timeout = node_transport.get_rx_timeout(curr_tx == max_attempts)
+            start_time = time.time()
+            key = self._send(payload)
+            cmd_stats.tx_bytes += len(payload)
+
+            if (curr_tx > 1):
+                cmd_stats.num_retransmissions += 1
+
+            try:
+                reply = await self.transport.receive(key, timeout)
+            except ex.WnTransportError:
+                cmd_stats.num_timeouts += 1
+                node_transport.rtt.backoff()
+            else:
+                node_transport.rtt.update(time.time() - start_time)
+                cmd_stats.rx_bytes += len(reply)
+                resp = wn_message.WnResp()
+                resp.deserialize(reply)
+                return resp
+            finally:
+                self.transport.release(key)
+
+        raise ex.WnTransportError(self.transport,
+                                  "Max retransmissions without reply from node")
+
+
+    async def _receive_buffer(self, cmd, payload, max_attempts, cmd_stats):
+        """Internal method to receive a buffer for a given command payload
+
+        Retransmission of missing byte ranges follows WnNode._receive_buffer().
+        """
+        node_transport = self.node.transport
+        curr_tx = 1
+        resp = wn_message.WnBuffer(cmd.get_buffer_id(),
+                                   cmd.get_buffer_flags(),
+                                   cmd.get_buffer_size())
+
+        offsets = {self._send(payload) : 0}     # key -> offset of the request
+        cmd_stats.tx_bytes += len(payload)
+
+        try:
+            while not resp.is_buffer_complete():
+                try:
+                    timeout = node_transport.get_rx_timeout(curr_tx == max_attempts)
+                    replies = await self.transport.receive_batch_any(list(offsets.keys()), timeout)
+                except ex.WnTransportError:
+                    cmd_stats.num_timeouts += 1
+
+                    # If there is a timeout, then request the missing parts 
+                    #   of the buffer
+                    if curr_tx == max_attempts:
+                        raise ex.WnTransportError(self.transport,
+                                                  "Max retransmissions without reply from node")
+
+                    node_transport.rtt.backoff()
+
+                    self._request_buffer_ranges(cmd, resp, offsets, cmd_stats,
+                                                wn_node.BUFFER_RETRY_COPIES)
+                    curr_tx += 1
+                else:
+                    num_bytes = resp.num_bytes
+
+                    for (key, reply) in replies:
+                        resp.add_data_to_buffer(reply, offsets[key])
+                        cmd_stats.rx_bytes += len(reply)
+
+                    # Only new data counts as progress
+                    if (resp.num_bytes > num_bytes):
+                        curr_tx = 1
+                        node_transport.rtt.clear_backoff()
+        finally:
+            for key in offsets.keys():
+                self.transport.release(key)
+
+        return resp
+
+
+    def _request_buffer_ranges(self, cmd, resp, offsets, cmd_stats, copies=1):
+        """Internal method to request all missing byte ranges of the
+        WnBuffer resp (each with the given number of copies).  The offset of
+        each request is added to offsets.
+        """
+        ranges = resp.get_missing_byte_ranges()
+
+        for (start_byte, size) in ranges:
+            range_cmd = wn_message.WnBufferCmd(command=cmd.command,
+                                               buffer_id=cmd.get_buffer_id(),
+                                               flags=cmd.get_buffer_flags(),
+                                               start_byte=(cmd.get_buffer_start_byte() + start_byte),
+                                               size=size)
+
+            payload = range_cmd.serialize()
+
+            for _ in range(copies):
+                offsets[self._send(payload)] = start_byte
+                cmd_stats.tx_bytes += len(payload)
+
+        cmd_stats.num_retransmissions += copies * len(ranges)
+
+
+# End Class WnNodeAsync
+
+
+
+async def create_transport(local_addr=('0.0.0.0', 0)):
+    """Coroutine that opens and returns a WnTransportEthUdpAsync."""
+    loop = asyncio.get_running_loop()
+
+    (_, protocol) = await loop.create_datagram_endpoint(WnTransportEthUdpAsync,
+                                                        local_addr=local_addr,
+                                                        allow_broadcast=True)
+    return protocol
+
+# End of create_transport()
+
+
+async def create_nodes(nodes, transport=None, node_class=WnNodeAsync):
+    """Coroutine that returns a list of node_class objects (one for each of
+    the initialized nodes) that share one transport.
+
+    Attributes:
+        nodes -- List of initialized WnNode objects
+        transport -- WnTransportEthUdpAsync to use (optional)
+        node_class -- Sub-class of WnNodeAsync to create (optional)
+    """
+    if transport is None:
+        transport = await create_transport()
+
+    return [node_class(node, transport) for node in nodes]
+
+# End of create_nodes()
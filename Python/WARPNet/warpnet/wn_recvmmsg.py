@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+------------------------------------------------------------------------------
+WARPNet Batched Datagram Receive
+------------------------------------------------------------------------------
+Authors:   Chris Hunter (chunter [at] mangocomm.com)
+           Patrick Murphy (murphpo [at] mangocomm.com)
+           Erik Welsh (welsh [at] mangocomm.com)
+License:   Copyright 2014, Mango Communications. All rights reserved.
+           Distributed under the WARP license (http://warpproject.org/license)
+------------------------------------------------------------------------------
+MODIFICATION HISTORY:
+
+Ver   Who  Date     Changes
+----- ---- -------- -----------------------------------------------------
+1.00a ejw  10/17/26 Initial release
+
+------------------------------------------------------------------------------
+
+This module provides a batched datagram receive for WARPNet transports.  On
+Linux, all datagrams waiting in a socket's receive queue are read with a
+single recvmmsg() system call (via ctypes).  On other platforms, the socket
+is drained with a non-blocking receive loop.
+
+Functions (see below for more information):
+    WnRecvBatch() -- Preallocated buffers for receiving a batch of datagrams
+    recvmmsg_supported() -- Is recvmmsg() available on this platform
+
+Integer constants:
+    DEFAULT_BATCH_SIZE -- Default maximum number of datagrams per batch
+
+"""
+
+import sys
+import errno
+import socket
+import ctypes
+import ctypes.util
+
+
+__all__ = ['WnRecvBatch', 'recvmmsg_supported']
+
+
+DEFAULT_BATCH_SIZE = 64
+
+MSG_DONTWAIT       = getattr(socket, 'MSG_DONTWAIT', 0x40)
+
+_WOULD_BLOCK       = (errno.EAGAIN, errno.EWOULDBLOCK,
+                      getattr(errno, 'WSAEWOULDBLOCK', errno.EWOULDBLOCK))
+
+
+#-----------------------------------------------------------------------------
+# recvmmsg() definitions (see <sys/socket.h>)
+#-----------------------------------------------------------------------------
+class _IoVec(ctypes.Structure):
+    _fields_ = [('iov_base',       ctypes.c_void_p),
+                ('iov_len',        ctypes.c_size_t)]
+
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [('msg_name',       ctypes.c_void_p),
+                ('msg_namelen',    ctypes.c_uint32),
+                ('msg_iov',        ctypes.POINTER(_IoVec)),
+                ('msg_iovlen',     ctypes.c_size_t),
+                ('msg_control',    ctypes.c_void_p),
+                ('msg_controllen', ctypes.c_size_t),
+                ('msg_flags',      ctypes.c_int)]
+
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [('msg_hdr',        _MsgHdr),
+                ('msg_len',        ctypes.c_uint)]
+
+
+def _load_recvmmsg():
+    """Internal method to return the libc recvmmsg() function (or None)."""
+    if not sys.platform.startswith('linux'):
+        return None
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        func = libc.recvmmsg
+    except (OSError, AttributeError):
+        return None
+
+    func.argtypes = [ctypes.c_int, ctypes.POINTER(_MMsgHdr), ctypes.c_uint,
+                     ctypes.c_int, ctypes.c_void_p]
+    func.restype  = ctypes.c_int
+
+    return func
+
+
+_recvmmsg = _load_recvmmsg()
+
+
+def recvmmsg_supported():
+    """Returns True if recvmmsg() can be used on this platform."""
+    return _recvmmsg is not None
+
+
+
+class WnRecvBatch(object):
+    """Class for receiving a batch of datagrams into preallocated buffers.
+
+    Each datagram is received into its own slot of one contiguous buffer.
+    The datagrams returned by recv() are memoryviews of those slots, so they
+    are only valid until the next call to recv().
+
+    Attributes:
+        max_pkts -- Maximum number of datagrams received per batch
+        pkt_len -- Maximum size of a datagram (larger datagrams are truncated)
+        buffer -- Receive buffer (max_pkts slots of pkt_len bytes)
+        use_recvmmsg -- Use recvmmsg() to receive the batch
+    """
+    max_pkts     = None
+    pkt_len      = None
+    buffer       = None
+    use_recvmmsg = None
+
+    def __init__(self, pkt_len, max_pkts=DEFAULT_BATCH_SIZE, use_recvmmsg=True):
+        self.max_pkts = max_pkts
+        self.pkt_len = pkt_len
+        self.buffer = bytearray(max_pkts * pkt_len)
+        self.use_recvmmsg = use_recvmmsg and recvmmsg_supported()
+
+        self._view = memoryview(self.buffer)
+
+        if self.use_recvmmsg:
+            self._setup_msgs()
+
+
+    def recv(self, sock):
+        """Return a list of all datagrams (up to max_pkts) that are waiting in
+        the receive queue of sock.  Does not block.
+        """
+        if self.use_recvmmsg:
+            return self._recv_mmsg(sock)
+        else:
+            return self._recv_loop(sock)
+
+
+    #-------------------------------------------------------------------------
+    # Internal helper methods
+    #-------------------------------------------------------------------------
+    def _setup_msgs(self):
+        """Internal method to point one mmsghdr / iovec at each buffer slot."""
+        self._c_buffer = (ctypes.c_char * len(self.buffer)).from_buffer(self.buffer)
+        self._iovecs = (_IoVec * self.max_pkts)()
+        self._msgs = (_MMsgHdr * self.max_pkts)()
+
+        base_addr = ctypes.addressof(self._c_buffer)
+
+        for i in range(self.max_pkts):
+            self._iovecs[i].iov_base = base_addr + (i * self.pkt_len)
+            self._iovecs[i].iov_len = self.pkt_len
+            self._msgs[i].msg_hdr.msg_iov = ctypes.pointer(self._iovecs[i])
+            self._msgs[i].msg_hdr.msg_iovlen = 1
+
+
+    def _recv_mmsg(self, sock):
+        """Internal method to receive the batch with a single recvmmsg()."""
+        num_pkts = _recvmmsg(sock.fileno(), self._msgs, self.max_pkts,
+                             MSG_DONTWAIT, None)
+
+        if (num_pkts < 0):
+            err = ctypes.get_errno()
+            if (err in _WOULD_BLOCK) or (err == errno.EINTR):
+                return []
+            raise socket.error(err, "recvmmsg failed")
+
+        output = []
+
+        for i in range(num_pkts):
+            start = i * self.pkt_len
+            output.append(self._view[start:(start + self._msgs[i].msg_len)])
+
+        return output
+
+
+    def _recv_loop(self, sock):
+        """Internal method to receive the batch with a non-blocking loop."""
+        output = []
+        timeout = sock.gettimeout()
+
+        sock.settimeout(0.0)
+
+        try:
+            while (len(output) < self.max_pkts):
+                start = len(output) * self.pkt_len
+
+                try:
+                    recv_len = sock.recv_into(self._view[start:(start + self.pkt_len)])
+                except socket.error as err:
+                    if err.args[0] in _WOULD_BLOCK:
+                        break
+                    raise
+
+                output.append(self._view[start:(start + recv_len)])
+        finally:
+            sock.settimeout(timeout)
+
+        return output
+
+
+# End Class WnRecvBatch
@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+------------------------------------------------------------------------------
+WARPNet Statistics
+------------------------------------------------------------------------------
+Authors:   Chris Hunter (chunter [at] mangocomm.com)
+           Patrick Murphy (murphpo [at] mangocomm.com)
+           Erik Welsh (welsh [at] mangocomm.com)
+License:   Copyright 2014, Mango Communications. All rights reserved.
+           Distributed under the WARP license (http://warpproject.org/license)
+------------------------------------------------------------------------------
+MODIFICATION HISTORY:
+
+Ver   Who  Date     Changes
+----- ---- -------- -----------------------------------------------------
+1.00a ejw  10/17/26 Initial release
+
+------------------------------------------------------------------------------
+
+This module provides statistics of the commands sent to WARPNet nodes.
+
+Every WnNode records the statistics of the commands sent with send_cmd() in
+its stats attribute (a WnNodeStats).  For each command ID, the statistics
+are:  a latency histogram, the number of commands, retransmissions,
+timeouts, failures (no reply after max attempts) and transport header
+mismatches (replies that did not match the outstanding request), and the
+number of payload bytes sent and received.
+
+For example:
+    node.stats.get_cmd_stats(command).get_percentile(99)
+    wn_stats.wn_stats_dump(nodes, 'stats.json')
+
+Functions (see below for more information):
+    WnCmdStats() -- Statistics of one command ID
+    WnNodeStats() -- Statistics of all commands of a node
+    wn_stats_snapshot() -- Snapshot of the statistics of a list of nodes
+    wn_stats_dump() -- Print or save the statistics of a list of nodes
+
+Integer constants:
+    WN_STATS_LATENCY_BINS -- Upper edges (in sec) of the latency histogram
+
+"""
+
+import json
+import time
+import bisect
+
+
+__all__ = ['WnCmdStats', 'WnNodeStats', 'wn_stats_snapshot', 'wn_stats_dump']
+
+
+# Upper edges (in sec) of the latency histogram bins; the last bin of the
+#   histogram counts all larger latencies
+WN_STATS_LATENCY_BINS = [0.0001, 0.0002, 0.0005, 0.001, 0.002, 0.005,
+                         0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0]
+
+
+class WnCmdStats(object):
+    """Class for the statistics of one command ID.
+
+    Attributes:
+        command -- Command (ie (group << 24) | command ID)
+        name -- Name of the command (ie class name)
+        num_cmds -- Number of commands sent
+        num_retransmissions -- Number of retransmissions (including buffer
+                               range requests)
+        num_timeouts -- Number of receive timeouts
+        num_failures -- Number of commands without a reply after max attempts
+        num_mismatches -- Number of transport header mismatches
+        tx_bytes -- Number of payload bytes sent
+        rx_bytes -- Number of payload bytes received
+        latency_hist -- Number of commands per latency bin (see
+                        WN_STATS_LATENCY_BINS)
+        latency_min -- Minimum latency (in sec)
+        latency_max -- Maximum latency (in sec)
+        latency_sum -- Sum of the latencies (in sec)
+    """
+    __slots__ = ('command', 'name', 'num_cmds', 'num_retransmissions',
+                 'num_timeouts', 'num_failures', 'num_mismatches', 'tx_bytes',
+                 'rx_bytes', 'latency_hist', 'latency_min', 'latency_max',
+                 'latency_sum')
+
+    def __init__(self, command, name=None):
+        self.command             = command
+        self.name                = name
+        self.num_cmds            = 0
+        self.num_retransmissions = 0
+        self.num_timeouts        = 0
+        self.num_failures        = 0
+        self.num_mismatches      = 0
+        self.tx_bytes            = 0
+        self.rx_bytes            = 0
+        self.latency_hist        = [0] * (len(WN_STATS_LATENCY_BINS) + 1)
+        self.latency_min         = None
+        self.latency_max         = None
+        self.latency_sum         = 0.0
+
+    def add_latency(self, latency):
+        """Add the latency (in sec) of a command with a reply."""
+        self.latency_hist[bisect.bisect_left(WN_STATS_LATENCY_BINS, latency)] += 1
+        self.latency_sum += latency
+
+        if (self.latency_min is None) or (latency < self.latency_min):
+            self.latency_min = latency
+
+        if (self.latency_max is None) or (latency > self.latency_max):
+            self.latency_max = latency
+
+    def get_mean(self):
+        """Return the mean latency (in sec) or None if there are no
+        latencies."""
+        num_latencies = sum(self.latency_hist)
+
+        if (num_latencies == 0):
+            return None
+
+        return self.latency_sum / num_latencies
+
+    def get_percentile(self, percent):
+        """Return the upper edge (in sec) of the histogram bin that contains
+        the given percentile of the latencies (or latency_max for the last
+        bin) or None if there are no latencies."""
+        num_latencies = sum(self.latency_hist)
+
+        if (num_latencies == 0):
+            return None
+
+        count = 0
+
+        for (idx, num) in enumerate(self.latency_hist):
+            count += num
+            if (count >= (percent / 100.0) * num_latencies):
+                break
+
+        if (idx < len(WN_STATS_LATENCY_BINS)):
+            return min(WN_STATS_LATENCY_BINS[idx], self.latency_max)
+        else:
+            return self.latency_max
+
+    def snapshot(self):
+        """Return the statistics as a dictionary."""
+        return {'command'             : self.command,
+                'name'                : self.name,
+                'num_cmds'            : self.num_cmds,
+                'num_retransmissions' : self.num_retransmissions,
+                'num_timeouts'        : self.num_timeouts,
+                'num_failures'        : self.num_failures,
+                'num_mismatches'      : self.num_mismatches,
+                'tx_bytes'            : self.tx_bytes,
+                'rx_bytes'            : self.rx_bytes,
+                'latency_bins'        : WN_STATS_LATENCY_BINS,
+                'latency_hist'        : list(self.latency_hist),
+                'latency_min'         : self.latency_min,
+                'latency_max'         : self.latency_max,
+                'latency_mean'        : self.get_mean(),
+                'latency_p50'         : self.get_percentile(50),
+                'latency_p99'         : self.get_percentile(99)}
+
+    def __str__(self):
+        msg = "0x{0:08x} {1:32s}: {2:8d} cmds".format(self.command, str(self.name), self.num_cmds)
+
+        if (self.get_mean() is not None):
+            msg += ", mean {0:9.3f} ms, p99 <= {1:9.3f} ms".format(1000 * self.get_mean(),
+                                                                   1000 * self.get_percentile(99))
+
+        msg += ", {0} retx, {1} timeouts, {2} failures, {3} mismatches".format(
+                   self.num_retransmissions, self.num_timeouts, self.num_failures,
+                   self.num_mismatches)
+        return msg
+
+# End Class WnCmdStats
+
+
+
+class WnNodeStats(object):
+    """Class for the statistics of all commands of a node.
+
+    Attributes:
+        cmds -- Dictionary of command to WnCmdStats
+        start_time -- Time of the creation (or last reset) of the statistics
+    """
+    cmds       = None
+    start_time = None
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Clear all statistics."""
+        self.cmds       = {}
+        self.start_time = time.time()
+
+    def get_cmd_stats(self, command, name=None):
+        """Return the WnCmdStats of a command (created if necessary)."""
+        try:
+            return self.cmds[command]
+        except KeyError:
+            cmd_stats = WnCmdStats(command, name)
+            self.cmds[command] = cmd_stats
+            return cmd_stats
+
+    def get_totals(self):
+        """Return a dictionary of the totals of the counters of all
+        commands."""
+        totals = {}
+
+        for name in ['num_cmds', 'num_retransmissions', 'num_timeouts',
+                     'num_failures', 'num_mismatches', 'tx_bytes', 'rx_bytes']:
+            totals[name] = sum([getattr(cmd_stats, name) for cmd_stats in self.cmds.values()])
+
+        return totals
+
+    def snapshot(self):
+        """Return the statistics as a dictionary."""
+        return {'start_time' : self.start_time,
+                'time'       : time.time(),
+                'totals'     : self.get_totals(),
+                'cmds'       : ["0x{0:08x}".format(command) for command in sorted(self.cmds.keys())],
+                'cmd_stats'  : [self.cmds[command].snapshot() for command in sorted(self.cmds.keys())]}
+
+    def __str__(self):
+        msg = "Command statistics:\n"
+        for command in sorted(self.cmds.keys()):
+            msg += "    {0}\n".format(self.cmds[command])
+        return msg
+
+# End Class WnNodeStats
+
+
+
+def wn_stats_snapshot(nodes):
+    """Return a list with a snapshot of the statistics of each node.
+
+    Attributes:
+        nodes -- List of WnNode objects
+    """
+    output = []
+
+    for node in nodes:
+        snapshot = node.stats.snapshot()
+        snapshot['serial_number'] = node.serial_number
+        snapshot['node_id']       = node.node_id
+        output.append(snapshot)
+
+    return output
+
+# End of wn_stats_snapshot()
+
+
+def wn_stats_dump(nodes, filename=None):
+    """Print the statistics of each node or save a snapshot of the
+    statistics to a JSON file.
+
+    Attributes:
+        nodes -- List of WnNode objects
+        filename -- Name of the JSON file (optional)
+    """
+    if filename is None:
+        for node in nodes:
+            print("Node W3-a-{0:05d} (ID {1}):".format(node.serial_number, node.node_id))
+            print(node.stats)
+    else:
+        try:
+            with open(filename, 'w') as stats_file:
+                json.dump(wn_stats_snapshot(nodes), stats_file, indent=4)
+        except IOError as err:
+            print("Error writing statistics: {0}".format(err))
+
+# End of wn_stats_dump()
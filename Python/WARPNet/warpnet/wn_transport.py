@@ -19,20 +19,26 @@ Ver   Who  Date     Changes
 
 This module provides the base class for WARPNet transports.
 
+Functions:
+    WnTransport() -- Base class for WARPNet transports
+    WnRttEstimator() -- Round trip time estimator for retransmission timeouts
+
 Integer constants:
     TRANSPORT_TYPE, TRANSPORT_HW_ADDR, TRANSPORT_IP_ADDR, 
-      TRANSPORT_UNICAST_PORT, TRANSPORT_BCAST_PORT, TRANSPORT_GRP_ID
-      -- Transport hardware parameter constants 
+      TRANSPORT_UNICAST_PORT, TRANSPORT_BCAST_PORT, TRANSPORT_GRP_ID,
+      TRANSPORT_BCAST_ACK -- Transport hardware parameter constants 
 
     TRANSPORT_NO_RESP, TRANSPORT_WN_RESP, TRANSPORT_WN_BUFFER
       -- Transport response types
 
+    RTT_MIN_RTO, RTT_MAX_RTO -- Bounds of the retransmission timeout (in sec)
+
 If additional hardware parameters are needed for sub-classes of WnNode, please
 make sure that the values of these hardware parameters are not reused.
 """
 
 
-__all__ = ['WnTransport']
+__all__ = ['WnTransport', 'WnRttEstimator']
 
 
 # WARPNet Command Group Names
@@ -44,12 +50,17 @@ TRANSPORT_IP_ADDR       = 2
 TRANSPORT_UNICAST_PORT  = 3
 TRANSPORT_BCAST_PORT    = 4
 TRANSPORT_GRP_ID        = 5
+TRANSPORT_BCAST_ACK     = 6             # Only sent by emulated nodes
 
 # WARPNet Transport response types
 TRANSPORT_NO_RESP       = 0
 TRANSPORT_WN_RESP       = 1
 TRANSPORT_WN_BUFFER     = 2
 
+# Retransmission timeout bounds (in seconds)
+RTT_MIN_RTO             = 0.005
+RTT_MAX_RTO             = 4.0
+
 
 class WnTransport(object):
     """Base class for WARPNet transports.
@@ -65,4 +76,71 @@ class WnTransport(object):
 
 
 
+class WnRttEstimator(object):
+    """Class to estimate the round trip time (RTT) of a transport and compute
+    its retransmission timeout (RTO).
 
+    The estimate follows Jacobson / Karels (RFC 6298):
+        RTTVAR = (1 - beta) * RTTVAR + beta * |SRTT - RTT|
+        SRTT   = (1 - alpha) * SRTT + alpha * RTT
+        RTO    = SRTT + K * RTTVAR
+    with alpha = 1/8, beta = 1/4 and K = 4.  Each timeout doubles the RTO 
+    (exponential backoff) until the next RTT sample or until the backoff is
+    cleared (ie when a multi-packet response makes progress).
+
+    NOTE:  Only unambiguous samples should be used (Karn's algorithm), ie
+    not the RTT of a message that was retransmitted with the same sequence
+    number.
+    
+    Attributes:
+        srtt -- Smoothed round trip time (in sec; None until the first sample)
+        rttvar -- Round trip time variation (in sec)
+        rto -- Current retransmission timeout (in sec, including backoff)
+        min_rto -- Minimum retransmission timeout (in sec)
+        max_rto -- Maximum retransmission timeout (in sec)
+    """
+    srtt     = None
+    rttvar   = None
+    rto      = None
+    base_rto = None
+    min_rto  = None
+    max_rto  = None
+
+    alpha    = 0.125
+    beta     = 0.25
+    k        = 4
+
+    def __init__(self, initial_rto=1.0, min_rto=RTT_MIN_RTO, max_rto=RTT_MAX_RTO):
+        self.min_rto = min_rto
+        self.max_rto = max_rto
+        self.rto      = initial_rto
+        self.base_rto = initial_rto
+
+    def update(self, rtt):
+        """Add a round trip time sample (in sec) and recompute the RTO."""
+        if self.srtt is None:
+            self.srtt   = rtt
+            self.rttvar = rtt / 2.0
+        else:
+            self.rttvar = (1 - self.beta) * self.rttvar + self.beta * abs(self.srtt - rtt)
+            self.srtt   = (1 - self.alpha) * self.srtt + self.alpha * rtt
+
+        self.base_rto = min(max(self.srtt + self.k * self.rttvar, self.min_rto), self.max_rto)
+        self.rto      = self.base_rto
+
+    def backoff(self):
+        """Double the RTO after a timeout."""
+        self.rto = min(2 * self.rto, self.max_rto)
+
+    def clear_backoff(self):
+        """Return the RTO to the value of the last estimate."""
+        self.rto = self.base_rto
+
+    def __repr__(self):
+        if self.srtt is None:
+            return "RTT: no samples (RTO = {0:.3f} ms)".format(self.rto * 1000)
+        else:
+            return str("RTT: {0:.3f} ms +/- {1:.3f} ms ".format(self.srtt * 1000, self.rttvar * 1000) +
+                       "(RTO = {0:.3f} ms)".format(self.rto * 1000))
+
+# End Class WnRttEstimator
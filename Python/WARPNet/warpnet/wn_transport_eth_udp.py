@@ -25,10 +25,18 @@ Functions:
     ip2int() -- Convert 'w.x.y.z' IP address string to 32 bit integer
     mac2str() -- Convert 6 byte MAC address to 'uu:vv:ww:xx:yy:zz' string
 
+Integer constants:
+    MAX_PKT_SIZE, MAX_JUMBO_PKT_SIZE -- Largest packets (in bytes) tested by
+        test_payload_size() without / with jumbo frame support
+    PAYLOAD_TEST_TIMEOUT -- Timeout (in sec) of a payload test
+    PAYLOAD_TEST_ATTEMPTS -- Attempts of a payload test before the payload
+        is considered too large
+
 """
 
 import re
 import time
+import socket
 
 from . import wn_cmds
 from . import wn_message
@@ -39,11 +47,31 @@ from . import wn_transport as tp
 __all__ = ['WnTransportEthUdp']
 
 
+# Largest UDP payloads (in bytes) of standard and jumbo Ethernet frames 
+#   tested by test_payload_size()
+MAX_PKT_SIZE         = 1470
+MAX_JUMBO_PKT_SIZE   = 8966
+
+# Time (in sec) to wait for the response of the last attempt of a payload test
+PAYLOAD_TEST_TIMEOUT = 0.1
+
+# Attempts to transmit a test payload before it is considered too large (a 
+#   lost packet must not shrink the max_payload)
+PAYLOAD_TEST_ATTEMPTS = 4
+
+# Dictionary of (host IP address, node IP address, largest packet) to the 
+#   max_payload found by test_payload_size()
+_max_payload_cache = {}
+
+
 class WnTransportEthUdp(tp.WnTransport):
     """Base Class for WARPNet Ethernet UDP Transport class.
        
     Attributes:
-        timeout-- Maximum time spent waiting before retransmission
+        timeout-- Maximum time spent waiting for the last attempt of a 
+                  message before giving up
+        rtt -- WnRttEstimator used for the retransmission timeout of all
+               other attempts
         transport_type -- Unique type of the WARPNet transport
         sock -- UDP socket
         status -- Status of the UDP socket
@@ -54,10 +82,15 @@ class WnTransportEthUdp(tp.WnTransport):
         unicast_port -- Unicast port of destination
         bcast_port -- Broadcast port of destination
         group_id -- Group ID of the node attached to the transport
+        bcast_ack_support -- True if the node answers broadcast messages 
+                             that require a response (see 
+                             TRANSPORT_BCAST_ACK).  Only emulated nodes do
+                             this (see wn_emulator), so it is False by default.
         rx_buffer_size -- OS's receive buffer size (in bytes)        
         tx_buffer_size -- OS's transmit buffer size (in bytes)        
     """
     timeout         = None
+    rtt             = None
     transport_type  = None
     sock            = None
     status          = None
@@ -67,6 +100,7 @@ class WnTransportEthUdp(tp.WnTransport):
     unicast_port    = None
     bcast_port      = None
     group_id        = None
+    bcast_ack_support = False
     rx_buffer_size  = None
     tx_buffer_size  = None
     
@@ -74,6 +108,7 @@ class WnTransportEthUdp(tp.WnTransport):
         self.hdr = wn_message.WnTransportHeader()
         self.status = 0
         self.timeout = 1
+        self.rtt = tp.WnRttEstimator(initial_rto=self.timeout)
         self.max_payload = 1000   # Sane default.  Overwritten by payload test.
         
         self.check_setup()
@@ -96,6 +131,18 @@ class WnTransportEthUdp(tp.WnTransport):
     def get_max_payload(self):
         return self.max_payload
 
+    def get_rx_timeout(self, last_attempt=False):
+        """Return the time to wait for a response before retransmission.
+
+        The RTO of the RTT estimator is used, except for the last attempt of
+        a message which waits at least the transport timeout (so that a 
+        slow response is not given up on any sooner than before).
+        """
+        if last_attempt:
+            return max(self.rtt.rto, self.timeout)
+        else:
+            return self.rtt.rto
+
 
     #-------------------------------------------------------------------------
     # Commands that must be implemented by child classes
@@ -123,39 +170,104 @@ class WnTransportEthUdp(tp.WnTransport):
     def ping(self, node, output=False):
         """Issues a ping command to the given node.
         
-        Will optionally print the result of the ping.
+        Returns the round trip time (in sec) of the ping.  Will optionally 
+        print the result of the ping.
         """
-        start_time = time.clock()
+        start_time = time.time()
         node.send_cmd(wn_cmds.WnCmdPing())
-        end_time = time.clock()
+        end_time = time.time()
         
         if output:
             ms_time = (end_time - start_time) * 1000
             print("Reply from {0}:  time = {1:.3f} ms".format(self.ip_address, 
                                                               ms_time))
-    
-    def test_payload_size(self, node, jumbo_frame_support=False):
-        """Determines the object's max_payload parameter."""
 
+        return (end_time - start_time)
+    
+    def test_payload_size(self, node, jumbo_frame_support=False, refresh=False):
+        """Determines the object's max_payload parameter.
+        
+        The largest test payload that the node receives completely is found
+        by a binary search (to a 32 bit word) up to the largest packet of 
+        the network (MAX_PKT_SIZE or MAX_JUMBO_PKT_SIZE).  The largest packet
+        is tested first, so a network that supports it needs one test.
+        
+        The result is cached per (host interface, node IP address, largest
+        packet), so the test is only done again if refresh is True.
+        """
         if jumbo_frame_support:
-            payload_test_sizes = [1000, 1470, 5000, 8966]
+            max_size = MAX_JUMBO_PKT_SIZE
         else:
-            payload_test_sizes = [1000, 1470]
-        
-        for size in payload_test_sizes:
-            my_arg_size = (size - (self.hdr.sizeof() + wn_message.WnCmd().sizeof() + 4)) // 4
- 
-            try:
-                resp = node.send_cmd(wn_cmds.WnCmdTestPayloadSize(my_arg_size))
-                self.set_max_payload(resp)
-                
-                if (self.get_max_payload() < (4*my_arg_size)):
-                    # If the node received a smaller payload, then break
-                    break
-            except:
-                # If there was a transmission error, then break
-                break
+            max_size = MAX_PKT_SIZE
+
+        key = (self._get_local_ip_address(), self.ip_address, max_size)
+
+        if (not refresh) and (key in _max_payload_cache):
+            self.set_max_payload(_max_payload_cache[key])
+            return
+
+        # Number of 32 bit arguments of the command in a packet of max_size
+        hi = (max_size - (self.hdr.sizeof() + wn_message.WnCmd().sizeof() + 4)) // 4
+        lo = 0
+
+        # Search [lo, hi] for the largest size that is received completely
+        #   (lo is known to work and any size above hi is known to fail).  A
+        #   test payload that is too large is never answered, so the tests 
+        #   wait at most PAYLOAD_TEST_TIMEOUT for a response.  A test is 
+        #   retransmitted before the size is considered too large, since the
+        #   packet or its response may have been lost.
+        size    = hi
+        timeout = self.timeout
+
+        try:
+            self.timeout = PAYLOAD_TEST_TIMEOUT
+
+            while (lo < hi):
+                if self._test_payload(node, size):
+                    lo = size
+                else:
+                    hi = size - 1
+                    self.rtt.clear_backoff()
+
+                size = (lo + hi + 1) // 2
+        finally:
+            self.timeout = timeout
+
+        if (lo > 0):
+            self.set_max_payload(4 * lo)
+            _max_payload_cache[key] = 4 * lo
     
+    def _test_payload(self, node, size):
+        """Internal method to return whether a test payload with size 32 bit
+        arguments is received completely by the node."""
+        try:
+            resp = node.send_cmd(wn_cmds.WnCmdTestPayloadSize(size),
+                                 max_attempts=PAYLOAD_TEST_ATTEMPTS)
+        except ex.WnTransportError:
+            # No response to any attempt:  the packet is too large for the 
+            #   network
+            return False
+        except socket.error:
+            # The packet is too large for the host interface
+            return False
+
+        # The node received a smaller payload
+        return (resp >= (4 * size))
+
+    def _get_local_ip_address(self):
+        """Internal method to return the IP address of the host interface
+        used to reach the node (or None if it cannot be determined)."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+        try:
+            # Connecting a UDP socket selects the interface without sending
+            sock.connect((self.ip_address, self.unicast_port or 0))
+            return sock.getsockname()[0]
+        except socket.error:
+            return None
+        finally:
+            sock.close()
+
     def add_node_group_id(self, node, group):
         node.send_cmd(wn_cmds.WnCmdAddNodeGrpId(group))
     
@@ -205,6 +317,12 @@ class WnTransportEthUdp(tp.WnTransport):
             else:
                 raise ex.WnParameterError("TRANSPORT_GRP_ID", "Incorrect length")
                 
+        elif (identifier == tp.TRANSPORT_BCAST_ACK):
+            if (length == 1):
+                self.bcast_ack_support = bool(values[0])
+            else:
+                raise ex.WnParameterError("TRANSPORT_BCAST_ACK", "Incorrect length")
+                
         else:
             raise ex.WnParameterError(identifier, "Unknown transport parameter")
 
@@ -230,6 +348,7 @@ class WnTransportEthUdp(tp.WnTransport):
         print("    Rx Buffer Size:  {}".format(self.rx_buffer_size))
         print("    Tx Buffer Size:  {}".format(self.tx_buffer_size))
         print("    Group ID      :  {}".format(self.group_id))
+        print("    Bcast acks    :  {}".format(self.bcast_ack_support))
         
 # End Class WnTransportEthUdp
 
@@ -27,16 +27,21 @@ Functions:
 Integer constants:
     REQUESTED_BUF_SIZE -- Size of TX/RX buffer that will requested from the 
         operating system.
+    DEFAULT_WINDOW_SIZE -- Default number of outstanding packets allowed by
+        send_pipelined()
+    RX_BUFFER_SIZE -- Size of the preallocated receive buffer (ie the 
+        maximum size of a UDP datagram)
 
 """
 
-import re
 import time
 import errno
+import select
 import socket
 from socket import error as socket_error
 
 from . import wn_transport_eth_udp
+from . import wn_recvmmsg
 from . import wn_exception as ex
 
 
@@ -44,14 +49,31 @@ __all__ = ['WnTransportEthUdpPy']
 
 
 REQUESTED_BUF_SIZE = 2**22
+DEFAULT_WINDOW_SIZE = 16
+RX_BUFFER_SIZE = 2**16
 
 
 class WnTransportEthUdpPy(wn_transport_eth_udp.WnTransportEthUdp):
     """Class for WARPNet Ethernet UDP Transport class using Python libraries.
        
     Attributes:
-        See WnTransportEthUdp for all attributes
+        rx_buffer -- Preallocated buffer that packets are received into
+        rx_view -- memoryview of rx_buffer used to return payloads without
+                   copying them
+        rx_batch -- WnRecvBatch used by receive_batch_pipelined()
+        
+        See WnTransportEthUdp for all other attributes
     """
+    rx_buffer = None
+    rx_view   = None
+    rx_batch  = None
+    
+    def __init__(self):
+        super(WnTransportEthUdpPy, self).__init__()
+        self.rx_buffer = bytearray(RX_BUFFER_SIZE)
+        self.rx_view = memoryview(self.rx_buffer)
+
+
     def wn_open(self, ip_addr=None, unicast_port=None):
         """Opens an Ethernet UDP socket.""" 
         if ip_addr:
@@ -121,66 +143,256 @@ class WnTransportEthUdpPy(wn_transport_eth_udp.WnTransportEthUdp):
             print("Only {} of {} bytes of data sent".format(size, len(data)))
 
 
-    def receive(self):
+    def send_pipelined(self, payloads, window=DEFAULT_WINDOW_SIZE, max_attempts=2, 
+                       stats=None):
+        """Send a list of messages that each require a response and return
+        the list of responses in the same order as the payloads.
+        
+        Unlike send() / receive(), this does not wait for the response of a
+        message before sending the next one.  Up to 'window' messages are
+        outstanding at any time and each response is matched to its message
+        by the sequence number of the transport header.  If no response 
+        arrives within the retransmission timeout (see get_rx_timeout()), 
+        all outstanding messages are retransmitted with their original 
+        sequence number.
+        
+        Attributes:
+            payloads -- List of data to be sent over the socket
+            window -- Maximum number of outstanding messages
+            max_attempts -- Maximum attempts to transmit each message
+            stats -- List that is filled with an [attempts, latency] entry 
+                     per payload (optional).  The latency (in sec, from the 
+                     first transmission to the response) is None for a 
+                     message without a response and attempts is 0 for a 
+                     message that was not sent (ie after a failure).
+        """
+        replies     = [None] * len(payloads)
+
+        if stats is not None:
+            stats[:] = [[0, None] for _ in payloads]
+
+        outstanding = {}            # seq_num -> [payload index, data, attempts, send time]
+        next_idx    = 0
+        num_done    = 0
+
+        self.hdr.response_required()
+
+        while num_done < len(payloads):
+            # Fill the window
+            while (next_idx < len(payloads)) and (len(outstanding) < window):
+                self.hdr.set_length(len(payloads[next_idx]))
+                self.hdr.increment()
+
+                data = bytes(b'\x00\x00' + self.hdr.serialize() + payloads[next_idx])
+                outstanding[self.hdr.seq_num] = [next_idx, data, 1, time.time()]
+                self._send_data(data)
+                next_idx += 1
+
+            last_attempt = max([entry[2] for entry in outstanding.values()]) == max_attempts
+
+            try:
+                (seq_num, reply) = self._receive_pipelined(outstanding, 
+                                                           self.get_rx_timeout(last_attempt))
+            except ex.WnTransportError:
+                if last_attempt:
+                    if stats is not None:
+                        for entry in outstanding.values():
+                            stats[entry[0]][0] = entry[2]
+                    raise ex.WnTransportError(self, 
+                                              "Max retransmissions without reply from node")
+                self.rtt.backoff()
+
+                for entry in outstanding.values():
+                    self._send_data(entry[1])
+                    entry[2] += 1
+            else:
+                entry = outstanding.pop(seq_num)
+                replies[entry[0]] = bytes(reply)
+                num_done += 1
+
+                if stats is not None:
+                    stats[entry[0]] = [entry[2], time.time() - entry[3]]
+
+                # Retransmissions reuse the sequence number, so only sample
+                #   the RTT of messages that were sent once (Karn's algorithm)
+                if (entry[2] == 1):
+                    self.rtt.update(time.time() - entry[3])
+
+        return replies
+
+
+    def receive(self, timeout=None):
         """Return a response from the transport.
         
+        Attributes:
+            timeout -- Time to wait for the response (optional; defaults to
+                       the transport timeout)
+        
         NOTE:  This function will block until a response is received or a
         timeout occurs.  If a timeout occurs, it will raise a WnTransportError
         exception.
+        
+        NOTE:  The response is a memoryview of the transport's receive buffer
+        and is only valid until the next call to receive.  Copy it (ie with
+        bytes()) if it needs to be kept.
         """
         reply = b''
 
-        max_pkt_len = self.get_max_payload() + 100;
         received_resp = 0
-        start_time = time.time()
+        hdr_len = 2 + self.hdr.sizeof()
+        end_time = self._set_rx_timeout(timeout)
         
         while received_resp == 0:
-            recv_data = []
+            recv_len = self._recv_into()
             
-            try:
-                (recv_data, recv_addr) = self.sock.recvfrom(max_pkt_len)
-            except socket.error as err:
-                expr = re.compile("timed out")
-                if not expr.match(str(err)):
-                    print("Failed to receive UDP packet.\nError message:\n{}".format(err))
-            
-            if len(recv_data) > 0:
-                hdr_len = 2 + self.hdr.sizeof()
-                # print("Received pkt from", recv_addr)
-                if (self.hdr.is_reply(recv_data[2:hdr_len])):
-                    reply = recv_data[hdr_len:]
+            if (recv_len >= hdr_len):
+                if (self.hdr.is_reply(self.rx_view[2:hdr_len])):
+                    reply = self.rx_view[hdr_len:recv_len]
                     received_resp = 1
             
-            if ((time.time() - start_time) > self.timeout ) and (received_resp == 0):
+            if (received_resp == 0) and (time.time() > end_time):
                 raise ex.WnTransportError(self, "Transport receive timed out.")
 
         return reply
 
 
+    def receive_batch_pipelined(self, outstanding, max_pkts=wn_recvmmsg.DEFAULT_BATCH_SIZE, 
+                                timeout=None):
+        """Return a list of (seq_num, reply) of all responses that are 
+        waiting in the receive queue of the transport and whose sequence 
+        number is in outstanding.
+        
+        This is used for WnBuffer transfers with many outstanding requests
+        (see WnNode.send_cmd_chunked()).  Responses with any other sequence
+        number are discarded and counted in hdr.num_mismatches.
+        
+        Attributes:
+            outstanding -- Collection of the sequence numbers of the 
+                           outstanding requests
+            max_pkts -- Maximum number of packets received at once
+            timeout -- Time to wait for the first response (optional; 
+                       defaults to the transport timeout)
+        
+        NOTE:  This function will block until at least one response is 
+        received or a timeout occurs.  If a timeout occurs, it will raise a
+        WnTransportError exception.
+        
+        NOTE:  The responses are memoryviews of the transport's receive 
+        buffers and are only valid until the next call to 
+        receive_batch_pipelined.
+        """
+        replies  = []
+        hdr_len  = 2 + self.hdr.sizeof()
+        pkt_len  = self.get_max_payload() + 100
+        end_time = self._set_rx_timeout(timeout)
+
+        if ((self.rx_batch is None) or (self.rx_batch.pkt_len < pkt_len) or
+                (self.rx_batch.max_pkts != max_pkts)):
+            self.rx_batch = wn_recvmmsg.WnRecvBatch(pkt_len, max_pkts)
+        
+        while not replies:
+            time_left = end_time - time.time()
+
+            if (time_left <= 0):
+                raise ex.WnTransportError(self, "Transport receive timed out.")
+
+            (readable, _, _) = select.select([self.sock], [], [], time_left)
+
+            if readable:
+                for recv_data in self.rx_batch.recv(self.sock):
+                    if (len(recv_data) >= hdr_len):
+                        seq_num = self.hdr.get_reply_seq_num(recv_data[2:hdr_len])
+                        if seq_num in outstanding:
+                            replies.append((seq_num, recv_data[hdr_len:]))
+                        else:
+                            self.hdr.num_mismatches += 1
+
+        return replies
+
+
     def receive_nb(self):
         """Return a response from the transport.
         
         NOTE:  This function will not block and should be called in a polling
         loop until a response is received.
+
+        NOTE:  The response is a memoryview of the transport's receive buffer
+        and is only valid until the next call to receive.
         """
         reply = b''
-        recv_data = []
 
-        max_pkt_len = self.get_max_payload() + 100;
+        hdr_len = 2 + self.hdr.sizeof()
+        recv_len = self._recv_into()
+        
+        if (recv_len >= hdr_len):
+            if (self.hdr.is_reply(self.rx_view[2:hdr_len])):
+                reply = self.rx_view[hdr_len:recv_len]
+            
+        return reply
+
+
+    #-------------------------------------------------------------------------
+    # Internal helper methods
+    #-------------------------------------------------------------------------
+    def _recv_into(self):
+        """Internal method to receive a packet into the receive buffer.
+        
+        Returns the number of bytes received (0 if no packet was received).
+        """
+        recv_len = 0
         
         try:
-            (recv_data, recv_addr) = self.sock.recvfrom(max_pkt_len)
+            recv_len = self.sock.recv_into(self.rx_buffer)
+        except socket.timeout:
+            pass
         except socket.error as err:
-            expr = re.compile("timed out")
-            if not expr.match(str(err)):
-                print("Failed to receive UDP packet.\nError message:\n{}".format(err))
-        
-        if len(recv_data) > 0:
-            hdr_len = 2 + self.hdr.sizeof()
-            if (self.hdr.is_reply(recv_data[2:hdr_len])):
-                reply = recv_data[hdr_len:]
+            print("Failed to receive UDP packet.\nError message:\n{}".format(err))
+
+        return recv_len
+
+
+    def _set_rx_timeout(self, timeout):
+        """Internal method to set the socket timeout for a receive.  Returns
+        the time at which the receive times out."""
+        if timeout is None:
+            timeout = self.timeout
+
+        self.sock.settimeout(timeout)
+
+        return time.time() + timeout
+
+
+    def _send_data(self, data):
+        """Internal method to send an already serialized packet."""
+        size = self.sock.sendto(data, (self.ip_address, self.unicast_port))
+        
+        if size != len(data):
+            print("Only {} of {} bytes of data sent".format(size, len(data)))
+
+
+    def _receive_pipelined(self, outstanding, timeout=None):
+        """Internal method to return (seq_num, reply) of the next response
+        whose sequence number is in outstanding.
+        
+        Responses with any other sequence number (ie duplicates caused by a
+        retransmission) are discarded and counted in hdr.num_mismatches.  
+        Raises a WnTransportError exception if no matching response is 
+        received before the timeout.
+        """
+        hdr_len     = 2 + self.hdr.sizeof()
+        end_time    = self._set_rx_timeout(timeout)
+        
+        while True:
+            recv_len = self._recv_into()
             
-        return reply
+            if (recv_len >= hdr_len):
+                seq_num = self.hdr.get_reply_seq_num(self.rx_view[2:hdr_len])
+                if seq_num in outstanding:
+                    return (seq_num, self.rx_view[hdr_len:recv_len])
+                self.hdr.num_mismatches += 1
+            
+            if (time.time() > end_time):
+                raise ex.WnTransportError(self, "Transport receive timed out.")
 
 
 # End Class WnTransportEthUdpPy
@@ -20,6 +20,15 @@ Ver   Who  Date     Changes
 This module provides the WARPNet broadcast Ethernet UDP transport based on 
 the python socket class.
 
+Broadcast messages can require a response.  Each node then answers from its
+unicast address to the socket that sent the message, with the 
+wn_message.FLAG_BCAST_ACK flag set, so the host can collect the responses 
+with receive_acks().  Responses to broadcast messages (see 
+bcast_ack_support of WnTransportEthUdp) and node group filtering (see 
+group_id_support) are only implemented by emulated nodes (see wn_emulator);
+WARP hardware does not answer broadcast messages and processes every 
+broadcast message regardless of its node group.
+
 Functions:
     WnTransportEthUdpPyBcast() -- Broadcast Ethernet UDP transport based on 
         python sockets
@@ -31,11 +40,15 @@ Integer constants:
 """
 
 import re
+import time
 import errno
 import socket
+import struct
 from socket import error as socket_error
 
 from . import wn_config
+from . import wn_message
+from . import wn_exception as ex
 from . import wn_transport_eth_udp as tp
 
 
@@ -44,13 +57,26 @@ __all__ = ['WnTransportEthUdpPyBcast']
 
 REQUESTED_BUF_SIZE = 2**22
 
+_TRANSPORT_HDR_STRUCT = struct.Struct('!2H 2B 3H')
+
+# Receive errors after which receive_acks() keeps waiting
+_RETRY_ERRNOS = (errno.EINTR, errno.EAGAIN, errno.EWOULDBLOCK)
+
 
 class WnTransportEthUdpPyBcast(tp.WnTransportEthUdp):
     """Class for WARPNet Ethernet UDP Broadcast Transport class using Python libraries.
        
     Attributes:
-        See WnTransportEthUdp for all attributes
+        group_id_support -- True if every node on the network only processes
+                            broadcast messages for its node groups (the node 
+                            group ID is sent in the reserved field of the 
+                            transport header).  Only emulated nodes support
+                            this (see wn_emulator), so it is False by default.
+
+        See WnTransportEthUdp for all other attributes
     """
+    group_id_support = False
+
     def __init__(self):
         super(WnTransportEthUdpPyBcast, self).__init__()        
         self.set_default_config()
@@ -129,18 +155,37 @@ class WnTransportEthUdpPyBcast(tp.WnTransportEthUdp):
         self.status = 0
 
 
-    def send(self, payload, pkt_type="message"):
+    def send(self, payload, pkt_type="message", response_required=False, group_id=0):
         """Send a broadcast message over the transport.
         
         Attributes:
             data -- Data to be sent over the socket
+            response_required -- Every node that processes the message will
+                                 send a unicast response (see receive_acks())
+            group_id -- Only nodes in this node group (see 
+                        WnCmdAddNodeGrpId) process the message (0 = all nodes)
+        
+        The node group ID is sent in the reserved field of the transport 
+        header.  Since WARP hardware ignores that field, a WnTransportError 
+        is raised for a non-zero group_id unless group_id_support is set.
         """
+        if group_id and not self.group_id_support:
+            raise ex.WnTransportError(self, 
+                      "Node group IDs of broadcast messages are not supported by the nodes")
+
         self.hdr.set_type(pkt_type)
-        self.hdr.response_not_required()
+        if response_required:
+            self.hdr.response_required()
+        else:
+            self.hdr.response_not_required()
         self.hdr.set_length(len(payload))
         self.hdr.increment()
+        self.hdr.reserved = group_id
 
-        data = bytes(b'\x00\x00' + self.hdr.serialize() + payload)
+        try:
+            data = bytes(b'\x00\x00' + self.hdr.serialize() + payload)
+        finally:
+            self.hdr.reserved = 0
         
         size = self.sock.sendto(data, (self.ip_address, self.bcast_port))
         
@@ -153,6 +198,53 @@ class WnTransportEthUdpPyBcast(tp.WnTransportEthUdp):
         raise NotImplementedError
 
 
+    def receive_acks(self, src_ids, timeout):
+        """Return the responses of the nodes to the last broadcast message
+        sent with response_required.
+        
+        Each node answers a broadcast message from its unicast address to the
+        socket that sent the message.  Returns a dictionary of src_id 
+        (ie node_id) to response for each of the src_ids that answered 
+        before the timeout (in sec).  Packets from any other node, for any
+        other sequence number or without the wn_message.FLAG_BCAST_ACK flag
+        are discarded.  Interrupted receives (ie EINTR)
+        do not end the collection before the timeout.
+        """
+        output = {}
+        src_ids = set(src_ids)
+        hdr_len = 2 + self.hdr.sizeof()
+        end_time = time.time() + timeout
+
+        while (len(output) < len(src_ids)):
+            time_left = end_time - time.time()
+
+            if (time_left <= 0):
+                break
+
+            try:
+                self.sock.settimeout(time_left)
+                recv_data = self.sock.recv(2**16)
+            except socket.timeout:
+                break
+            except socket.error as err:
+                if (err.errno in _RETRY_ERRNOS):
+                    continue
+
+                # The nodes without a response are retried by the caller
+                print("Failed to receive UDP packet.\nError message:\n{}".format(err))
+                break
+
+            if (len(recv_data) >= hdr_len):
+                (dest_id, src_id, _, _, _, seq_num, flags) = _TRANSPORT_HDR_STRUCT.unpack_from(recv_data, 2)
+
+                if ((dest_id == self.hdr.src_id) and (seq_num == self.hdr.seq_num) and
+                        (flags & wn_message.FLAG_BCAST_ACK) and
+                        (src_id in src_ids) and not (src_id in output)):
+                    output[src_id] = bytes(recv_data[hdr_len:])
+
+        return output
+
+
 # End Class WnTransportEthUdpPyBcast
 
 
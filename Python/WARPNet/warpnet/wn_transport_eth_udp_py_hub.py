@@ -0,0 +1,506 @@
+# -*- coding: utf-8 -*-
+"""
+------------------------------------------------------------------------------
+WARPNet Transport - Shared Ethernet UDP Python Socket Implementation
+------------------------------------------------------------------------------
+Authors:   Chris Hunter (chunter [at] mangocomm.com)
+           Patrick Murphy (murphpo [at] mangocomm.com)
+           Erik Welsh (welsh [at] mangocomm.com)
+License:   Copyright 2014, Mango Communications. All rights reserved.
+           Distributed under the WARP license (http://warpproject.org/license)
+------------------------------------------------------------------------------
+MODIFICATION HISTORY:
+
+Ver   Who  Date     Changes
+----- ---- -------- -----------------------------------------------------
+1.00a ejw  10/17/26 Initial release
+
+------------------------------------------------------------------------------
+
+This module provides WARPNet Ethernet UDP transports that share a single
+socket across all nodes.
+
+The WnTransportEthUdpPyHub owns the socket and demultiplexes every received
+packet by the (src_id, seq_num, bcast_ack) of its transport header, where
+bcast_ack is True for the responses to broadcast messages (see 
+wn_message.FLAG_BCAST_ACK).  Broadcast responses are held apart from the
+unicast responses, so the sequence numbers of the broadcast transport never
+collide with the unicast ones and discarding the stale unicast responses of
+a node does not drop its broadcast responses.  Each node uses a
+WnTransportEthUdpPyShared (unicast) and WnTransportEthUdpPyBcastShared
+(broadcast) transport that sends on the hub socket and receives its
+responses from the hub.  Since every response arrives on the same socket,
+the responses of many nodes can be waited on at once with
+WnTransportEthUdpPyHub.wait().
+
+To use the shared transports for all nodes, set the 'transport_type' of the
+'network' section of wn_config.ini to 'python_shared'.
+
+Functions (see below for more information):
+    WnTransportEthUdpPyHub() -- Shared socket for all nodes
+    WnTransportEthUdpPyShared() -- Unicast transport using a hub
+    WnTransportEthUdpPyBcastShared() -- Broadcast transport using a hub
+    get_hub() -- Returns the default hub
+
+Integer constants:
+    MAX_PENDING_SEQ_NUMS -- Maximum number of sequence numbers per node
+        for which received packets are held by the hub
+
+"""
+
+import time
+import errno
+import select
+import socket
+import struct
+import threading
+from collections import OrderedDict
+from socket import error as socket_error
+
+from . import wn_recvmmsg
+from . import wn_message
+from . import wn_exception as ex
+from . import wn_transport_eth_udp_py
+from . import wn_transport_eth_udp_py_bcast
+
+
+__all__ = ['WnTransportEthUdpPyHub', 'WnTransportEthUdpPyShared',
+           'WnTransportEthUdpPyBcastShared', 'get_hub']
+
+
+MAX_PENDING_SEQ_NUMS = 256
+
+_default_hub      = None
+_default_hub_lock = threading.Lock()
+
+
+class WnTransportEthUdpPyHub(object):
+    """Class for a UDP socket shared by the transports of many nodes.
+
+    Received packets are held per (src_id, seq_num, bcast_ack) key until a
+    transport asks for them.  The hub is thread safe:  one thread at a time reads the
+    socket and hands packets to the other waiting threads.
+
+    Attributes:
+        sock -- UDP socket
+        hdr_len -- Length of the padding and transport header of a packet
+        rx_buffer_size -- OS's receive buffer size (in bytes)
+        tx_buffer_size -- OS's transmit buffer size (in bytes)
+        pending -- Dictionary of src_id to dictionary of seq_num to list
+                   of received unicast payloads
+        pending_acks -- Dictionary of src_id to dictionary of seq_num to 
+                        list of received responses to broadcast messages
+        num_discarded -- Dictionary of src_id to number of received unicast
+                         packets that were discarded without being collected
+    """
+    sock           = None
+    hdr_len        = None
+    rx_buffer_size = None
+    tx_buffer_size = None
+    pending        = None
+    pending_acks   = None
+    num_discarded  = None
+
+    def __init__(self, max_pkts=wn_recvmmsg.DEFAULT_BATCH_SIZE):
+        self.sock = socket.socket(socket.AF_INET,       # Internet
+                                  socket.SOCK_DGRAM);   # UDP
+
+        self.sock.settimeout(1)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+
+        try:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, wn_transport_eth_udp_py.REQUESTED_BUF_SIZE)
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, wn_transport_eth_udp_py.REQUESTED_BUF_SIZE)
+        except socket_error as serr:
+            # On some HW we cannot set the buffer size
+            if serr.errno != errno.ENOBUFS:
+                raise serr
+
+        self.tx_buffer_size = self.sock.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF)
+        self.rx_buffer_size = self.sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+
+        self.hdr_len = 2 + struct.calcsize('!2H 2B 3H')
+        self.pending = {}
+        self.pending_acks = {}
+        self.num_discarded = {}
+
+        self._rx_batch = wn_recvmmsg.WnRecvBatch(wn_transport_eth_udp_py.RX_BUFFER_SIZE, max_pkts)
+        self._cond = threading.Condition(threading.Lock())
+        self._reading = False
+
+
+    def close(self):
+        """Closes the shared socket."""
+        if self.sock:
+            try:
+                self.sock.close()
+            except socket.error as err:
+                print("Error closing socket:  {0}".format(err))
+            self.sock = None
+
+
+    def receive(self, keys, timeout):
+        """Return (key, payloads) for the first of the (src_id, seq_num, 
+        bcast_ack) keys with received packets.  All packets received for that key are
+        returned.  Returns (None, []) if a timeout occurs.
+        """
+        ready = self._wait(keys, timeout, wait_all=False)
+
+        if ready:
+            key = ready[0]
+            with self._cond:
+                return (key, self._pop(key))
+        else:
+            return (None, [])
+
+
+    def wait(self, keys, timeout):
+        """Wait until packets have been received for all of the (src_id,
+        seq_num, bcast_ack) keys or a timeout occurs.
+
+        Returns a dictionary of key to list of payloads for each key with
+        received packets (keys without packets are not in the dictionary).
+        """
+        ready = self._wait(keys, timeout, wait_all=True)
+
+        with self._cond:
+            return dict([(key, self._pop(key)) for key in ready])
+
+
+    def discard(self, src_id, keep_seq_nums=()):
+        """Discard all held unicast packets from src_id except for the given 
+        sequence numbers (ie late duplicates of previous responses).  Held
+        responses to broadcast messages are not discarded."""
+        with self._cond:
+            seq_nums = self.pending.get(src_id)
+            if seq_nums:
+                for seq_num in list(seq_nums.keys()):
+                    if not seq_num in keep_seq_nums:
+                        self._discard(src_id, seq_nums.pop(seq_num))
+
+
+    def pop_num_discarded(self, src_id):
+        """Return the number of packets from src_id that were discarded
+        without being collected since the last call (see discard())."""
+        with self._cond:
+            return self.num_discarded.pop(src_id, 0)
+
+
+    #-------------------------------------------------------------------------
+    # Internal helper methods
+    #-------------------------------------------------------------------------
+    def _wait(self, keys, timeout, wait_all):
+        """Internal method to wait for packets for the given keys.  Returns
+        the list of keys with received packets."""
+        end_time = time.time() + timeout
+
+        with self._cond:
+            while True:
+                ready = [key for key in keys if self._has(key)]
+
+                if ready and (not wait_all or (len(ready) == len(keys))):
+                    return ready
+
+                time_left = end_time - time.time()
+
+                if self._reading:
+                    # Another thread is reading the socket; wait to be notified
+                    if (time_left <= 0):
+                        return ready
+                    self._cond.wait(time_left)
+                else:
+                    self._reading = True
+                    self._cond.release()
+                    try:
+                        pkts = self._read(max(time_left, 0))
+                    finally:
+                        self._cond.acquire()
+                        self._reading = False
+
+                    for (key, payload) in pkts:
+                        self._add(key, payload)
+
+                    self._cond.notify_all()
+
+                    if (time_left <= 0) and not pkts:
+                        return [key for key in keys if self._has(key)]
+
+
+    def _read(self, timeout):
+        """Internal method to read all queued packets from the socket.
+        Returns a list of ((src_id, seq_num, bcast_ack), payload) tuples."""
+        output = []
+
+        try:
+            (readable, _, _) = select.select([self.sock], [], [], timeout)
+        except select.error:
+            return output
+
+        if readable:
+            for recv_data in self._rx_batch.recv(self.sock):
+                if (len(recv_data) >= self.hdr_len):
+                    hdr = struct.unpack('!2H 2B 3H', recv_data[2:self.hdr_len])
+                    bcast_ack = bool(hdr[6] & wn_message.FLAG_BCAST_ACK)
+                    output.append(((hdr[1], hdr[5], bcast_ack), bytes(recv_data[self.hdr_len:])))
+
+        return output
+
+
+    def _pending(self, key):
+        """Internal method to return the held packets of the key space of
+        the key (ie unicast or broadcast responses)."""
+        if key[2]:
+            return self.pending_acks
+        else:
+            return self.pending
+
+
+    def _has(self, key):
+        seq_nums = self._pending(key).get(key[0])
+        return (seq_nums is not None) and (key[1] in seq_nums)
+
+
+    def _add(self, key, payload):
+        (src_id, seq_num, bcast_ack) = key
+        pending = self._pending(key)
+
+        if not src_id in pending:
+            pending[src_id] = OrderedDict()
+
+        seq_nums = pending[src_id]
+
+        if seq_num in seq_nums:
+            seq_nums[seq_num].append(payload)
+        else:
+            # Bound the memory used by packets that are never collected.  
+            #   Late broadcast responses are not unicast mismatches.
+            if (len(seq_nums) >= MAX_PENDING_SEQ_NUMS):
+                payloads = seq_nums.pop(next(iter(seq_nums)))
+                if not bcast_ack:
+                    self._discard(src_id, payloads)
+            seq_nums[seq_num] = [payload]
+
+
+    def _pop(self, key):
+        return self._pending(key)[key[0]].pop(key[1], [])
+
+
+    def _discard(self, src_id, payloads):
+        self.num_discarded[src_id] = self.num_discarded.get(src_id, 0) + len(payloads)
+
+
+# End Class WnTransportEthUdpPyHub
+
+
+
+class WnTransportEthUdpPyShared(wn_transport_eth_udp_py.WnTransportEthUdpPy):
+    """Class for WARPNet Ethernet UDP Transport class that uses the socket
+    of a WnTransportEthUdpPyHub.
+
+    Responses are matched by the node ID (the destination ID of the
+    transport header) and the sequence number.
+
+    Attributes:
+        hub -- WnTransportEthUdpPyHub used by the transport
+
+        See WnTransportEthUdpPy for all other attributes
+    """
+    hub = None
+
+    def __init__(self, hub=None):
+        # Skip allocation of the receive buffers; the hub receives all packets
+        super(wn_transport_eth_udp_py.WnTransportEthUdpPy, self).__init__()
+        self.hub = hub or get_hub()
+
+
+    def wn_open(self, ip_addr=None, unicast_port=None):
+        """Attaches the transport to the hub socket."""
+        if ip_addr:
+            if isinstance(ip_addr, str):
+                self.ip_address = ip_addr
+            else:
+                self.ip_address = self.int2ip(ip_addr)
+
+        if unicast_port:
+            self.unicast_port = unicast_port
+
+        self.sock = self.hub.sock
+        self.tx_buffer_size = self.hub.tx_buffer_size
+        self.rx_buffer_size = self.hub.rx_buffer_size
+        self.status = 1
+
+
+    def wn_close(self):
+        """Detaches the transport from the hub socket (the socket stays open)."""
+        self.sock = None
+        self.status = 0
+
+
+    def receive(self, timeout=None):
+        """Return a response from the transport.
+
+        Attributes:
+            timeout -- Time to wait for the response (optional; defaults to
+                       the transport timeout)
+
+        NOTE:  This function will block until a response is received or a
+        timeout occurs.  If a timeout occurs, it will raise a WnTransportError
+        exception.
+        """
+        if timeout is None:
+            timeout = self.timeout
+
+        self._discard([self.hdr.seq_num])
+
+        (key, replies) = self.hub.receive([self._key(self.hdr.seq_num)], timeout)
+
+        if not replies:
+            raise ex.WnTransportError(self, "Transport receive timed out.")
+
+        return replies[0]
+
+
+    def receive_nb(self):
+        """Return a response from the transport (or b'' if there is none).
+
+        NOTE:  This function will not block and should be called in a polling
+        loop until a response is received.
+        """
+        (key, replies) = self.hub.receive([self._key(self.hdr.seq_num)], 0)
+
+        if replies:
+            return replies[0]
+        else:
+            return b''
+
+
+    def receive_batch_pipelined(self, outstanding, max_pkts=None, timeout=None):
+        """Return a list of (seq_num, reply) of all responses that have been 
+        received for the first of the outstanding sequence numbers with 
+        received packets.
+
+        NOTE:  This function will block until at least one response is
+        received or a timeout occurs.  If a timeout occurs, it will raise a
+        WnTransportError exception.
+        """
+        if timeout is None:
+            timeout = self.timeout
+
+        self._discard(outstanding)
+
+        keys = [self._key(seq_num) for seq_num in outstanding]
+
+        (key, replies) = self.hub.receive(keys, timeout)
+
+        if not replies:
+            raise ex.WnTransportError(self, "Transport receive timed out.")
+
+        return [(key[1], reply) for reply in replies]
+
+
+    #-------------------------------------------------------------------------
+    # Internal helper methods
+    #-------------------------------------------------------------------------
+    def _key(self, seq_num):
+        return (self.hdr.dest_id, seq_num, False)
+
+
+    def _discard(self, keep_seq_nums):
+        """Internal method to discard the held responses of the node except
+        for the given sequence numbers.  Discarded responses are counted in
+        hdr.num_mismatches."""
+        self.hub.discard(self.hdr.dest_id, keep_seq_nums)
+        self.hdr.num_mismatches += self.hub.pop_num_discarded(self.hdr.dest_id)
+
+
+    def _receive_pipelined(self, outstanding, timeout=None):
+        """Internal method to return (seq_num, reply) of the next response
+        whose sequence number is in outstanding."""
+        if timeout is None:
+            timeout = self.timeout
+
+        self._discard(outstanding)
+
+        keys = [self._key(seq_num) for seq_num in outstanding]
+
+        (key, replies) = self.hub.receive(keys, timeout)
+
+        if not replies:
+            raise ex.WnTransportError(self, "Transport receive timed out.")
+
+        return (key[1], replies[0])
+
+
+# End Class WnTransportEthUdpPyShared
+
+
+
+class WnTransportEthUdpPyBcastShared(wn_transport_eth_udp_py_bcast.WnTransportEthUdpPyBcast):
+    """Class for WARPNet Ethernet UDP Broadcast Transport class that uses the
+    socket of a WnTransportEthUdpPyHub.
+
+    Attributes:
+        hub -- WnTransportEthUdpPyHub used by the transport
+
+        See WnTransportEthUdpPyBcast for all other attributes
+    """
+    hub = None
+
+    def __init__(self, hub=None):
+        super(WnTransportEthUdpPyBcastShared, self).__init__()
+        self.hub = hub or get_hub()
+
+
+    def wn_open(self, ip_addr=None, bcast_port=None):
+        """Attaches the broadcast transport to the hub socket."""
+        if ip_addr:
+            if isinstance(ip_addr, str):
+                self.set_ip_address(ip_addr)
+            else:
+                self.set_ip_address(self.int2ip(ip_addr))
+
+        if bcast_port:
+            self.bcast_port = bcast_port
+
+        self.sock = self.hub.sock
+        self.tx_buffer_size = self.hub.tx_buffer_size
+        self.rx_buffer_size = self.hub.rx_buffer_size
+        self.status = 1
+
+
+    def wn_close(self):
+        """Detaches the transport from the hub socket (the socket stays open)."""
+        self.sock = None
+        self.status = 0
+
+
+    def receive_acks(self, src_ids, timeout):
+        """Return the responses of the nodes to the last broadcast message
+        sent with response_required (see WnTransportEthUdpPyBcast).
+
+        The responses are collected from the broadcast responses held by the
+        hub so that packets for other transports on the hub socket are not
+        lost and the unicast transports of the nodes do not discard them.
+        """
+        keys = [(src_id, self.hdr.seq_num, True) for src_id in src_ids]
+        ready = self.hub.wait(keys, timeout)
+
+        return dict([(key[0], payloads[0]) for (key, payloads) in ready.items() if payloads])
+
+
+# End Class WnTransportEthUdpPyBcastShared
+
+
+
+def get_hub():
+    """Returns the default WnTransportEthUdpPyHub (created on first use)."""
+    global _default_hub
+
+    with _default_hub_lock:
+        if _default_hub is None:
+            _default_hub = WnTransportEthUdpPyHub()
+
+    return _default_hub
+
+# End of get_hub()
@@ -23,25 +23,31 @@ Functions (see below for more information):
     wn_ver() -- Returns WARPNet version
     wn_ver_str() -- Returns string of WARPNet version
     wn_init_nodes() -- Initialize nodes
+    wn_init_nodes_parallel() -- Initialize nodes in parallel
+    wn_map_parallel() -- Call a function for many items in parallel
+    wn_send_cmd_bcast() -- Send a command to many nodes with one broadcast
     wn_setup() -- Set up wn_config.ini file
     wn_nodes_setup() -- Set up inital nodes_config.ini file
 
 Integer constants:
     WN_MAJOR, WN_MINOR, WN_REVISION, WN_XTRA, WN_RELEASE
         -- WARPNet verision constants
+    WN_INIT_MAX_WORKERS -- Default number of nodes initialized in parallel
 
 """
 
 import os
 import sys
 import re
+import time
 import inspect
+import threading
 
 from . import wn_exception as ex
 
 
-__all__ = ['wn_ver', 'wn_ver_str', 'wn_init_nodes', 'wn_setup', 
-           'wn_nodes_setup']
+__all__ = ['wn_ver', 'wn_ver_str', 'wn_init_nodes', 'wn_init_nodes_parallel',
+           'wn_map_parallel', 'wn_send_cmd_bcast', 'wn_setup', 'wn_nodes_setup']
 
 
 # WARPNet Version defines
@@ -51,6 +57,9 @@ WN_REVISION             = 0
 WN_XTRA                 = str('')
 WN_RELEASE              = 1
 
+# Default number of nodes initialized in parallel
+WN_INIT_MAX_WORKERS     = 16
+
 # Fix to support Python 2.x and 3.x
 if sys.version[0]=="3": raw_input=input
 
@@ -152,7 +161,8 @@ def wn_ver_str(major=WN_MAJOR, minor=WN_MINOR,
 # End of wn_ver_str()
 
 
-def wn_init_nodes(nodes_config, node_factory=None, output=False):
+def wn_init_nodes(nodes_config, node_factory=None, output=False, max_workers=1,
+                  node_cache=None):
     """Initalize WARPNet nodes.
 
     Attributes:    
@@ -160,9 +170,62 @@ def wn_init_nodes(nodes_config, node_factory=None, output=False):
         node_factory -- A WnNodeFactory or subclass to create nodes of a 
                         given WARPNet type
         output -- Print output about the WARPNet nodes
+        max_workers -- Number of nodes to initialize in parallel (see 
+                       wn_init_nodes_parallel()).  Nodes that cannot be 
+                       initialized are reported and left out of the list of
+                       nodes.
+        node_cache -- A WnNodeCache of the node descriptors (optional).  
+                      Nodes that match their cached descriptor are 
+                      initialized with a single get node info command; the
+                      descriptors of the other nodes are added to the cache
+                      and the cache is saved.
     """
     nodes = []
 
+    for result in wn_init_nodes_parallel(nodes_config, node_factory, max_workers, node_cache):
+        if result['node'] is None:
+            print("ERROR:  Unable to initialize node", 
+                  "W3-a-{0:05d}:".format(result['serial_number']))
+            print("    {0}".format(result['error']))
+        else:
+            nodes.append(result['node'])
+
+    if output:
+        print("-" * 50)
+        print("Initialized Nodes:")
+        print("-" * 50)
+        for node in nodes:
+            print(node)
+            print("-" * 30)
+        print("-" * 50)
+
+    return nodes
+
+# End of wn_init_nodes()
+
+
+def wn_init_nodes_parallel(nodes_config, node_factory=None, 
+                           max_workers=WN_INIT_MAX_WORKERS, node_cache=None):
+    """Initalize WARPNet nodes in parallel.
+    
+    Up to max_workers nodes are initialized at the same time (each thread 
+    uses its own copy of the node_factory), so a node that is not responding 
+    only delays its own initialization.
+
+    Returns a list with one dictionary per node in nodes_config (in the same
+    order) with the keys:
+        'serial_number' -- Serial number of the node
+        'node' -- Initialized node (or None if initialization failed)
+        'error' -- Exception that caused the failure (or None)
+    
+    Attributes:    
+        nodes_config -- A WnNodesConfiguration object describing the nodes
+        node_factory -- A WnNodeFactory or subclass to create nodes of a 
+                        given WARPNet type
+        max_workers -- Maximum number of nodes to initialize in parallel
+        node_cache -- A WnNodeCache of the node descriptors (optional, see 
+                      wn_init_nodes())
+    """
     # Parse the WARPNet INI file 
     import warpnet.wn_config as wn_config
     config = wn_config.WnConfiguration()
@@ -173,38 +236,209 @@ def wn_init_nodes(nodes_config, node_factory=None, output=False):
     # Process the config to create nodes
     nodes_dict = nodes_config.get_nodes_dict()
     
+    for node_dict in nodes_dict:
+        if (host_id == node_dict['node_id']):
+            raise ex.WnConfigError("Host id is set to {} and must be unique.".format(host_id))
+
     # If node_factory is not defined, create a default WnNodeFactory
     if node_factory is None:
         import warpnet.wn_node as wn_node
         node_factory = wn_node.WnNodeFactory()
 
-    for node_dict in nodes_dict:
-        if (host_id == node_dict['node_id']):
-            raise ex.WnConfigError("Host id is set to {} and must be unique.".format(host_id))
+    node_factory.node_cache = node_cache
 
-        # Set up the node_factory from the Node dictionary
-        node_factory.setup(node_dict)
+    def init_node(factory, node_dict):
+        factory.setup(node_dict)
+        node = factory.create_node(raise_errors=True)
+        node.configure_node(jumbo_frame_support, node_cache)
+        return node
 
-        # Create the correct type of node; will return None and print a 
-        #   warning if the node is not recognized
-        node = node_factory.create_node()
+    # Each worker uses its own copy of the node_factory
+    outputs = wn_map_parallel(init_node, nodes_dict, max_workers, 
+                              worker_setup=node_factory.copy)
 
-        if not node is None:
-            node.configure_node(jumbo_frame_support)
-            nodes.append(node)
+    if node_cache is not None:
+        node_cache.save_config()
 
-    if output:
-        print("-" * 50)
-        print("Initialized Nodes:")
-        print("-" * 50)
-        for node in nodes:
-            print(node)
-            print("-" * 30)
-        print("-" * 50)
+    return [{'serial_number' : node_dict['serial_number'], 
+             'node'          : node, 
+             'error'         : error} for (node_dict, (node, error)) in zip(nodes_dict, outputs)]
 
-    return nodes
+# End of wn_init_nodes_parallel()
 
-# End of wn_init_nodes()
+
+def wn_map_parallel(function, items, max_workers, worker_setup=None):
+    """Call function for each of the items with up to max_workers threads.
+
+    Returns a list with one (result, error) tuple per item (in the same 
+    order), where error is the exception raised by function (and result is
+    None) or None.  An exception does not stop the worker, so the remaining
+    items are still processed.
+
+    Attributes:
+        function -- Function called with each item (ie function(item)), or
+                    with the value returned by worker_setup and each item
+                    (ie function(state, item)) if worker_setup is provided
+        items -- List of items
+        max_workers -- Maximum number of threads
+        worker_setup -- Function called once in each thread to create the
+                        state of the thread (optional)
+    """
+    outputs  = [(None, None)] * len(items)
+    next_idx = [0]
+    lock     = threading.Lock()
+
+    def worker():
+        if worker_setup is not None:
+            state = worker_setup()
+
+        while True:
+            with lock:
+                idx = next_idx[0]
+                next_idx[0] += 1
+
+            if (idx >= len(items)):
+                break
+
+            try:
+                if worker_setup is not None:
+                    outputs[idx] = (function(state, items[idx]), None)
+                else:
+                    outputs[idx] = (function(items[idx]), None)
+            except Exception as err:
+                outputs[idx] = (None, err)
+
+    threads = [threading.Thread(target=worker) 
+               for _ in range(max(1, min(max_workers, len(items))))]
+
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    return outputs
+
+# End of wn_map_parallel()
+
+
+def wn_send_cmd_bcast(nodes, cmd, group_id=0, max_attempts=2, timeout=None):
+    """Send the provided command to all of the nodes with one broadcast
+    packet.
+
+    If every node answers broadcast messages (see bcast_ack_support of 
+    WnTransportEthUdp), each node answers the broadcast with a unicast 
+    response.  The nodes that do not answer before the timeout are sent the
+    command again by unicast (see WnNode.send_cmd()), so a configuration 
+    change of a fleet of nodes costs one packet plus a retry for each node 
+    that missed it.
+
+    Otherwise the command is sent in one broadcast packet that does not 
+    require a response and no node is retried:  the host cannot tell which
+    nodes missed the broadcast, and a node that processed it would process a
+    non-idempotent command twice.  No response is returned.
+
+    Commands whose response is a WnBuffer are sent to every node by unicast.
+
+    The broadcast is processed by every node in the node group group_id 
+    (see WnTransportEthUdp.add_node_group_id()) or by every node on the 
+    network if group_id is 0.  Nodes that process the broadcast but are not
+    in nodes are not retried and their responses are ignored.
+
+    NOTE:  Broadcast acknowledgements and node group filtering only work on
+    emulated nodes (see wn_emulator).  WARP hardware does not answer 
+    broadcast commands and processes every broadcast command regardless of
+    its node group.  A non-zero group_id therefore raises a 
+    WnTransportError unless group_id_support is set on the broadcast 
+    transport of the first node (see WnTransportEthUdpPyBcast).
+
+    Returns a list with one dictionary per node in nodes (in the same order)
+    with the keys:
+        'serial_number' -- Serial number of the node
+        'response' -- Processed response of the command (see 
+                      WnNode.send_cmd())
+        'error' -- Exception that caused the failure (or None)
+        'bcast' -- True if the node answered the broadcast packet (always
+                   False if the nodes do not answer broadcast messages)
+
+    Attributes:
+        nodes -- List of WnNode objects
+        cmd -- WnCommand to send
+        group_id -- Node group ID of the broadcast (0 = all nodes)
+        max_attempts -- Maximum number of attempts of each unicast retry
+        timeout -- Time (in sec) to wait for the responses to the broadcast
+                   (optional; defaults to the largest retransmission timeout 
+                   of the nodes, see WnTransportEthUdp.get_rx_timeout())
+    """
+    import warpnet.wn_message as wn_message
+    import warpnet.wn_transport as wn_transport
+
+    results = [{'serial_number' : node.serial_number,
+                'response'      : None,
+                'error'         : None,
+                'bcast'         : False} for node in nodes]
+
+    if not nodes:
+        return results
+
+    resp_type = cmd.get_resp_type()
+    payload = cmd.serialize()
+    transport_bcast = nodes[0].transport_bcast
+
+    bcast_ack_support = all([node.transport.bcast_ack_support for node in nodes])
+
+    if ((resp_type == wn_transport.TRANSPORT_NO_RESP) or
+            ((resp_type == wn_transport.TRANSPORT_WN_RESP) and not bcast_ack_support)):
+        transport_bcast.send(payload, 'message', group_id=group_id)
+        return results
+
+    replies = {}
+
+    if (resp_type == wn_transport.TRANSPORT_WN_RESP):
+        if timeout is None:
+            timeout = max([node.transport.get_rx_timeout() for node in nodes])
+
+        start_time = time.time()
+        transport_bcast.send(payload, 'message', response_required=True, group_id=group_id)
+        replies = transport_bcast.receive_acks([node.node_id for node in nodes], timeout)
+        latency = time.time() - start_time
+
+    for (idx, node) in enumerate(nodes):
+        reply = replies.get(node.node_id)
+
+        if reply is None:
+            continue
+
+        cmd_stats = node.stats.get_cmd_stats(cmd.command, cmd.__class__.__name__)
+        cmd_stats.num_cmds += 1
+        cmd_stats.tx_bytes += len(payload)
+        cmd_stats.rx_bytes += len(reply)
+        cmd_stats.add_latency(latency)
+
+        resp = wn_message.WnResp()
+        resp.deserialize(reply)
+
+        results[idx]['bcast'] = True
+
+        try:
+            results[idx]['response'] = cmd.process_resp(resp)
+        except Exception as err:
+            results[idx]['error'] = err
+
+    # Retry the nodes that did not answer the broadcast by unicast
+    for (idx, node) in enumerate(nodes):
+        if results[idx]['bcast']:
+            continue
+
+        try:
+            results[idx]['response'] = node.send_cmd(cmd, max_attempts)
+        except Exception as err:
+            results[idx]['error'] = err
+
+    return results
+
+# End of wn_send_cmd_bcast()
 
 
 def wn_setup():
@@ -341,8 +575,19 @@ def wn_setup():
 
     my_transport_type = config.get_param('network', 'transport_type')
     print("-" * 50)
-    print("Currently the only transport supported by the Python WARPNet")
-    print("    framework is '{0}'\n".format(my_transport_type))
+    print("Select the transport used by the Python WARPNet framework:")
+    print("    'python'        -- One socket per node")
+    print("    'python_shared' -- One socket shared by all nodes")
+    print("    Current transport is '{0}'\n".format(my_transport_type))
+
+    temp = raw_input("WARPNet transport: ")
+    if temp in ['python', 'python_shared']:
+        print("    Setting transport to '{0}'".format(temp))
+        config.set_param('network', 'transport_type', temp)
+    else:
+        if not temp is '':
+            print("    '{0}' is not a valid transport.".format(temp))
+        print("    Setting transport to '{0}'".format(my_transport_type))
 
     #-------------------------------------------------------------------------
     # Configure Transport Jumbo Frame Support
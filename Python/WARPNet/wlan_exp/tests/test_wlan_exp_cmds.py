@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+------------------------------------------------------------------------------
+WLAN Experiment Command Tests
+------------------------------------------------------------------------------
+Authors:   Chris Hunter (chunter [at] mangocomm.com)
+           Patrick Murphy (murphpo [at] mangocomm.com)
+           Erik Welsh (welsh [at] mangocomm.com)
+License:   Copyright 2014, Mango Communications. All rights reserved.
+           Distributed under the WARP license (http://warpproject.org/license)
+------------------------------------------------------------------------------
+MODIFICATION HISTORY:
+
+Ver   Who  Date     Changes
+----- ---- -------- -----------------------------------------------------
+1.00a ejw  10/17/26 Initial release
+
+------------------------------------------------------------------------------
+
+Tests of the commands of wlan_exp_cmds.
+
+"""
+
+import unittest
+
+from warpnet.tests.test_wn_message import get_cmd_classes
+
+from wlan_exp import wlan_exp_cmds
+
+
+class TestWlanExpCmds(unittest.TestCase):
+    """Tests of the commands of wlan_exp_cmds."""
+
+    def test_slots(self):
+        classes = get_cmd_classes(wlan_exp_cmds)
+        self.assertGreater(len(classes), 0)
+
+        for cls in classes:
+            for base in cls.__mro__[:-1]:
+                self.assertIn('__slots__', vars(base), base.__name__)
+
+        for cmd in [wlan_exp_cmds.WlanExpCmdLogGetEvents(1024, 0),
+                    wlan_exp_cmds.WlanExpCmdResetLog(),
+                    wlan_exp_cmds.WlanExpCmdNodeTime(0),
+                    wlan_exp_cmds.WlanExpCmdStreamLogEntries(1, 250, '127.0.0.1', 7000)]:
+            self.assertFalse(hasattr(cmd, '__dict__'), cmd.__class__.__name__)
+
+# End Class
+
+
+if __name__ == '__main__':
+    unittest.main()
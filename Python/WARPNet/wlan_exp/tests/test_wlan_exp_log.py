@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+------------------------------------------------------------------------------
+WLAN Experiment Event Log Tests
+------------------------------------------------------------------------------
+Authors:   Chris Hunter (chunter [at] mangocomm.com)
+           Patrick Murphy (murphpo [at] mangocomm.com)
+           Erik Welsh (welsh [at] mangocomm.com)
+License:   Copyright 2014, Mango Communications. All rights reserved.
+           Distributed under the WARP license (http://warpproject.org/license)
+------------------------------------------------------------------------------
+MODIFICATION HISTORY:
+
+Ver   Who  Date     Changes
+----- ---- -------- -----------------------------------------------------
+1.00a ejw  10/17/26 Initial release
+
+------------------------------------------------------------------------------
+
+Tests of the event log decoder, index files and log merge of wlan_exp_log
+on hand built logs.
+
+"""
+
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+from wlan_exp import wlan_exp_log as log
+
+
+def log_entry(entry_type, timestamp, seq_num=0, rate=0, padding=0):
+    """Return the bytes of a TX / RX log entry (followed by padding bytes
+    that are part of the entry)."""
+    entry_struct = log.log_get_entry_struct(entry_type)
+    length       = entry_struct.size - log.ENTRY_HEADER_SIZE + padding
+
+    return entry_struct.pack(log.ENTRY_DELIMITER | seq_num, entry_type, length, timestamp,
+                             b'\x00' * 24, 100, rate, 1, 0, 0, 0) + b'\x00' * padding
+
+# End of log_entry()
+
+
+@unittest.skipIf(log.np is None, "NumPy is not installed")
+class TestWlanExpLog(unittest.TestCase):
+    """Tests of log_index() and log_get_entries()."""
+
+    def test_index(self):
+        entries = [log_entry(log.ENTRY_TYPE_TX, 1000 + i, seq_num=i) for i in range(3)]
+        entries.append(log_entry(log.ENTRY_TYPE_RX_OFDM, 2000, seq_num=3, padding=4))
+        log_data = b''.join(entries)
+
+        index = log.log_index(log_data)
+
+        size = len(entries[0])
+
+        self.assertEqual(index['offset'].tolist(), [0, size, 2 * size, 3 * size])
+        self.assertEqual(index['entry_type'].tolist(), [20, 20, 20, 10])
+        self.assertEqual(index['timestamp'].tolist(), [1000, 1001, 1002, 2000])
+
+
+    def test_index_partial_entries(self):
+        entry = log_entry(log.ENTRY_TYPE_TX, 1000)
+
+        # The start of a wrapped log and a partial entry at the end are
+        #   skipped
+        log_data = entry[-10:] + entry + entry + entry[:20]
+        index    = log.log_index(log_data)
+
+        self.assertEqual(index['offset'].tolist(), [10, 10 + len(entry)])
+
+        self.assertEqual(len(log.log_index(b'')), 0)
+        self.assertEqual(len(log.log_index(b'\x00' * 100)), 0)
+
+
+    def test_get_entries(self):
+        tx_entries = [log_entry(log.ENTRY_TYPE_TX, 1000 + i, rate=i) for i in range(4)]
+        log_data   = b''.join(tx_entries)
+
+        # Equally spaced entries are a view of the log
+        buf     = bytearray(log_data)
+        entries = log.log_get_entries(buf)
+        tx      = entries[log.ENTRY_TYPE_TX]
+
+        self.assertEqual(list(entries.keys()), [log.ENTRY_TYPE_TX])
+        self.assertEqual(tx['timestamp'].tolist(), [1000, 1001, 1002, 1003])
+        self.assertEqual(tx['rate'].tolist(), [0, 1, 2, 3])
+        self.assertEqual(tx['length'].tolist(), [100] * 4)
+
+        buf[log.ENTRY_HEADER_SIZE] = 0xFF
+        self.assertEqual(tx['timestamp'][0], 1000 - (1000 & 0xFF) + 0xFF)
+
+        # Entries of many sizes and types are gathered (entries of unknown
+        #   types are skipped)
+        unknown  = struct.pack('<I 2H Q', log.ENTRY_DELIMITER, 0x7777, 8, 1200)
+        log_data = (tx_entries[0] + log_entry(log.ENTRY_TYPE_RX_OFDM, 1500, padding=8) +
+                    tx_entries[1] + tx_entries[2] + unknown + tx_entries[3])
+        entries  = log.log_get_entries(log_data)
+
+        self.assertEqual(entries[log.ENTRY_TYPE_TX]['timestamp'].tolist(), [1000, 1001, 1002, 1003])
+        self.assertEqual(entries[log.ENTRY_TYPE_RX_OFDM]['timestamp'].tolist(), [1500])
+        self.assertNotIn(0x7777, entries)
+
+        entries = log.log_get_entries(log_data, entry_types=[log.ENTRY_TYPE_RX_OFDM])
+        self.assertEqual(list(entries.keys()), [log.ENTRY_TYPE_RX_OFDM])
+
+
+    def test_short_entries(self):
+        entry = log_entry(log.ENTRY_TYPE_TX, 1000)
+        short = bytearray(entry[:20])
+
+        # Entry length of the short entry
+        short[6:8] = bytearray([20 - log.ENTRY_HEADER_SIZE, 0])
+
+        entries = log.log_get_entries(entry + bytes(short) + entry)
+        self.assertEqual(len(entries[log.ENTRY_TYPE_TX]), 2)
+
+
+    def test_index_select(self):
+        log_data = b''.join([log_entry(entry_type, timestamp)
+                             for (entry_type, timestamp) in [(20, 100), (10, 200), (20, 300), (11, 400)]])
+        index    = log.log_index(log_data)
+
+        self.assertEqual(log.log_index_select(index, entry_types=[20])['timestamp'].tolist(), [100, 300])
+        self.assertEqual(log.log_index_select(index, start_time=200, end_time=400)['timestamp'].tolist(),
+                         [200, 300])
+
+# End Class
+
+
+
+@unittest.skipIf(log.np is None, "NumPy is not installed")
+class TestWlanExpLogFiles(unittest.TestCase):
+    """Tests of the index files of event log files."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+
+    def write_log(self, name, timestamps, entry_type=log.ENTRY_TYPE_TX):
+        log_file = os.path.join(self.directory, name)
+
+        with open(log_file, 'wb') as fh:
+            fh.write(b''.join([log_entry(entry_type, timestamp) for timestamp in timestamps]))
+
+        return log_file
+
+
+    def test_read_index(self):
+        log_file   = self.write_log('node_1.bin', [100, 200, 300])
+        index_file = os.path.join(self.directory, 'node_1.idx')
+
+        self.assertIsNone(log.log_read_index(log_file, create=False))
+        self.assertFalse(os.path.exists(index_file))
+
+        # The index file is created on the first read and then mapped
+        index = log.log_read_index(log_file)
+
+        self.assertTrue(os.path.exists(index_file))
+        self.assertEqual(index['timestamp'].tolist(), [100, 200, 300])
+
+        index = log.log_read_index(log_file, create=False)
+
+        with open(log_file, 'rb') as fh:
+            log_data = fh.read()
+
+        self.assertIsInstance(index, log.np.memmap)
+        self.assertEqual(index.tolist(), log.log_index(log_data).tolist())
+        del index
+
+
+    def test_stale_index(self):
+        log_file = self.write_log('node_1.bin', [100, 200, 300])
+        log.log_write_index(log_file)
+
+        # An index file of an earlier log file is not used
+        self.write_log('node_1.bin', [100, 200, 300, 400])
+        os.utime(log_file, (0, 0))
+
+        self.assertIsNone(log.log_read_index(log_file, create=False))
+        self.assertEqual(log.log_read_index(log_file)['timestamp'].tolist(), [100, 200, 300, 400])
+
+        # Nor is an invalid index file
+        with open(os.path.join(self.directory, 'node_1.idx'), 'wb') as fh:
+            fh.write(b'invalid')
+
+        self.assertIsNone(log.log_read_index(log_file, create=False))
+        self.assertEqual(len(log.log_read_index(log_file)), 4)
+
+
+    def test_empty_log(self):
+        log_file = self.write_log('node_1.bin', [])
+
+        self.assertEqual(len(log.log_read_index(log_file)), 0)
+        self.assertEqual(len(log.log_read_index(log_file, create=False)), 0)
+
+
+    def test_merge(self):
+        logs = {1 : self.write_log('node_1.bin', [100, 300, 500, 700]),
+                2 : b''.join([log_entry(log.ENTRY_TYPE_RX_OFDM, timestamp)
+                              for timestamp in [0, 150, 250, 600]]),
+                3 : self.write_log('node_3.bin', [])}
+
+        # Node 2 is 100 us behind the host (and the other nodes)
+        offsets = log.log_get_time_offsets({2 : [90, 100, 250]})
+        self.assertEqual(offsets, {2 : 100})
+
+        for chunk_size in [1, 3, log.LOG_MERGE_CHUNK_SIZE]:
+            merged = [(timestamp, node, entry_type, int(entry['timestamp']))
+                      for (timestamp, node, entry_type, entry) in log.log_merge(logs, offsets,
+                                                                                chunk_size=chunk_size)]
+
+            # Entries with equal timestamps are in the order of the logs
+            self.assertEqual(merged, [(100, 1, 20, 100), (100, 2, 10, 0), (250, 2, 10, 150),
+                                      (300, 1, 20, 300), (350, 2, 10, 250), (500, 1, 20, 500),
+                                      (700, 1, 20, 700), (700, 2, 10, 600)])
+
+        merged = log.log_merge(logs, offsets, entry_types=[log.ENTRY_TYPE_RX_OFDM])
+        self.assertEqual([node for (_, node, _, _) in merged], [2] * 4)
+
+
+    def test_time_offsets(self):
+        offsets = log.log_get_time_offsets({1 : [5, 1, 3], 2 : [], 3 : {'offset' : -20},
+                                            4 : {'offset' : None}})
+        self.assertEqual(offsets, {1 : 3, 3 : -20})
+
+# End Class
+
+
+if __name__ == '__main__':
+    unittest.main()
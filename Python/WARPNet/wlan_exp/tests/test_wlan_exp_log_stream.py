@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+------------------------------------------------------------------------------
+WLAN Experiment Log Stream Receiver Tests
+------------------------------------------------------------------------------
+Authors:   Chris Hunter (chunter [at] mangocomm.com)
+           Patrick Murphy (murphpo [at] mangocomm.com)
+           Erik Welsh (welsh [at] mangocomm.com)
+License:   Copyright 2014, Mango Communications. All rights reserved.
+           Distributed under the WARP license (http://warpproject.org/license)
+------------------------------------------------------------------------------
+MODIFICATION HISTORY:
+
+Ver   Who  Date     Changes
+----- ---- -------- -----------------------------------------------------
+1.00a ejw  10/17/26 Initial release
+
+------------------------------------------------------------------------------
+
+Tests of the sequence number tracking, queue limit and segment files of
+WlanExpLogStreamReceiver.
+
+"""
+
+import os
+import time
+import shutil
+import socket
+import struct
+import tempfile
+import unittest
+
+from wlan_exp import wlan_exp_log_stream
+
+
+NODE_ID = 1
+
+
+def stream_pkt(seq_num, entries, src_id=NODE_ID):
+    """Return a stream packet of a node with the given log entries."""
+    hdr = struct.pack('!2H 2B 3H', 0xFFFF, src_id, 0, 0, len(entries), seq_num, 0)
+    return b'\x00\x00' + hdr + entries
+
+# End of stream_pkt()
+
+
+class TestWlanExpLogStream(unittest.TestCase):
+    """Tests of WlanExpLogStreamReceiver."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+
+    def process(self, receiver, seq_nums, entries=b'\x00' * 8, src_id=NODE_ID):
+        for seq_num in seq_nums:
+            receiver._process_packet(memoryview(stream_pkt(seq_num, entries, src_id)))
+
+
+    def test_seq_nums(self):
+        receiver = wlan_exp_log_stream.WlanExpLogStreamReceiver(0, self.directory)
+
+        # 2, 3 and 4 are missing when 5 is received (2 is then late)
+        self.process(receiver, [0, 1, 5, 2, 6])
+
+        # Sequence numbers wrap after 0xFFFE without loss
+        self.process(receiver, [0xFFFD, 0xFFFE, 0, 1], src_id=NODE_ID + 1)
+
+        (stats, wrap_stats) = receiver.get_stats()
+
+        self.assertEqual(stats['num_pkts'], 5)
+        self.assertEqual(stats['num_lost'], 3)
+        self.assertEqual(stats['num_out_of_order'], 1)
+        self.assertEqual(stats['num_bytes'], 5 * 8)
+        self.assertEqual(receiver.nodes[NODE_ID].last_seq_num, 6)
+
+        self.assertEqual(wrap_stats['num_pkts'], 4)
+        self.assertEqual(wrap_stats['num_lost'], 0)
+        self.assertEqual(wrap_stats['num_out_of_order'], 0)
+        self.assertEqual(receiver.nodes[NODE_ID + 1].last_seq_num, 1)
+
+        # Short packets
+        receiver._process_packet(memoryview(b'\x00' * 4))
+        self.assertEqual(receiver.num_invalid, 1)
+
+
+    def test_queue_full(self):
+        receiver = wlan_exp_log_stream.WlanExpLogStreamReceiver(0, self.directory,
+                                                                max_queued_bytes=100)
+
+        self.process(receiver, [0, 1, 2], entries=b'\x00' * 40)
+
+        stats = receiver.get_stats()[0]
+
+        # Bytes of dropped packets are not counted
+        self.assertEqual(stats['num_pkts'], 3)
+        self.assertEqual(stats['num_dropped'], 1)
+        self.assertEqual(stats['num_bytes'], 80)
+        self.assertEqual(stats['num_lost'], 0)
+        self.assertEqual(receiver.num_dropped, 1)
+
+
+    def test_segments(self):
+        receiver = wlan_exp_log_stream.WlanExpLogStreamReceiver(0, self.directory,
+                                                                ip_address='127.0.0.1',
+                                                                segment_size=100,
+                                                                max_segments=2)
+        receiver.start()
+        self.addCleanup(receiver.stop)
+
+        entries = [bytes(bytearray([i] * 60)) for i in range(5)]
+        sock    = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.addCleanup(sock.close)
+
+        for (seq_num, data) in enumerate(entries):
+            sock.sendto(stream_pkt(seq_num, data), receiver._sock.getsockname())
+
+        end_time = time.time() + 5
+
+        while (time.time() < end_time):
+            stats = receiver.get_stats()
+            if stats and (stats[0]['num_pkts'] == len(entries)):
+                break
+            time.sleep(0.01)
+
+        receiver.stop()
+
+        # Segments of 2 packets each, of which the oldest is deleted
+        stats    = receiver.get_stats()[0]
+        segments = receiver.get_segments(NODE_ID)
+
+        self.assertEqual(stats['num_pkts'], 5)
+        self.assertEqual(stats['num_segments'], 3)
+        self.assertEqual(len(segments), 2)
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+
+        data = b''
+        for filename in segments:
+            with open(filename, 'rb') as fh:
+                data += fh.read()
+
+        self.assertEqual(data, b''.join(entries[2:]))
+
+# End Class
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+------------------------------------------------------------------------------
+WLAN Experiment Node Tests
+------------------------------------------------------------------------------
+Authors:   Chris Hunter (chunter [at] mangocomm.com)
+           Patrick Murphy (murphpo [at] mangocomm.com)
+           Erik Welsh (welsh [at] mangocomm.com)
+License:   Copyright 2014, Mango Communications. All rights reserved.
+           Distributed under the WARP license (http://warpproject.org/license)
+------------------------------------------------------------------------------
+MODIFICATION HISTORY:
+
+Ver   Who  Date     Changes
+----- ---- -------- -----------------------------------------------------
+1.00a ejw  10/17/26 Initial release
+
+------------------------------------------------------------------------------
+
+Tests of the log transfers of WlanExpNode against emulated nodes (see
+wlan_exp_emulator) with packet loss and reordering.  The bytes read from
+a node are compared to the log of the emulated node.
+
+"""
+
+import os
+import shutil
+import asyncio
+import tempfile
+import unittest
+
+from wlan_exp import wlan_exp_cmds
+from wlan_exp import wlan_exp_util
+from wlan_exp import wlan_exp_config
+from wlan_exp import wlan_exp_emulator
+from wlan_exp import wlan_exp_node_ap
+from wlan_exp import wlan_exp_node_sta
+from wlan_exp import wlan_exp_node_async
+
+
+class TestWlanExpNode(unittest.TestCase):
+    """Tests of the log transfers of WlanExpNode over a lossy network that
+    reorders packets."""
+
+    def setUp(self):
+        self.emulator = wlan_exp_emulator.WlanExpEmulator(seed=2)
+        self.emulator.add_nodes(2, log_rate=0, log_wrap=False, event_log_size=2**20)
+        self.emulator.start()
+        self.addCleanup(self.emulator.stop)
+
+        self.nodes = wlan_exp_util.wlan_exp_init_nodes(self.emulator.get_nodes_config())
+        self.nodes.sort(key=lambda node: node.serial_number)
+        self.assertEqual(len(self.nodes), 2)
+
+        self.logs = []
+
+        for emulated_node in self.emulator.nodes:
+            emulated_node.fill_log()
+            self.logs.append(bytes(emulated_node._log))
+
+        self.emulator.loss    = 0.05
+        self.emulator.latency = 0.0002
+        self.emulator.reorder = 0.1
+
+
+    def get_cmd_stats(self, node):
+        cmd = wlan_exp_cmds.WlanExpCmdLogGetEvents(0, 0)
+        return node.stats.get_cmd_stats(cmd.command, cmd.__class__.__name__)
+
+
+    def run_async(self, coroutine):
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        return loop.run_until_complete(coroutine)
+
+
+    def test_send_cmd_buffer(self):
+        node = self.nodes[0]
+
+        for (size, start_byte) in [(100, 5), (1000, 0), (40000, 12345)] * 10:
+            cmd    = wlan_exp_cmds.WlanExpCmdLogGetEvents(size, start_byte)
+            buffer = node.send_cmd(cmd, max_attempts=10)
+
+            self.assertEqual(bytes(buffer.get_bytes()),
+                             self.logs[0][start_byte:start_byte + size])
+
+        cmd_stats = self.get_cmd_stats(node)
+        self.assertEqual(cmd_stats.num_failures, 0)
+        self.assertGreater(cmd_stats.num_retransmissions, 0)
+
+
+    def test_send_cmd_chunked(self):
+        node     = self.nodes[0]
+        log_size = len(self.logs[0])
+
+        for (size, start_byte) in [(log_size, 0), (500000, 12345), (100, 5)]:
+            buffer = node.get_log_events(size, start_byte)
+
+            self.assertEqual(bytes(buffer.get_bytes()),
+                             self.logs[0][start_byte:start_byte + size])
+
+        cmd_stats = self.get_cmd_stats(node)
+        self.assertEqual(cmd_stats.num_failures, 0)
+        self.assertGreater(cmd_stats.num_retransmissions, 0)
+
+
+    def test_send_cmd_chunked_storage(self):
+        node    = self.nodes[1]
+        size    = 300000
+        storage = bytearray(size)
+        cmd     = wlan_exp_cmds.WlanExpCmdLogGetEvents(size, 1000)
+
+        node.send_cmd_chunked(cmd, chunk_size=32768, window=8, max_attempts=10,
+                              storage=memoryview(storage))
+
+        self.assertEqual(bytes(storage), self.logs[1][1000:1000 + size])
+
+
+    def test_chunk_window(self):
+        node = self.nodes[0]
+
+        # The outstanding chunks fit in half of the receive buffer
+        node.transport.rx_buffer_size = 200000
+        max_payload = node.transport.get_max_payload()
+
+        for window in [1, 4, 16]:
+            (chunk_size, chunk_window) = node._get_chunk_window(None, window)
+            num_pkts = -(-chunk_size // ((max_payload - 24) & ~0x3))
+
+            self.assertGreaterEqual(chunk_window, 1)
+            self.assertLessEqual(chunk_window, window)
+            self.assertLessEqual(chunk_window * num_pkts * max_payload, 100000)
+
+        buffer = node.get_log_events(len(self.logs[0]))
+        self.assertEqual(bytes(buffer.get_bytes()), self.logs[0])
+
+
+    def test_async_send_cmd_buffer(self):
+
+        async def get_log_events(nodes):
+            async_nodes = await wlan_exp_node_async.create_nodes(nodes)
+            output      = []
+
+            for _ in range(10):
+                cmds = [wlan_exp_cmds.WlanExpCmdLogGetEvents(40000, 100)
+                        for node in async_nodes]
+                output.append(await asyncio.gather(*[node.send_cmd(cmd, max_attempts=10)
+                                                     for (node, cmd) in zip(async_nodes, cmds)]))
+            return output
+
+        for buffers in self.run_async(get_log_events(self.nodes)):
+            for (buffer, log) in zip(buffers, self.logs):
+                self.assertEqual(bytes(buffer.get_bytes()), log[100:40100])
+
+
+    def test_async_get_log(self):
+
+        async def get_logs(nodes):
+            async_nodes = await wlan_exp_node_async.create_nodes(nodes)
+            return await asyncio.gather(*[node.get_log() for node in async_nodes])
+
+        for (buffer, log) in zip(self.run_async(get_logs(self.nodes)), self.logs):
+            self.assertEqual(bytes(buffer.get_bytes()), log)
+
+
+    def test_async_cmds(self):
+        self.emulator.loss = 0.0
+
+        async def set_channels(nodes):
+            async_nodes = await wlan_exp_node_async.create_nodes(nodes)
+            await asyncio.gather(*[node.set_channel(idx + 3)
+                                   for (idx, node) in enumerate(async_nodes)])
+            channels = await asyncio.gather(*[node.get_channel() for node in async_nodes])
+            await async_nodes[0].reset_log()
+            return channels
+
+        self.nodes[0].log_cursor = 1000
+
+        self.assertEqual(self.run_async(set_channels(self.nodes)), [3, 4])
+        self.assertEqual([node.get_channel() for node in self.nodes], [3, 4])
+        self.assertEqual(self.nodes[0].log_cursor, 0)
+        self.assertEqual(self.nodes[0].get_log_end(), 0)
+
+# End Class
+
+
+
+class TestWlanExpNodeLogTail(unittest.TestCase):
+    """Tests of WlanExpNode.get_log_tail() against an emulated node with a
+    small log that wraps."""
+
+    def setUp(self):
+        self.emulator = wlan_exp_emulator.WlanExpEmulator(seed=3)
+        self.emulator.add_nodes(1, log_rate=0, log_wrap=True, event_log_size=2**12)
+        self.emulator.start()
+        self.addCleanup(self.emulator.stop)
+
+        self.node     = wlan_exp_util.wlan_exp_init_nodes(self.emulator.get_nodes_config())[0]
+        self.emulated = self.emulator.nodes[0]
+
+        self.node.reset_log()
+
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+
+    def get_log_tail(self, file_name=None):
+        resp = self.node.get_log_tail(file_name)
+        if resp is None:
+            return None
+        return bytes(resp.get_bytes())
+
+
+    def test_empty_log(self):
+        # Without a cursor, an empty log has no bytes to get
+        self.node.log_cursor = None
+
+        self.assertIsNone(self.node.get_log_tail())
+        self.assertEqual(self.node.log_cursor, 0)
+
+        entries = self.emulated.add_log_entries(10)
+
+        self.assertEqual(self.get_log_tail(), b''.join(entries))
+        self.assertIsNone(self.node.get_log_tail())
+
+
+    def test_wrap(self):
+        entries = self.emulated.add_log_entries(10)
+        self.assertEqual(self.get_log_tail(), b''.join(entries))
+
+        # Entries that wrap around the end of the log buffer are in order
+        capacity = self.node.event_log_size // len(entries[0])
+        entries  = self.emulated.add_log_entries(capacity - 5)
+
+        self.assertEqual(self.get_log_tail(), b''.join(entries))
+
+
+    def test_file_error(self):
+        file_name   = os.path.join(self.directory, 'log.bin')
+        bad_name    = os.path.join(self.directory, 'missing', 'log.bin')
+        log_cursors = wlan_exp_config.WlanExpLogCursors(os.path.join(self.directory, 'cursors.ini'))
+
+        entries = self.emulated.add_log_entries(10)
+
+        # The cursor is not advanced (or saved) if the file cannot be written
+        with self.assertRaises(IOError):
+            wlan_exp_util.wlan_exp_get_log_tails([self.node], log_cursors, bad_name)
+
+        self.assertEqual(self.node.log_cursor, 0)
+        self.assertIsNone(log_cursors.get_cursor(self.node))
+
+        wlan_exp_util.wlan_exp_get_log_tails([self.node], log_cursors, file_name)
+
+        with open(file_name, 'rb') as fh:
+            self.assertEqual(fh.read(), b''.join(entries))
+
+        self.assertEqual(log_cursors.get_cursor(self.node), self.node.log_cursor)
+        self.assertEqual(self.node.log_cursor, len(b''.join(entries)))
+
+# End Class
+
+
+if __name__ == '__main__':
+    unittest.main()
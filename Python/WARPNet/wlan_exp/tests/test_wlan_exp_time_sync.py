@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+------------------------------------------------------------------------------
+WLAN Experiment Time Synchronization Tests
+------------------------------------------------------------------------------
+Authors:   Chris Hunter (chunter [at] mangocomm.com)
+           Patrick Murphy (murphpo [at] mangocomm.com)
+           Erik Welsh (welsh [at] mangocomm.com)
+License:   Copyright 2014, Mango Communications. All rights reserved.
+           Distributed under the WARP license (http://warpproject.org/license)
+------------------------------------------------------------------------------
+MODIFICATION HISTORY:
+
+Ver   Who  Date     Changes
+----- ---- -------- -----------------------------------------------------
+1.00a ejw  10/17/26 Initial release
+
+------------------------------------------------------------------------------
+
+Tests of wlan_exp_time_sync against nodes with a simulated clock (so that
+the delays and offsets are exact) and against emulated nodes.
+
+"""
+
+import unittest
+
+from wlan_exp import wlan_exp_util
+from wlan_exp import wlan_exp_emulator
+from wlan_exp import wlan_exp_time_sync as time_sync
+from wlan_exp import wlan_exp_node_ap
+from wlan_exp import wlan_exp_node_sta
+
+
+class SimNode(object):
+    """Node with a simulated clock.  The host time and the node time (in us)
+    advance by the one way delays of each command; the delays of the get 
+    time commands are taken from a list of (request delay, response delay).
+    The offset of the node (host time - node time) is offset + skew * host
+    time.
+    """
+    def __init__(self, offset, delays=None, serial_number=1, skew=0.0):
+        self.serial_number = serial_number
+        self.now           = 0.0
+        self.offset        = offset
+        self.skew          = skew
+        self.delays        = list(delays or [])
+
+    def host_time(self):
+        return self.now
+
+    def node_time(self, host_time):
+        return host_time - (self.offset + self.skew * host_time)
+
+    def get_time(self):
+        (delay_req, delay_resp) = self.delays.pop(0) if self.delays else (10, 10)
+        self.now += delay_req
+        node_time = self.node_time(self.now)
+        self.now += delay_resp
+        return node_time
+
+    def set_time(self, node_time):
+        self.now   += 10
+        self.offset = self.now - node_time - self.skew * self.now
+        self.now   += 10
+
+# End Class
+
+
+class TestWlanExpTimeSync(unittest.TestCase):
+    """Tests of time_measure_offset() and the synchronization of nodes."""
+
+    def test_measure_offset(self):
+        # The exchanges with the smallest delays are kept
+        delays = [(100, 100), (5, 5), (10, 30), (6, 6), (500, 10), (4, 8)]
+        node   = SimNode(1000, delays)
+        result = time_sync.time_measure_offset(node, node.host_time, num_exchanges=6, num_keep=3)
+
+        # Offsets of the kept exchanges:  1000, 1000 and 1002
+        self.assertEqual(result['offset'], 1000)
+        self.assertEqual(result['delay'], 10)
+        self.assertEqual(result['max_error'], 6)
+        self.assertAlmostEqual(result['jitter'], (4 / 3.0) ** 0.5)
+        self.assertEqual(node.delays, [])
+
+        # The error of the offset is at most half of the delay
+        node   = SimNode(-250, [(0, 40)])
+        result = time_sync.time_measure_offset(node, node.host_time, num_exchanges=1)
+
+        self.assertEqual(result['offset'], -250 + 20)
+        self.assertLessEqual(abs(result['offset'] - node.offset), result['max_error'])
+
+
+    def test_sync_node(self):
+        node   = SimNode(123456)
+        result = time_sync._sync_node(node, node.host_time, 4, 2, max_iterations=3, tolerance=1)
+
+        self.assertEqual(node.offset, 0)
+        self.assertEqual(result['offset'], 0)
+        self.assertEqual(result['num_iterations'], 1)
+
+
+    def test_sync_nodes(self):
+        emulator = wlan_exp_emulator.WlanExpEmulator(seed=4)
+        emulator.add_nodes(2)
+        emulator.start()
+        self.addCleanup(emulator.stop)
+
+        nodes = wlan_exp_util.wlan_exp_init_nodes(emulator.get_nodes_config())
+        self.assertEqual(len(nodes), 2)
+
+        for (idx, emulated) in enumerate(emulator.nodes):
+            emulated.clock_offset += (idx + 1) * 10**6
+
+        results = time_sync.time_sync_nodes(nodes, time_base=100, num_exchanges=8)
+
+        for node in nodes:
+            result = results[node.serial_number]
+
+            self.assertIsNone(result['error'])
+            self.assertEqual(result['time_base'], 100)
+            self.assertGreaterEqual(result['num_iterations'], 1)
+
+            # The node time is on the host timeline (within the error of the
+            #   measurements and the time to run the commands)
+            host_time = time_sync._get_host_time_function(100, result['start_time'])
+            check     = time_sync.time_measure_offset(node, host_time, 8)
+
+            self.assertLess(abs(check['offset']), 10**4)
+
+# End Class
+
+
+
+class TestWlanExpTimeTracker(unittest.TestCase):
+    """Tests of the drift model of WlanExpTimeTracker."""
+
+    def create_tracker(self, nodes, host_time, **kwargs):
+        tracker = time_sync.WlanExpTimeTracker(nodes, **kwargs)
+        tracker._host_time = host_time
+        return tracker
+
+
+    def test_fit_model(self):
+        samples = [(t * 10**6, 50 + 1e-4 * t * 10**6) for t in range(4)]
+        model   = time_sync._fit_model(samples)
+
+        self.assertAlmostEqual(model['skew'], 1e-4)
+        self.assertAlmostEqual(model['ref_time'], 1.5 * 10**6)
+        self.assertAlmostEqual(model['offset'], 200)
+        self.assertAlmostEqual(model['residual'], 0)
+        self.assertEqual(model['num_samples'], 4)
+
+        # Offsets off the line
+        model = time_sync._fit_model([(0, 10), (1, 30), (2, 10), (3, 30)])
+
+        self.assertAlmostEqual(model['offset'], 20)
+        self.assertAlmostEqual(model['skew'], 4.0)
+        self.assertAlmostEqual(model['residual'], 80 ** 0.5)
+
+        # A single sample has no skew
+        model = time_sync._fit_model([(100, 7)])
+
+        self.assertEqual((model['offset'], model['skew'], model['residual']), (7, 0.0, 0.0))
+
+
+    def test_correct_timestamps(self):
+        node    = SimNode(1000, skew=50e-6)
+        tracker = self.create_tracker([node], node.host_time, num_exchanges=2, num_keep=1)
+
+        self.assertIsNone(tracker.get_model(node.serial_number))
+        self.assertEqual(tracker.correct_timestamps(node.serial_number, 12345), 12345)
+
+        for _ in range(5):
+            node.now += 10**6
+            tracker.update()
+
+        model = tracker.get_model(node.serial_number)
+
+        self.assertAlmostEqual(model['skew'], 50e-6)
+        self.assertAlmostEqual(model['residual'], 0, places=6)
+        self.assertEqual(model['num_samples'], 5)
+        self.assertEqual(model['num_resyncs'], 0)
+
+        # The offset of a measurement is of its first exchange (the time of
+        #   the sample is the middle of the measurement, 10 us later)
+        self.assertAlmostEqual(tracker.get_offset(node.serial_number, 10**7), 1000 + 500, places=2)
+
+        # Node timestamps from before, during and after the measurements
+        for host_time in [0, 2.5 * 10**6, 10**7]:
+            self.assertAlmostEqual(tracker.correct_timestamps(node.serial_number,
+                                                              node.node_time(host_time)),
+                                   host_time, places=2)
+
+
+    def test_resync(self):
+        node    = SimNode(1000)
+        tracker = self.create_tracker([node], node.host_time, num_exchanges=2, num_keep=1,
+                                      resync_threshold=100)
+        tracker.update()
+
+        self.assertEqual(node.offset, 0)
+        self.assertEqual(tracker.get_model(node.serial_number)['num_resyncs'], 1)
+        self.assertEqual(tracker.get_offset(node.serial_number), 0)
+
+
+    def test_errors(self):
+        node     = SimNode(1000, serial_number=1)
+        bad_node = SimNode(1000, serial_number=2)
+        tracker  = self.create_tracker([bad_node, node], node.host_time, num_exchanges=2)
+
+        def get_time():
+            raise IOError("No response")
+
+        bad_node.get_time = get_time
+        tracker.update()
+
+        self.assertIsInstance(tracker.errors[2], IOError)
+        self.assertIsNone(tracker.get_model(2))
+        self.assertIsNone(tracker.errors[1])
+        self.assertEqual(tracker.get_offset(1), 1000)
+
+# End Class
+
+
+if __name__ == '__main__':
+    unittest.main()
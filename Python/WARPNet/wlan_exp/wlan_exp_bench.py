@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+------------------------------------------------------------------------------
+WLAN Experiment Benchmarks
+------------------------------------------------------------------------------
+Authors:   Chris Hunter (chunter [at] mangocomm.com)
+           Patrick Murphy (murphpo [at] mangocomm.com)
+           Erik Welsh (welsh [at] mangocomm.com)
+License:   Copyright 2014, Mango Communications. All rights reserved.
+           Distributed under the WARP license (http://warpproject.org/license)
+------------------------------------------------------------------------------
+MODIFICATION HISTORY:
+
+Ver   Who  Date     Changes
+----- ---- -------- -----------------------------------------------------
+1.00a ejw  10/17/26 Initial release
+
+------------------------------------------------------------------------------
+
+This module provides benchmarks of the WLAN Exp log transfers against
+emulated nodes (see wlan_exp_emulator).  See warpnet.wn_bench for the
+format of the results.
+
+To run all benchmarks (and optionally save the results as JSON or CSV):
+    python -m wlan_exp.wlan_exp_bench [results.json | results.csv]
+
+Functions (see below for more information):
+    wlan_exp_bench_log_events() -- get_log_events() throughput vs size
+    wlan_exp_bench_get_log() -- get_log() throughput
+    wlan_exp_bench_all() -- Run all benchmarks
+
+"""
+
+import sys
+import time
+
+import warpnet.wn_bench as wn_bench
+
+from . import wlan_exp_emulator
+from . import wlan_exp_node
+from . import wlan_exp_node_ap
+from . import wlan_exp_node_sta
+
+
+__all__ = ['wlan_exp_bench_log_events', 'wlan_exp_bench_get_log',
+           'wlan_exp_bench_all']
+
+
+# Default buffer sizes (in bytes) of the get_log_events() benchmark
+WLAN_EXP_BENCH_SIZES    = [2**10, 2**14, 2**18, 2**21]
+
+# Default number of repeats of each transfer
+WLAN_EXP_BENCH_REPEATS  = 5
+
+
+def _throughput(func, num_bytes, repeats):
+    """Internal method to return the throughput (in MB/sec) of func."""
+    start_time = time.time()
+
+    for _ in range(repeats):
+        func()
+
+    return (repeats * num_bytes) / (time.time() - start_time) / 2**20
+
+
+def wlan_exp_bench_log_events(node, sizes=WLAN_EXP_BENCH_SIZES,
+                              repeats=WLAN_EXP_BENCH_REPEATS, output=True):
+    """Benchmark the get_log_events() throughput (in MB/sec) of a node
+    versus the buffer size.
+
+    Returns a dictionary of buffer size to throughput.
+
+    Attributes:
+        node -- Initialized WlanExpNode
+        sizes -- List of buffer sizes (in bytes); sizes larger than the
+                 event log are skipped
+        repeats -- Number of transfers of each size
+        output -- Print the results
+    """
+    results = {}
+
+    for size in sizes:
+        if (size <= node.event_log_size):
+            results[size] = _throughput(lambda: node.get_log_events(size), size, repeats)
+
+    if output:
+        print("WLAN Exp get_log_events() benchmark ({0} transfers):".format(repeats))
+        for size in sorted(results.keys()):
+            print("    {0:9d} bytes : {1:10.2f} MB/sec".format(size, results[size]))
+
+    return results
+
+# End of wlan_exp_bench_log_events()
+
+
+def wlan_exp_bench_get_log(node, repeats=WLAN_EXP_BENCH_REPEATS, output=True):
+    """Benchmark the get_log() throughput (in MB/sec) of a node.
+
+    Returns a dictionary with the keys size (in bytes of the log) and
+    throughput.
+
+    Attributes:
+        node -- Initialized WlanExpNode
+        repeats -- Number of transfers
+        output -- Print the results
+    """
+    size    = len(node.get_log().get_bytes())
+    results = {'size'       : size,
+               'throughput' : _throughput(node.get_log, size, repeats)}
+
+    if output:
+        print("WLAN Exp get_log() benchmark ({0} transfers):".format(repeats))
+        print("    {0:9d} bytes : {1:10.2f} MB/sec".format(size, results['throughput']))
+
+    return results
+
+# End of wlan_exp_bench_get_log()
+
+
+def wlan_exp_bench_all(filename=None, output=True, **kwargs):
+    """Run all benchmarks against one emulated node with a full event log
+    and optionally save the results (see warpnet.wn_bench.wn_bench_save()).
+    Returns a dictionary of benchmark name to results.
+
+    Attributes:
+        filename -- Name of the JSON or CSV file for the results (optional)
+        output -- Print the results
+        kwargs -- Additional arguments of the emulator (ie loss, latency)
+    """
+    results = {}
+
+    (emulator, nodes) = wn_bench.wn_bench_emulated_nodes(1,
+                              emulator_class=wlan_exp_emulator.WlanExpEmulator,
+                              node_factory=wlan_exp_node.WlanExpNodeFactory(),
+                              **kwargs)
+
+    try:
+        # Fill the log once; the log does not change during the benchmarks
+        emulated_node = emulator.nodes[0]
+        emulated_node.log_rate = 0
+        emulated_node.log_wrap = False
+        emulated_node.fill_log()
+
+        results['log_events'] = wlan_exp_bench_log_events(nodes[0], output=output)
+        results['get_log']    = wlan_exp_bench_get_log(nodes[0], output=output)
+    finally:
+        emulator.stop()
+
+    if filename is not None:
+        wn_bench.wn_bench_save(results, filename)
+
+    return results
+
+# End of wlan_exp_bench_all()
+
+
+
+if __name__ == '__main__':
+    if (len(sys.argv) > 1):
+        wlan_exp_bench_all(sys.argv[1])
+    else:
+        wlan_exp_bench_all()
@@ -90,6 +90,8 @@ CMD_CONFIG_DEMO              = 90
 
 class WlanExpCmdLogGetEvents(wn_message.WnBufferCmd):
     """Command to get the WLAN Exp log events of the node"""
+    __slots__ = ()
+
     def __init__(self, size, start_byte=0):
         command = (wn_cmds.GRPID_NODE << 24) | CMD_LOG_GET_EVENTS
         super(WlanExpCmdLogGetEvents, self).__init__(
@@ -103,6 +105,8 @@ class WlanExpCmdLogGetEvents(wn_message.WnBufferCmd):
 
 class WlanExpCmdResetLog(wn_message.WnCmd):
     """Command to reset the Event log"""
+    __slots__ = ()
+
     def __init__(self):
         super(WlanExpCmdResetLog, self).__init__()
         self.command = (wn_cmds.GRPID_NODE << 24) | CMD_LOG_RESET
@@ -115,6 +119,8 @@ class WlanExpCmdResetLog(wn_message.WnCmd):
 
 class WlanExpCmdGetLogCurrIdx(wn_message.WnCmd):
     """Command to reset the Event log"""
+    __slots__ = ()
+
     def __init__(self):
         super(WlanExpCmdGetLogCurrIdx, self).__init__()
         self.command = (wn_cmds.GRPID_NODE << 24) | CMD_LOG_GET_CURR_IDX
@@ -131,6 +137,8 @@ class WlanExpCmdGetLogCurrIdx(wn_message.WnCmd):
 
 class WlanExpCmdGetLogOldestIdx(wn_message.WnCmd):
     """Command to reset the Event log"""
+    __slots__ = ()
+
     def __init__(self):
         super(WlanExpCmdGetLogOldestIdx, self).__init__()
         self.command = (wn_cmds.GRPID_NODE << 24) | CMD_LOG_GET_OLDEST_IDX
@@ -147,6 +155,8 @@ class WlanExpCmdGetLogOldestIdx(wn_message.WnCmd):
 
 class WlanExpCmdAddStatsToLog(wn_message.WnCmd):
     """Command to add the current statistics to the Event log"""
+    __slots__ = ()
+
     def __init__(self):
         super(WlanExpCmdAddStatsToLog, self).__init__()
         self.command = (wn_cmds.GRPID_NODE << 24) | CMD_STATS_ADD_TO_LOG
@@ -163,6 +173,8 @@ class WlanExpCmdAddStatsToLog(wn_message.WnCmd):
 
 class WlanExpCmdStreamLogEntries(wn_message.WnCmd):
     """Command to configure the node log streaming."""
+    __slots__ = ()
+
     def __init__(self, enable, host_id, ip_address, port):
         super(WlanExpCmdStreamLogEntries, self).__init__()
         self.command = (wn_cmds.GRPID_NODE << 24) | CMD_LOG_STREAM_ENTRIES
@@ -199,6 +211,8 @@ class WlanExpCmdNodeTime(wn_message.WnCmd):
         time -- Time as either an integer number of microseconds or 
                   a floating point number in seconds.
     """
+    __slots__ = ()
+
     time_factor = 6
     
     def __init__(self, time):
@@ -234,6 +248,8 @@ class WlanExpCmdNodeChannel(wn_message.WnCmd):
                    channel will always be returned by the node.  A value 
                    of 0xFFFF will only return the channel.
     """
+    __slots__ = ()
+
     def __init__(self, channel):
         super(WlanExpCmdNodeChannel, self).__init__()
         self.command = (wn_cmds.GRPID_NODE << 24) | CMD_CHANNEL        
@@ -258,6 +274,8 @@ class WlanExpCmdConfigDemo(wn_message.WnCmd):
                   DEMO_CONFIG_FLAGS_EN = 1
         wait_time - Inter-packet sleep time (usec)
     """
+    __slots__ = ()
+
     def __init__(self, flags, sleep_time):
         super(WlanExpCmdConfigDemo, self).__init__()
         self.command = (wn_cmds.GRPID_NODE << 24) | CMD_CONFIG_DEMO        
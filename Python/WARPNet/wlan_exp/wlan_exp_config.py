@@ -21,6 +21,7 @@ This module provides class definitions to manage the WLAN Exp configuration.
 
 Functions (see below for more information):
     WlanExpConfiguration() -- Allows interaction with wlan_exp_config.ini file
+    WlanExpLogCursors() -- Allows interaction with a log cursors file
 
 """
 
@@ -41,7 +42,7 @@ import wlan_exp.wlan_exp_defaults as wlan_exp_defaults
 import wlan_exp.wlan_exp_util as wlan_exp_util
 
 
-__all__ = ['WlanExpConfiguration']
+__all__ = ['WlanExpConfiguration', 'WlanExpLogCursors']
 
 
 class WlanExpConfiguration(wn_config.WnConfiguration):
@@ -98,3 +99,89 @@ class WlanExpConfiguration(wn_config.WnConfiguration):
         self.config.set('config_info', 'version', version)
 
 # End Class WlanExpConfiguration
+
+
+
+class WlanExpLogCursors(object):
+    """Class for the log cursors of WLAN Exp nodes.
+    
+    A log cursor is the index (in bytes) of the next byte of the event log 
+    of a node to get with WlanExpNode.get_log_tail().  This class can load 
+    and store the log cursors so that log collection can continue where it
+    stopped after a restart of the script.
+    
+    Attributes:
+        Node serial number
+            log_cursor -- Index of the next byte of the log to get
+    """
+    config              = None
+    config_file         = None
+
+    def __init__(self, filename=wlan_exp_defaults.WLAN_EXP_DEFAULT_LOG_CURSORS_FILE):
+        self.config_file = os.path.normpath(filename)
+        self.config      = configparser.ConfigParser()
+
+        # The file does not exist until the first save_config()
+        if os.path.isfile(self.config_file):
+            try:
+                self.config.read(self.config_file)
+            except configparser.Error as err:
+                print("WARNING:  Could not read {0}.".format(filename),
+                      "\n    Starting with empty log cursors.\n    {0}".format(err))
+                self.config = configparser.ConfigParser()
+
+
+    def get_cursor(self, node):
+        """Returns the log cursor of the node or None if there is no cursor."""
+        sn = "W3-a-{0:05d}".format(node.serial_number)
+
+        if self.config.has_option(sn, 'log_cursor'):
+            return int(self.config.get(sn, 'log_cursor'))
+
+        return None
+
+
+    def set_cursor(self, node, log_cursor):
+        """Sets the log cursor of the node (None removes the cursor)."""
+        sn = "W3-a-{0:05d}".format(node.serial_number)
+
+        if log_cursor is None:
+            self.config.remove_section(sn)
+        else:
+            if not self.config.has_section(sn):
+                self.config.add_section(sn)
+            self.config.set(sn, 'log_cursor', str(log_cursor))
+
+
+    def load_cursors(self, nodes):
+        """Sets the log_cursor of each node from the stored log cursors."""
+        for node in nodes:
+            node.log_cursor = self.get_cursor(node)
+
+
+    def store_cursors(self, nodes):
+        """Stores the log_cursor of each node (call save_config() to save 
+        the log cursors to the file)."""
+        for node in nodes:
+            self.set_cursor(node, node.log_cursor)
+
+
+    def save_config(self, output=False):
+        """Saves the log cursors to the file (see 
+        warpnet.wn_config.write_config_file())."""
+        if output:
+            print("Saving log cursors to: \n{0}".format(self.config_file))
+
+        try:
+            wn_config.write_config_file(self.config, self.config_file)
+        except (IOError, OSError) as err:
+            print("Error writing log cursors file: {0}".format(err))
+
+
+    def __str__(self):
+        msg = str(self.config_file + ": \n")
+        for section in self.config.sections():
+            msg += "    {0}: {1}\n".format(section, self.config.get(section, 'log_cursor'))
+        return msg
+
+# End Class WlanExpLogCursors
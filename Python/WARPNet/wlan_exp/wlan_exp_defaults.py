@@ -26,6 +26,7 @@ PACKAGE_NAME                      = 'wlan_exp'
 
 # WLAN Exp INI Files
 WLAN_EXP_DEFAULT_INI_FILE         = 'wlan_exp_config.ini'
+WLAN_EXP_DEFAULT_LOG_CURSORS_FILE = 'wlan_exp_log_cursors.ini'
 
 
 # WARPNet Node Types
@@ -0,0 +1,383 @@
+# -*- coding: utf-8 -*-
+"""
+------------------------------------------------------------------------------
+WLAN Experiment Node Emulator
+------------------------------------------------------------------------------
+Authors:   Chris Hunter (chunter [at] mangocomm.com)
+           Patrick Murphy (murphpo [at] mangocomm.com)
+           Erik Welsh (welsh [at] mangocomm.com)
+License:   Copyright 2014, Mango Communications. All rights reserved.
+           Distributed under the WARP license (http://warpproject.org/license)
+------------------------------------------------------------------------------
+MODIFICATION HISTORY:
+
+Ver   Who  Date     Changes
+----- ---- -------- -----------------------------------------------------
+1.00a ejw  10/17/26 Initial release
+
+------------------------------------------------------------------------------
+
+This module provides a software emulator of WLAN Exp nodes (see
+warpnet.wn_emulator) so that the log and time commands can be exercised
+without WARP hardware:
+
+    emulator = wlan_exp_emulator.WlanExpEmulator(loss=0.01)
+    emulator.add_nodes(16, log_rate=10000)
+    emulator.start()
+
+    nodes = wlan_exp_util.wlan_exp_init_nodes(emulator.get_nodes_config())
+    log = nodes[0].get_log()
+    ...
+    emulator.stop()
+
+Each emulated node keeps a synthetic event log in a ring buffer.  Log
+entries (Tx / Rx events with a fixed size) are added at log_rate entries per
+second of wall clock time (in the background and as the log is accessed),
+or explicitly with add_log_entries().  When streaming is enabled (see
+WlanExpNode.stream_log_entries()), new entries are also streamed to the host
+(see get_stream_packets()).  The node time runs at (1 + drift_ppm / 10**6) times the
+host time and starts at clock_offset (in us).
+
+The log entries are Tx / Rx entries as defined in wlan_exp_log (timestamp,
+MAC header, length, rate, channel, power, flags), so emulated logs can be
+decoded with wlan_exp_log.log_get_entries().
+
+Functions (see below for more information):
+    WlanExpEmulatedNode() -- Emulated WLAN Exp node
+    WlanExpEmulator() -- Fleet of emulated WLAN Exp nodes
+
+Integer constants:
+    EMULATOR_DEFAULT_LOG_SIZE -- Default event log size (in bytes)
+    EMULATOR_DEFAULT_LOG_RATE -- Default log entries per second
+
+"""
+
+import time
+import random
+import struct
+import threading
+
+import warpnet.wn_cmds as wn_cmds
+import warpnet.wn_message as wn_message
+import warpnet.wn_emulator as wn_emulator
+import warpnet.wn_transport_eth_udp as wn_transport_eth_udp
+
+from . import wlan_exp_defaults
+from . import wlan_exp_cmds
+from . import wlan_exp_log
+from . import wlan_exp_node
+
+
+__all__ = ['WlanExpEmulatedNode', 'WlanExpEmulator']
+
+
+EMULATOR_DEFAULT_LOG_SIZE    = 2**22
+EMULATOR_DEFAULT_LOG_RATE    = 1000
+
+_TRANSPORT_HDR_STRUCT        = struct.Struct('!2H 2B 3H')
+_ENTRY_STRUCT                = wlan_exp_log.log_get_entry_struct(wlan_exp_log.ENTRY_TYPE_TX)
+_MAC_HEADER                  = struct.pack('<2H 6s 6s 6s 2x', 0x0008, 0,
+                                           b'\x40\xd8\x55\x00\x00\x01',
+                                           b'\x40\xd8\x55\x00\x00\x02',
+                                           b'\x40\xd8\x55\x00\x00\x01')
+_ENTRY_TYPES                 = [wlan_exp_log.ENTRY_TYPE_RX_OFDM, wlan_exp_log.ENTRY_TYPE_RX_DSSS,
+                                wlan_exp_log.ENTRY_TYPE_TX, wlan_exp_log.ENTRY_TYPE_TX_LOW]
+
+
+class WlanExpEmulatedNode(wn_emulator.WnEmulatedNode):
+    """Class for an emulated WLAN Exp node.
+
+    New Attributes:
+        max_associations -- Maximum associations of the node
+        max_statistics -- Maximum statistics of the node
+        event_log_size -- Size of the event log (in bytes, a multiple of the
+                          entry size)
+        log_rate -- Log entries added per second
+        log_wrap -- Overwrite the oldest entries when the log is full
+        clock_offset -- Node time (in us) at the creation of the node
+        drift_ppm -- Drift of the node clock (in parts per million)
+        channel -- Current channel of the node
+        stream_config -- (enable, ip_address, port, host_id) of the log
+                         entry stream
+    """
+    max_associations = None
+    max_statistics   = None
+    event_log_size   = None
+    log_rate         = None
+    log_wrap         = None
+    clock_offset     = None
+    drift_ppm        = None
+    channel          = None
+    stream_config    = None
+
+    def __init__(self, serial_number, ip_address=None,
+                 node_type=wlan_exp_defaults.WLAN_EXP_AP_TYPE,
+                 event_log_size=EMULATOR_DEFAULT_LOG_SIZE,
+                 log_rate=EMULATOR_DEFAULT_LOG_RATE, log_wrap=True,
+                 clock_offset=0, drift_ppm=0.0, **kwargs):
+        super(WlanExpEmulatedNode, self).__init__(serial_number, ip_address, **kwargs)
+
+        self.node_type        = node_type
+        self.max_associations = 10
+        self.max_statistics   = 10
+        self.event_log_size   = event_log_size - (event_log_size % _ENTRY_STRUCT.size)
+        self.log_rate         = log_rate
+        self.log_wrap         = log_wrap
+        self.clock_offset     = clock_offset
+        self.drift_ppm        = drift_ppm
+        self.channel          = 1
+        self.stream_config    = (0, 0, 0, 0)
+
+        self._random          = random.Random(serial_number)
+        self._lock            = threading.RLock()
+        self._time_base       = time.time()
+        self._log             = bytearray(self.event_log_size)
+        self._log_time        = self._time_base
+        self._num_entries     = 0
+        self._oldest_entry    = 0
+        self._stream_entries  = []
+        self._stream_seq_num  = 0
+
+        node = wn_cmds.GRPID_NODE << 24
+
+        self.cmd_handlers.update({
+            node | wlan_exp_cmds.CMD_CHANNEL            : self.cmd_channel,
+            node | wlan_exp_cmds.CMD_TIME               : self.cmd_time,
+            node | wlan_exp_cmds.CMD_LOG_RESET          : self.cmd_log_reset,
+            node | wlan_exp_cmds.CMD_LOG_GET_CURR_IDX   : self.cmd_log_get_curr_idx,
+            node | wlan_exp_cmds.CMD_LOG_GET_OLDEST_IDX : self.cmd_log_get_oldest_idx,
+            node | wlan_exp_cmds.CMD_LOG_GET_EVENTS     : self.cmd_log_get_events,
+            node | wlan_exp_cmds.CMD_LOG_STREAM_ENTRIES : self.cmd_log_stream_entries,
+            node | wlan_exp_cmds.CMD_STATS_ADD_TO_LOG   : self.cmd_stats_add_to_log,
+            node | wlan_exp_cmds.CMD_CONFIG_DEMO        : self.cmd_config_demo})
+
+
+    def get_time(self, host_time=None):
+        """Return the node time (in us) at the given host time (in sec)."""
+        if host_time is None:
+            host_time = time.time()
+
+        elapsed = (host_time - self._time_base) * (10**6) * (1 + self.drift_ppm / float(10**6))
+        return int(elapsed) + self.clock_offset
+
+
+    def set_time(self, node_time):
+        """Set the node time (in us)."""
+        self.clock_offset += node_time - self.get_time()
+
+
+    def add_log_entries(self, num_entries, host_time=None):
+        """Add num_entries synthetic entries to the log with timestamps up to
+        the given host time (in sec).  Returns the list of entries added."""
+        if host_time is None:
+            host_time = time.time()
+
+        entries = []
+
+        with self._lock:
+            capacity = self.event_log_size // _ENTRY_STRUCT.size
+
+            if not self.log_wrap:
+                num_entries = min(num_entries, capacity - self._num_entries)
+
+            # Entries are spaced by the log rate (or all at host_time)
+            if (self.log_rate > 0):
+                interval = 1.0 / self.log_rate
+            else:
+                interval = 0.0
+
+            # Entries that would be overwritten within this call are skipped
+            if (num_entries > capacity):
+                self._num_entries += num_entries - capacity
+                num_entries = capacity
+
+            for i in range(num_entries):
+                entry_time = host_time - (num_entries - i - 1) * interval
+                entry = self._new_entry(self._num_entries, max(self.get_time(entry_time), 0))
+                offset = (self._num_entries % capacity) * _ENTRY_STRUCT.size
+
+                self._log[offset:(offset + _ENTRY_STRUCT.size)] = entry
+                self._num_entries += 1
+                entries.append(entry)
+
+            if self.stream_config[0]:
+                self._stream_entries.extend(entries)
+
+            if (self._num_entries - self._oldest_entry) > capacity:
+                self._oldest_entry = self._num_entries - capacity
+
+        return entries
+
+
+    def fill_log(self):
+        """Add entries until every entry of the log has been written.  Returns
+        the list of entries added."""
+        with self._lock:
+            capacity = self.event_log_size // _ENTRY_STRUCT.size
+            return self.add_log_entries(max(capacity - self._num_entries, 0))
+
+
+    def update_log(self):
+        """Add the log entries for the time since the last update (at
+        log_rate entries per second).  Returns the list of entries added."""
+        with self._lock:
+            now = time.time()
+            num_entries = int((now - self._log_time) * self.log_rate)
+
+            if (num_entries == 0):
+                return []
+
+            self._log_time += num_entries / float(self.log_rate)
+
+            return self.add_log_entries(num_entries, self._log_time)
+
+
+    def update(self):
+        self.update_log()
+        return self.get_stream_packets()
+
+
+    def get_stream_packets(self):
+        """Return a list of (packet, (IP address, port)) of the log entries
+        to stream (see cmd_log_stream_entries()).
+
+        Each packet has a transport header (src_id = node ID, dest_id = host
+        ID, sequence number incremented per packet) followed by as many log
+        entries as fit in a packet.
+        """
+        (enable, ip_address, port, host_id) = self.stream_config
+
+        with self._lock:
+            entries = self._stream_entries
+            self._stream_entries = []
+
+        if not enable or not entries:
+            return []
+
+        address = (wn_transport_eth_udp.int2ip(ip_address), port)
+        max_entries = (self.get_max_packet_size() - 2 - _TRANSPORT_HDR_STRUCT.size) // _ENTRY_STRUCT.size
+        output = []
+
+        for idx in range(0, len(entries), max_entries):
+            payload = b''.join(entries[idx:(idx + max_entries)])
+            hdr = _TRANSPORT_HDR_STRUCT.pack(host_id, self.node_id, 0,
+                                             wn_message.PKTTYPE_NTOH_MSG_ASYNC,
+                                             len(payload), self._stream_seq_num, 0)
+            self._stream_seq_num = (self._stream_seq_num + 1) % 0xFFFF
+            output.append((b'\x00\x00' + hdr + payload, address))
+
+        return output
+
+
+    def get_parameters(self):
+        node = wn_cmds.GRPID_NODE
+
+        return (super(WlanExpEmulatedNode, self).get_parameters() +
+                self._parameter(node, wlan_exp_node.NODE_WLAN_MAX_ASSN, [self.max_associations]) +
+                self._parameter(node, wlan_exp_node.NODE_WLAN_EVENT_LOG_SIZE, [self.event_log_size]) +
+                self._parameter(node, wlan_exp_node.NODE_WLAN_MAX_STATS, [self.max_statistics]))
+
+
+    #-------------------------------------------------------------------------
+    # WLAN Exp command handlers
+    #-------------------------------------------------------------------------
+    def cmd_channel(self, args):
+        channel = args[0] & 0xFFFF
+
+        if (channel != 0xFFFF) and (1 <= channel <= 11):
+            self.channel = channel
+
+        return [self.channel]
+
+    def cmd_time(self, args):
+        node_time = (args[1] << 32) + args[0]
+
+        if (node_time != 0x0000FFFF0000FFFF):
+            self.set_time(node_time)
+
+        node_time = self.get_time()
+        return [node_time & 0xFFFFFFFF, (node_time >> 32) & 0xFFFFFFFF]
+
+    def cmd_log_reset(self, args):
+        with self._lock:
+            self._log_time     = time.time()
+            self._num_entries  = 0
+            self._oldest_entry = 0
+        return []
+
+    def cmd_log_get_curr_idx(self, args):
+        with self._lock:
+            self.update_log()
+
+            # A full log that does not wrap ends at the end of the buffer
+            if not self.log_wrap and (self._num_entries * _ENTRY_STRUCT.size) >= self.event_log_size:
+                return [self.event_log_size]
+
+            return [self._get_index(self._num_entries)]
+
+    def cmd_log_get_oldest_idx(self, args):
+        with self._lock:
+            self.update_log()
+            return [self._get_index(self._oldest_entry)]
+
+    def cmd_log_get_events(self, args):
+        (start_byte, size) = (args[2], args[3])
+
+        with self._lock:
+            self.update_log()
+            return bytes(self._log[start_byte:(start_byte + size)])
+
+    def cmd_log_stream_entries(self, args):
+        (enable, ip_address, arg) = args[0:3]
+
+        with self._lock:
+            self.stream_config   = (enable, ip_address, arg & 0xFFFF, arg >> 16)
+            self._stream_entries = []
+
+        return []
+
+    def cmd_stats_add_to_log(self, args):
+        return [0]
+
+    def cmd_config_demo(self, args):
+        return []
+
+
+    #-------------------------------------------------------------------------
+    # Internal helper methods
+    #-------------------------------------------------------------------------
+    def _get_index(self, entry):
+        """Internal method to return the log index (in bytes) of an entry."""
+        capacity = self.event_log_size // _ENTRY_STRUCT.size
+        return (entry % capacity) * _ENTRY_STRUCT.size
+
+
+    def _new_entry(self, seq_num, timestamp):
+        """Internal method to return the bytes of a synthetic log entry."""
+        # One call for all random fields:  type (2 bits), rate (3 bits),
+        #   power (6 bits), length (10 bits)
+        bits       = self._random.getrandbits(21)
+        entry_type = _ENTRY_TYPES[bits & 0x3]
+
+        if (entry_type >= wlan_exp_log.ENTRY_TYPE_TX):
+            power = 15
+        else:
+            power = -30 - ((bits >> 5) & 0x3F)
+
+        return _ENTRY_STRUCT.pack(wlan_exp_log.ENTRY_DELIMITER | (seq_num & 0xFFFF), entry_type,
+                                  _ENTRY_STRUCT.size - wlan_exp_log.ENTRY_HEADER_SIZE,
+                                  timestamp, _MAC_HEADER, 14 + (bits >> 11),
+                                  1 + ((bits >> 2) & 0x7), self.channel,
+                                  power, 0, 0)
+
+
+# End Class WlanExpEmulatedNode
+
+
+
+class WlanExpEmulator(wn_emulator.WnEmulator):
+    """Class for a fleet of emulated WLAN Exp nodes (see WnEmulator)."""
+    node_class = WlanExpEmulatedNode
+
+
+# End Class WlanExpEmulator
@@ -21,10 +21,11 @@ This module provides class definitions for all WLAN Exp exceptions.
 
 Functions (see below for more information):
     WlanExpVersionError()
+    WlanExpLogError()
 
 """
 
-__all__ = ['WlanExpVersionError']
+__all__ = ['WlanExpVersionError', 'WlanExpLogError']
 
 class WlanExpError(Exception):
     """Base class for WlanExp exceptions."""
@@ -47,3 +48,18 @@ class WlanExpVersionError(WlanExpError):
         
 # End Class WlanExpVersionError
 
+
+class WlanExpLogError(WlanExpError):
+    """Exception for event log decoding errors.
+    
+    Attributes:
+        message -- explanation message of the error
+    """
+    
+    def __init__(self, message):
+        self.message = message
+
+    def __str__(self):
+        return str(self.message)
+        
+# End Class WlanExpLogError
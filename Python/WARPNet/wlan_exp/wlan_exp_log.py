@@ -0,0 +1,650 @@
+# -*- coding: utf-8 -*-
+"""
+------------------------------------------------------------------------------
+WLAN Experiment Event Log
+------------------------------------------------------------------------------
+Authors:   Chris Hunter (chunter [at] mangocomm.com)
+           Patrick Murphy (murphpo [at] mangocomm.com)
+           Erik Welsh (welsh [at] mangocomm.com)
+License:   Copyright 2014, Mango Communications. All rights reserved.
+           Distributed under the WARP license (http://warpproject.org/license)
+------------------------------------------------------------------------------
+MODIFICATION HISTORY:
+
+Ver   Who  Date     Changes
+----- ---- -------- -----------------------------------------------------
+1.00a ejw  10/17/26 Initial release
+
+------------------------------------------------------------------------------
+
+This module provides the definitions of the WLAN Exp event log entries and a
+decoder of the bytes of an event log (ie from WlanExpNode.get_log()) into
+NumPy structured arrays:
+
+    log_data = node.get_log().get_bytes()
+    index    = wlan_exp_log.log_index(log_data)
+    entries  = wlan_exp_log.log_get_entries(log_data, index)
+
+    tx = entries[wlan_exp_log.ENTRY_TYPE_TX]
+    tx[(tx['timestamp'] > start_time) & (tx['rate'] >= 4)]
+
+The index finds the boundaries of all entries in a single pass over the log.
+The entries of each type are returned as one structured array with a field
+for each field of the entry (see ENTRY_TYPES).  If the entries of a type are
+equally spaced in the log (ie a log with a single entry size), the array is
+a view of the log data; otherwise the entries are gathered into a new array
+with a single vectorized copy.
+
+Log entry format (little endian):
+    Entry header -- delimiter (0xACED0000 | 16 bit sequence number),
+                    entry type (16 bits), entry length (16 bits, number of
+                    bytes after the entry header)
+    Entry        -- fields of the entry type; every entry type starts with
+                    a timestamp (64 bits, in us)
+
+The index of an event log file (ie from WlanExpNode.get_log()) can be kept
+in an index file next to it (<log file name without extension>.idx) so that
+later analyses of the log skip the pass over the log:
+
+    index   = wlan_exp_log.log_read_index('node_1.bin')
+    index   = wlan_exp_log.log_index_select(index, start_time=t0, end_time=t1)
+    entries = wlan_exp_log.log_get_entries(log_data, index)
+
+The index file records the size and modification time of the log file; an
+index file that does not match its log file is created again from the log.
+
+The logs of many nodes can be merged into a single stream of entries in 
+time order.  The timestamps of each node are corrected by the clock offset of
+the node (ie measured by wlan_exp_init_time()) and the logs are read and 
+decoded a chunk of entries at a time, so the merged logs may be larger than
+the host memory:
+
+    times   = wlan_exp_util.wlan_exp_init_time(nodes, output=True)
+    ...
+    logs    = {}
+    for node in nodes:
+        logs[node.serial_number] = 'node_{0}.bin'.format(node.serial_number)
+        node.get_log_to_file(logs[node.serial_number])
+
+    offsets = wlan_exp_log.log_get_time_offsets(times)
+
+    for (timestamp, serial_number, entry_type, entry) in wlan_exp_log.log_merge(logs, offsets):
+        ...
+
+NumPy is only required by the decoder functions (log_get_entry_dtype() and
+the log_index*(), log_get_entries(), log_*_index() and log_merge() 
+functions).
+
+Functions (see below for more information):
+    log_add_entry_type() -- Add (or replace) the definition of an entry type
+    log_get_entry_struct() -- struct.Struct of an entry
+    log_get_entry_dtype() -- NumPy dtype of an entry
+    log_index() -- Index of the entries of an event log
+    log_index_select() -- Part of an index by entry type and time
+    log_get_entries() -- Structured arrays of the entries of an event log
+    log_write_index() -- Write the index file of an event log file
+    log_read_index() -- Read (or create) the index file of an event log file
+    log_get_time_offsets() -- Clock offsets of nodes from wlan_exp_init_time()
+    log_merge() -- Merge the event logs of many nodes in time order
+
+Integer constants:
+    ENTRY_TYPE_RX_OFDM, ENTRY_TYPE_RX_DSSS, ENTRY_TYPE_TX,
+      ENTRY_TYPE_TX_LOW -- Log entry types
+    ENTRY_DELIMITER, ENTRY_DELIMITER_MASK -- Entry delimiter
+    ENTRY_HEADER_SIZE -- Size of the entry header (in bytes)
+    LOG_MERGE_CHUNK_SIZE -- Default number of entries decoded at a time by 
+                            log_merge()
+
+"""
+
+import os
+import mmap
+import heapq
+import struct
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from . import wlan_exp_exception as ex
+
+
+__all__ = ['log_add_entry_type', 'log_get_entry_struct', 'log_get_entry_dtype',
+           'log_index', 'log_index_select', 'log_get_entries', 'log_write_index',
+           'log_read_index', 'log_get_time_offsets', 'log_merge']
+
+
+# Log entry types
+ENTRY_TYPE_RX_OFDM           = 10
+ENTRY_TYPE_RX_DSSS           = 11
+ENTRY_TYPE_TX                = 20
+ENTRY_TYPE_TX_LOW            = 21
+
+ENTRY_DELIMITER              = 0xACED0000
+ENTRY_DELIMITER_MASK         = 0xFFFF0000
+
+# Fields of the entry header and of the entries as (name, struct format)
+ENTRY_HEADER_FIELDS          = [('delimiter', 'I'), ('entry_type', 'H'),
+                                ('entry_length', 'H')]
+
+_TX_RX_FIELDS                = [('timestamp', 'Q'), ('mac_header', '24s'),
+                                ('length', 'H'), ('rate', 'B'), ('channel', 'B'),
+                                ('power', 'b'), ('flags', 'B'), ('reserved', 'H')]
+
+# Dictionary of entry type to (name, list of fields)
+ENTRY_TYPES                  = {ENTRY_TYPE_RX_OFDM : ('RX_OFDM', _TX_RX_FIELDS),
+                                ENTRY_TYPE_RX_DSSS : ('RX_DSSS', _TX_RX_FIELDS),
+                                ENTRY_TYPE_TX      : ('TX',      _TX_RX_FIELDS),
+                                ENTRY_TYPE_TX_LOW  : ('TX_LOW',  _TX_RX_FIELDS)}
+
+_HEADER_STRUCT               = struct.Struct('<' + ''.join([fmt for (_, fmt) in ENTRY_HEADER_FIELDS]))
+_TIMESTAMP_STRUCT            = struct.Struct('<Q')
+
+ENTRY_HEADER_SIZE            = _HEADER_STRUCT.size
+
+# Bytes of the upper 16 bits of the delimiter (little endian)
+_DELIMITER_BYTES             = struct.pack('<H', ENTRY_DELIMITER >> 16)
+
+# NumPy types of the struct formats
+_NUMPY_TYPES                 = {'b' : 'i1', 'B' : 'u1', 'h' : '<i2', 'H' : '<u2',
+                                'i' : '<i4', 'I' : '<u4', 'q' : '<i8', 'Q' : '<u8'}
+
+# Type code of the 64 bit arrays used to build the log index (the 'Q' type
+#   code is not supported by Python 2)
+try:
+    _ARRAY_U64               = array('Q').typecode
+except ValueError:
+    _ARRAY_U64               = 'L'
+
+# Fields of the log index
+_INDEX_FIELDS                = [('offset', '<u8'), ('entry_type', '<u2'), ('timestamp', '<u8')]
+
+# Index file header:  magic, version, number of entries, size (in bytes) and
+#   modification time of the log file
+_INDEX_FILE_MAGIC            = b'WLIX'
+_INDEX_FILE_VERSION          = 1
+_INDEX_FILE_HDR_STRUCT       = struct.Struct('<4s I Q Q d')
+
+# Number of entries of each log decoded at a time by log_merge()
+LOG_MERGE_CHUNK_SIZE         = 4096
+
+
+def log_add_entry_type(entry_type, name, fields):
+    """Add (or replace) the definition of an entry type.
+
+    Attributes:
+        entry_type -- Entry type (16 bits)
+        name -- Name of the entry type
+        fields -- List of (field name, struct format) of the fields after
+                  the entry header.  The first field must be the 64 bit
+                  timestamp.  Supported formats:  b, B, h, H, i, I, q, Q and
+                  Ns (N bytes).
+    """
+    if (not fields) or (fields[0] != ('timestamp', 'Q')):
+        raise ex.WlanExpLogError("Entry type {0} ({1}):  ".format(entry_type, name) +
+                                 "the first field must be ('timestamp', 'Q')")
+
+    ENTRY_TYPES[entry_type] = (name, list(fields))
+
+# End of log_add_entry_type()
+
+
+def log_get_entry_struct(entry_type):
+    """Return the struct.Struct of an entry (including the entry header)."""
+    fields = ENTRY_HEADER_FIELDS + _get_entry_fields(entry_type)
+    return struct.Struct('<' + ' '.join([fmt for (_, fmt) in fields]))
+
+# End of log_get_entry_struct()
+
+
+def log_get_entry_dtype(entry_type):
+    """Return the NumPy dtype of an entry (including the entry header).
+
+    Byte fields (ie Ns) are arrays of N uint8.
+    """
+    _check_numpy()
+
+    dtype = []
+
+    for (name, fmt) in ENTRY_HEADER_FIELDS + _get_entry_fields(entry_type):
+        if fmt.endswith('s'):
+            dtype.append((name, 'u1', (int(fmt[:-1]),)))
+        else:
+            dtype.append((name, _NUMPY_TYPES[fmt]))
+
+    return np.dtype(dtype)
+
+# End of log_get_entry_dtype()
+
+
+def log_index(log_data):
+    """Return the index of the entries of an event log as a NumPy
+    structured array with the fields offset (in bytes from the start of the
+    log), entry_type and timestamp (in us).
+
+    The entries are found in a single pass over the log.  Bytes that are not
+    part of an entry (ie the start of a wrapped log) are skipped up to the
+    next entry delimiter.  A partial entry at the end of the log is not
+    part of the index.
+
+    Attributes:
+        log_data -- Bytes of the log (ie bytes, bytearray, mmap or the
+                    get_bytes() of a WnBuffer)
+    """
+    _check_numpy()
+
+    offsets    = array(_ARRAY_U64)
+    types      = array('H')
+    timestamps = array(_ARRAY_U64)
+
+    unpack_header    = _HEADER_STRUCT.unpack_from
+    unpack_timestamp = _TIMESTAMP_STRUCT.unpack_from
+    header_size      = ENTRY_HEADER_SIZE
+    size             = len(log_data)
+    offset           = 0
+
+    while (offset + header_size) <= size:
+        (delimiter, entry_type, entry_length) = unpack_header(log_data, offset)
+
+        if ((delimiter & ENTRY_DELIMITER_MASK) != ENTRY_DELIMITER):
+            offset = _find_delimiter(log_data, offset + 1)
+            continue
+
+        end = offset + header_size + entry_length
+
+        if (end > size):
+            break
+
+        offsets.append(offset)
+        types.append(entry_type)
+
+        if (entry_length >= 8):
+            timestamps.append(unpack_timestamp(log_data, offset + header_size)[0])
+        else:
+            timestamps.append(0)
+
+        offset = end
+
+    index = np.zeros(len(offsets), dtype=_INDEX_FIELDS)
+
+    if len(offsets):
+        index['offset']     = np.frombuffer(offsets, dtype='u{0}'.format(offsets.itemsize))
+        index['entry_type'] = np.frombuffer(types, dtype='u2')
+        index['timestamp']  = np.frombuffer(timestamps, dtype='u{0}'.format(timestamps.itemsize))
+
+    return index
+
+# End of log_index()
+
+
+def log_get_entries(log_data, index=None, entry_types=None):
+    """Return a dictionary of entry type to a NumPy structured array of the
+    entries of that type (see log_get_entry_dtype()).
+
+    Entries of unknown types and entries that are shorter than the
+    definition of their type are skipped.  If all entries of a type are
+    equally spaced in the log, the array is a view of log_data (read only
+    if log_data is read only); otherwise it is a copy.
+
+    Attributes:
+        log_data -- Bytes of the log (see log_index())
+        index -- Index of log_data (optional; see log_index())
+        entry_types -- List of entry types to return (optional; defaults to
+                       all known entry types in the log)
+    """
+    if index is None:
+        index = log_index(log_data)
+
+    data   = np.frombuffer(log_data, dtype=np.uint8)
+    output = {}
+
+    if entry_types is None:
+        entry_types = [entry_type for entry_type in np.unique(index['entry_type'])
+                       if int(entry_type) in ENTRY_TYPES]
+
+    for entry_type in entry_types:
+        entry_type = int(entry_type)
+        dtype      = log_get_entry_dtype(entry_type)
+        offsets    = index['offset'][index['entry_type'] == entry_type].astype(np.intp)
+
+        # Skip entries that are too short for the definition of the type
+        lengths = data[offsets + 6].astype(np.intp) | (data[offsets + 7].astype(np.intp) << 8)
+        short   = (lengths + ENTRY_HEADER_SIZE) < dtype.itemsize
+
+        if short.any():
+            print("WARNING:  Skipping {0} entries of type".format(int(short.sum())),
+                  "{0} that are too short.".format(ENTRY_TYPES[entry_type][0]))
+            offsets = offsets[~short]
+
+        output[entry_type] = _get_entries(data, offsets, dtype)
+
+    return output
+
+# End of log_get_entries()
+
+
+
+def log_index_select(index, entry_types=None, start_time=None, end_time=None):
+    """Return the part of an index with the given entry types and with
+    timestamps in [start_time, end_time).
+
+    Attributes:
+        index -- Index of a log (see log_index())
+        entry_types -- List of entry types (optional)
+        start_time -- Start of the time window (in us, optional)
+        end_time -- End of the time window (in us, optional)
+    """
+    _check_numpy()
+
+    mask = np.ones(len(index), dtype=bool)
+
+    if entry_types is not None:
+        mask &= np.isin(index['entry_type'], entry_types)
+
+    if start_time is not None:
+        mask &= (index['timestamp'] >= start_time)
+
+    if end_time is not None:
+        mask &= (index['timestamp'] < end_time)
+
+    return index[mask]
+
+# End of log_index_select()
+
+
+def log_write_index(log_file, index=None):
+    """Write the index file of an event log file (see log_read_index()) and
+    return the index.
+
+    Attributes:
+        log_file -- Name of the event log file
+        index -- Index of the log (optional; by default, the index is 
+                 created from the log file)
+    """
+    _check_numpy()
+
+    if index is None:
+        index = _index_log_file(log_file)
+
+    index_file = _get_index_file_name(log_file)
+    hdr = _INDEX_FILE_HDR_STRUCT.pack(_INDEX_FILE_MAGIC, _INDEX_FILE_VERSION, len(index),
+                                      os.path.getsize(log_file), os.path.getmtime(log_file))
+
+    try:
+        with open(index_file, 'wb') as data_file:
+            data_file.write(hdr)
+            data_file.write(np.ascontiguousarray(index, dtype=_INDEX_FIELDS).tobytes())
+    except IOError as err:
+        print("Error writing index file: {0}".format(err))
+
+    return index
+
+# End of log_write_index()
+
+
+def log_read_index(log_file, create=True):
+    """Return the index of an event log file from its index file.
+
+    The index is memory mapped from the index file.  If there is no index
+    file or it does not match the log file (ie the log file was written 
+    again), the index is created from the log file and saved to a new index
+    file (unless create is False, in which case None is returned).
+
+    Attributes:
+        log_file -- Name of the event log file
+        create -- Create the index file if necessary
+    """
+    _check_numpy()
+
+    index_file = _get_index_file_name(log_file)
+
+    try:
+        with open(index_file, 'rb') as data_file:
+            hdr = _INDEX_FILE_HDR_STRUCT.unpack(data_file.read(_INDEX_FILE_HDR_STRUCT.size))
+
+        (magic, version, num_entries, log_size, log_mtime) = hdr
+
+        if ((magic == _INDEX_FILE_MAGIC) and (version == _INDEX_FILE_VERSION) and
+                (log_size == os.path.getsize(log_file)) and
+                (log_mtime == os.path.getmtime(log_file))):
+            if (num_entries == 0):
+                return np.zeros(0, dtype=_INDEX_FIELDS)
+
+            return np.memmap(index_file, dtype=_INDEX_FIELDS, mode='r',
+                             offset=_INDEX_FILE_HDR_STRUCT.size, shape=(num_entries,))
+    except (IOError, OSError, struct.error):
+        pass
+
+    if create:
+        return log_write_index(log_file)
+
+    return None
+
+# End of log_read_index()
+
+
+def log_get_time_offsets(time_diffs):
+    """Return a dictionary of node to the clock offset of the node (in us, 
+    ie host time - node time) for log_merge().
+
+    Attributes:
+        time_diffs -- Dictionary of node to a list of time differences (in
+                      us) of the node (ie the output of 
+                      wlan_exp_init_time(output=True)); the offset is the 
+                      median of the differences.  The results of 
+                      wlan_exp_init_time(sync=True) (dictionaries with the
+                      offset of the node) are also supported.
+    """
+    offsets = {}
+
+    for (node, diffs) in time_diffs.items():
+        if isinstance(diffs, dict):
+            if diffs.get('offset') is not None:
+                offsets[node] = diffs['offset']
+        elif diffs:
+            diffs = sorted(diffs)
+            offsets[node] = diffs[len(diffs) // 2]
+
+    return offsets
+
+# End of log_get_time_offsets()
+
+
+def log_merge(logs, time_offsets=None, entry_types=None, chunk_size=LOG_MERGE_CHUNK_SIZE):
+    """Generator of the entries of the event logs of many nodes in time 
+    order as tuples of (timestamp, node, entry type, entry).
+
+    The timestamp (in us) is the timestamp of the entry plus the clock 
+    offset of the node; the entry is a NumPy structured scalar (see 
+    log_get_entry_dtype()).  Entries with equal timestamps are in the order
+    of the logs.  The entries of each log must be in time order (ie a log
+    from WlanExpNode.get_log()).
+
+    Each log is read one chunk of chunk_size entries at a time, so the 
+    memory used depends on the number of logs and the chunk size but not on
+    the size of the logs.  Log files are memory mapped and their index is 
+    read from (or saved to) their index file (see log_read_index()).
+    Entries of unknown types and entries that are too short for their type
+    are skipped.
+
+    Attributes:
+        logs -- Dictionary of node (ie serial number) to the log of the node
+                (either the name of a log file or the bytes of a log)
+        time_offsets -- Dictionary of node to the clock offset of the node 
+                        (in us; see log_get_time_offsets()); nodes without
+                        an offset are not corrected
+        entry_types -- List of entry types to merge (optional; defaults to 
+                       all known entry types)
+        chunk_size -- Number of entries of each log decoded at a time
+    """
+    _check_numpy()
+
+    if time_offsets is None:
+        time_offsets = {}
+
+    log_iters = []
+    heap      = []
+
+    try:
+        for (log_idx, (node, log)) in enumerate(logs.items()):
+            log_iter = _iter_log(log, int(round(time_offsets.get(node, 0))), entry_types, chunk_size)
+            log_iters.append(log_iter)
+            _merge_push(heap, log_iter, log_idx, node)
+
+        # The heap has one entry per log; (timestamp, log_idx) is unique
+        while heap:
+            (timestamp, log_idx, node, entry_type, entry, log_iter) = heapq.heappop(heap)
+            yield (timestamp, node, entry_type, entry)
+            _merge_push(heap, log_iter, log_idx, node)
+    finally:
+        for log_iter in log_iters:
+            log_iter.close()
+
+# End of log_merge()
+
+
+
+#-----------------------------------------------------------------------------
+# Internal helper methods
+#-----------------------------------------------------------------------------
+def _check_numpy():
+    """Internal method to raise an exception if NumPy is not installed."""
+    if np is None:
+        raise ex.WlanExpLogError("NumPy is required to decode event logs.")
+
+
+def _get_entry_fields(entry_type):
+    """Internal method to return the fields of an entry type."""
+    try:
+        return ENTRY_TYPES[entry_type][1]
+    except KeyError:
+        raise ex.WlanExpLogError("Unknown entry type {0}".format(entry_type))
+
+
+def _find_delimiter(log_data, start):
+    """Internal method to return the offset of the next possible entry
+    delimiter at or after start (or the size of the log if there is none)."""
+    if hasattr(log_data, 'find'):
+        pos = log_data.find(_DELIMITER_BYTES, start + 2)
+    else:
+        pos = bytes(memoryview(log_data)[(start + 2):]).find(_DELIMITER_BYTES)
+        if (pos != -1):
+            pos += start + 2
+
+    if (pos == -1):
+        return len(log_data)
+
+    return pos - 2
+
+
+def _get_entries(data, offsets, dtype):
+    """Internal method to return the structured array of the entries at the
+    given offsets of data (an array of uint8)."""
+    num_entries = len(offsets)
+
+    if (num_entries == 0):
+        return np.zeros(0, dtype=dtype)
+
+    # Equally spaced entries are a view of the data
+    strides = np.diff(offsets)
+
+    if (num_entries == 1) or ((strides[0] >= dtype.itemsize) and (strides == strides[0]).all()):
+        stride = int(strides[0]) if (num_entries > 1) else dtype.itemsize
+        return np.ndarray(shape=(num_entries,), dtype=dtype, buffer=data,
+                          offset=int(offsets[0]), strides=(stride,))
+
+    # Otherwise, gather the bytes of all entries at once
+    entries = data[offsets[:, np.newaxis] + np.arange(dtype.itemsize)]
+    return entries.view(dtype).reshape(num_entries)
+
+
+def _get_index_file_name(log_file):
+    """Internal method to return the name of the index file of a log file."""
+    return os.path.splitext(log_file)[0] + '.idx'
+
+
+def _index_log_file(log_file):
+    """Internal method to return the index of a log file."""
+    with open(log_file, 'rb') as data_file:
+        # An empty file cannot be memory mapped
+        if (os.path.getsize(log_file) == 0):
+            return np.zeros(0, dtype=_INDEX_FIELDS)
+
+        log_map = mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            return log_index(log_map)
+        finally:
+            log_map.close()
+
+
+def _merge_push(heap, log_iter, log_idx, node):
+    """Internal method to push the next entry of a log onto the heap of 
+    log_merge()."""
+    for (timestamp, entry_type, entry) in log_iter:
+        heapq.heappush(heap, (timestamp, log_idx, node, entry_type, entry, log_iter))
+        break
+
+
+def _iter_log(log, time_offset, entry_types, chunk_size):
+    """Internal generator of the (timestamp + time_offset, entry type, 
+    entry) of the entries of a log (a file name or bytes) in log order."""
+    log_file = None
+    log_map  = None
+    data     = None
+
+    try:
+        if isinstance(log, str):
+            log_file = open(log, 'rb')
+
+            # An empty file cannot be memory mapped
+            if (os.path.getsize(log) == 0):
+                return
+
+            log_map  = mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ)
+            log_data = log_map
+            index    = log_read_index(log)
+        else:
+            log_data = log
+            index    = log_index(log)
+
+        if entry_types is None:
+            types = list(ENTRY_TYPES.keys())
+        else:
+            types = [int(entry_type) for entry_type in entry_types if int(entry_type) in ENTRY_TYPES]
+
+        sizes = dict([(entry_type, log_get_entry_dtype(entry_type).itemsize) for entry_type in types])
+        data  = np.frombuffer(log_data, dtype=np.uint8)
+
+        for start in range(0, len(index), chunk_size):
+            chunk   = np.array(index[start:(start + chunk_size)])
+            offsets = chunk['offset'].astype(np.intp)
+            lengths = data[offsets + 6].astype(np.intp) | (data[offsets + 7].astype(np.intp) << 8)
+
+            # Keep the entries of the requested types that are long enough
+            keep = np.zeros(len(chunk), dtype=bool)
+
+            for (entry_type, size) in sizes.items():
+                keep |= (chunk['entry_type'] == entry_type) & ((lengths + ENTRY_HEADER_SIZE) >= size)
+
+            chunk = chunk[keep]
+
+            # Copy the entries so that they do not refer to the memory map
+            entries = log_get_entries(log_data, chunk)
+            entries = dict([(entry_type, entries[entry_type].copy()) for entry_type in entries])
+            counts  = dict.fromkeys(entries, 0)
+
+            for (entry_type, timestamp) in zip(chunk['entry_type'].tolist(), chunk['timestamp'].tolist()):
+                yield (timestamp + time_offset, entry_type, entries[entry_type][counts[entry_type]])
+                counts[entry_type] += 1
+    finally:
+        # Release the view of the memory map before it is closed
+        data = None
+
+        if log_map is not None:
+            log_map.close()
+
+        if log_file is not None:
+            log_file.close()
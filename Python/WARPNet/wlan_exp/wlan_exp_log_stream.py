@@ -0,0 +1,433 @@
+# -*- coding: utf-8 -*-
+"""
+------------------------------------------------------------------------------
+WLAN Experiment Log Stream Receiver
+------------------------------------------------------------------------------
+Authors:   Chris Hunter (chunter [at] mangocomm.com)
+           Patrick Murphy (murphpo [at] mangocomm.com)
+           Erik Welsh (welsh [at] mangocomm.com)
+License:   Copyright 2014, Mango Communications. All rights reserved.
+           Distributed under the WARP license (http://warpproject.org/license)
+------------------------------------------------------------------------------
+MODIFICATION HISTORY:
+
+Ver   Who  Date     Changes
+----- ---- -------- -----------------------------------------------------
+1.00a ejw  10/17/26 Initial release
+
+------------------------------------------------------------------------------
+
+This module provides a receiver for the log entries that nodes stream to the
+host (see WlanExpNode.stream_log_entries()).
+
+Each stream packet has a WARPNet transport header (src_id = node ID,
+sequence number incremented per packet) followed by log entries.  The
+receiver listens on one port for all nodes, tracks the sequence numbers of
+each node to count lost and out of order packets, and writes the log
+entries of each node to rotating segment files:
+
+    <directory>/<prefix>_node<node ID>_<segment>.bin
+
+The segment files of a node concatenate to the streamed part of its log
+(ie the same format as WlanExpNode.get_log()).
+
+    receiver = wlan_exp_log_stream.WlanExpLogStreamReceiver(9999, 'logs')
+    receiver.start()
+
+    for node in nodes:
+        node.stream_log_entries(9999)
+    ...
+    receiver.stop()
+    print(receiver)
+
+Memory is bounded:  one thread receives the packets (in batches) into a
+queue of at most max_queued_bytes and a second thread writes the queue to
+the segment files.  Packets that arrive while the queue is full are dropped
+(and counted).  Disk use can be bounded with max_segments per node.
+
+Functions (see below for more information):
+    WlanExpLogStreamNode() -- Stream statistics and segment files of a node
+    WlanExpLogStreamReceiver() -- Log stream receiver for many nodes
+
+Integer constants:
+    WLAN_EXP_STREAM_SEGMENT_SIZE -- Default size of a segment file (in bytes)
+    WLAN_EXP_STREAM_MAX_QUEUED -- Default maximum bytes queued for writing
+
+"""
+
+import os
+import time
+import errno
+import select
+import socket
+import struct
+import threading
+import collections
+
+import warpnet.wn_recvmmsg as wn_recvmmsg
+
+
+__all__ = ['WlanExpLogStreamNode', 'WlanExpLogStreamReceiver']
+
+
+WLAN_EXP_STREAM_SEGMENT_SIZE = 2**26
+WLAN_EXP_STREAM_MAX_QUEUED   = 2**24
+
+# Requested size of the OS receive buffer
+WLAN_EXP_STREAM_RX_BUF_SIZE  = 2**23
+
+_TRANSPORT_HDR_STRUCT        = struct.Struct('!2H 2B 3H')
+_HDR_LEN                     = 2 + _TRANSPORT_HDR_STRUCT.size
+_MAX_PKT_LEN                 = 2**16
+_SEQ_NUM_MOD                 = 0xFFFF
+
+
+class WlanExpLogStreamNode(object):
+    """Class for the stream statistics and segment files of one node.
+
+    Attributes:
+        node_id -- Node ID (src_id of the stream packets)
+        num_pkts -- Number of packets received
+        num_bytes -- Number of log entry bytes received (and queued for 
+                     writing)
+        num_lost -- Number of packets lost (gaps in the sequence numbers)
+        num_out_of_order -- Number of packets received late or duplicated
+        num_dropped -- Number of packets dropped because the queue was full
+        last_seq_num -- Sequence number of the last packet in order
+        first_time -- Time of the first packet
+        last_time -- Time of the last packet
+        segments -- List of the segment files of the node (oldest first)
+        num_segments -- Number of segment files started (including deleted
+                        segment files)
+    """
+    node_id          = None
+    num_pkts         = None
+    num_bytes        = None
+    num_lost         = None
+    num_out_of_order = None
+    num_dropped      = None
+    last_seq_num     = None
+    first_time       = None
+    last_time        = None
+    segments         = None
+    num_segments     = None
+
+    def __init__(self, node_id):
+        self.node_id          = node_id
+        self.num_pkts         = 0
+        self.num_bytes        = 0
+        self.num_lost         = 0
+        self.num_out_of_order = 0
+        self.num_dropped      = 0
+        self.first_time       = time.time()
+        self.last_time        = self.first_time
+        self.segments         = []
+        self.num_segments     = 0
+
+        self._file            = None
+        self._file_bytes      = 0
+
+    def update_seq_num(self, seq_num):
+        """Update the loss statistics with the sequence number of a packet.
+        Returns True if the packet is in order (ie after any lost packets).
+        """
+        if self.last_seq_num is None:
+            self.last_seq_num = seq_num
+            return True
+
+        gap = (seq_num - self.last_seq_num - 1) % _SEQ_NUM_MOD
+
+        if (gap < (_SEQ_NUM_MOD // 2)):
+            self.num_lost    += gap
+            self.last_seq_num = seq_num
+            return True
+        else:
+            self.num_out_of_order += 1
+            return False
+
+    def get_stats(self):
+        """Return the stream statistics as a dictionary."""
+        return {'node_id'          : self.node_id,
+                'num_pkts'         : self.num_pkts,
+                'num_bytes'        : self.num_bytes,
+                'num_lost'         : self.num_lost,
+                'num_out_of_order' : self.num_out_of_order,
+                'num_dropped'      : self.num_dropped,
+                'first_time'       : self.first_time,
+                'last_time'        : self.last_time,
+                'segments'         : list(self.segments),
+                'num_segments'     : self.num_segments}
+
+    def __str__(self):
+        return str("Node {0:5d}:  {1} pkts, {2} bytes, ".format(self.node_id, self.num_pkts,
+                                                               self.num_bytes) +
+                   "{0} lost, {1} out of order, {2} dropped, ".format(self.num_lost,
+                                                                      self.num_out_of_order,
+                                                                      self.num_dropped) +
+                   "{0} segments".format(self.num_segments))
+
+# End Class WlanExpLogStreamNode
+
+
+
+class WlanExpLogStreamReceiver(object):
+    """Class for a receiver of the log entry streams of many nodes.
+
+    Attributes:
+        port -- Port to receive the streams on
+        ip_address -- IP address to receive the streams on ('' for all)
+        directory -- Directory of the segment files
+        prefix -- Prefix of the segment file names
+        segment_size -- Size (in bytes) at which a new segment file is started
+        max_segments -- Maximum number of segment files kept per node (the
+                        oldest are deleted); None keeps all segment files
+        max_queued_bytes -- Maximum number of bytes queued for writing
+        nodes -- Dictionary of node ID to WlanExpLogStreamNode (updated by 
+                 the receive thread; see get_stats())
+        num_dropped -- Number of packets dropped because the queue was full
+        num_invalid -- Number of packets that were not stream packets
+    """
+    port             = None
+    ip_address       = None
+    directory        = None
+    prefix           = None
+    segment_size     = None
+    max_segments     = None
+    max_queued_bytes = None
+    nodes            = None
+    num_dropped      = None
+    num_invalid      = None
+
+    def __init__(self, port, directory='.', ip_address='', prefix='log_stream',
+                 segment_size=WLAN_EXP_STREAM_SEGMENT_SIZE, max_segments=None,
+                 max_queued_bytes=WLAN_EXP_STREAM_MAX_QUEUED):
+        self.port             = port
+        self.ip_address       = ip_address
+        self.directory        = directory
+        self.prefix           = prefix
+        self.segment_size     = segment_size
+        self.max_segments     = max_segments
+        self.max_queued_bytes = max_queued_bytes
+        self.nodes            = {}
+        self.num_dropped      = 0
+        self.num_invalid      = 0
+
+        self._sock            = None
+        self._running         = False
+        self._threads         = []
+        self._queue           = collections.deque()
+        self._queued_bytes    = 0
+        self._queue_cond      = threading.Condition()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+    def start(self):
+        """Open the socket and start the receive and write threads."""
+        if self._running:
+            return
+
+        try:
+            os.makedirs(self.directory)
+        except OSError as err:
+            if (err.errno != errno.EEXIST):
+                raise
+
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+        try:
+            self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, WLAN_EXP_STREAM_RX_BUF_SIZE)
+        except socket.error as serr:
+            # On some HW we cannot set the buffer size
+            if serr.errno != errno.ENOBUFS:
+                raise serr
+
+        self._sock.bind((self.ip_address, self.port))
+
+        self._running = True
+        self._threads = [threading.Thread(target=self._rx_thread),
+                         threading.Thread(target=self._write_thread)]
+
+        for thread in self._threads:
+            thread.daemon = True
+            thread.start()
+
+
+    def stop(self):
+        """Stop the threads (after all queued entries are written), close
+        the segment files and the socket."""
+        self._running = False
+
+        with self._queue_cond:
+            self._queue_cond.notify_all()
+
+        for thread in self._threads:
+            thread.join()
+
+        self._threads = []
+
+        for node in self.nodes.values():
+            self._close_segment(node)
+
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+    def get_stats(self):
+        """Return a list of the stream statistics of each node.
+
+        The statistics are read with the queue lock held, so they are 
+        consistent while the receive thread is running.
+        """
+        with self._queue_cond:
+            return [self.nodes[node_id].get_stats() for node_id in sorted(self.nodes.keys())]
+
+
+    def get_segments(self, node_id):
+        """Return the list of segment files of a node (oldest first)."""
+        with self._queue_cond:
+            if node_id in self.nodes:
+                return list(self.nodes[node_id].segments)
+        return []
+
+
+    def __str__(self):
+        with self._queue_cond:
+            msg = "Log stream receiver on port {0}:  ".format(self.port)
+            msg += "{0} dropped, {1} invalid\n".format(self.num_dropped, self.num_invalid)
+            for node_id in sorted(self.nodes.keys()):
+                msg += "    {0}\n".format(self.nodes[node_id])
+        return msg
+
+
+    #-------------------------------------------------------------------------
+    # Internal helper methods
+    #-------------------------------------------------------------------------
+    def _rx_thread(self):
+        """Internal method to receive the stream packets of all nodes."""
+        batch = wn_recvmmsg.WnRecvBatch(_MAX_PKT_LEN)
+
+        while self._running:
+            try:
+                (readable, _, _) = select.select([self._sock], [], [], 0.1)
+            except (select.error, ValueError):
+                continue
+
+            if not readable:
+                continue
+
+            for pkt in batch.recv(self._sock):
+                self._process_packet(pkt)
+
+
+    def _process_packet(self, pkt):
+        """Internal method to process one stream packet."""
+        if (len(pkt) < _HDR_LEN):
+            self.num_invalid += 1
+            return
+
+        (_, src_id, _, _, length, seq_num, _) = _TRANSPORT_HDR_STRUCT.unpack_from(pkt, 2)
+
+        entries = pkt[_HDR_LEN:(_HDR_LEN + length)].tobytes()
+
+        # The nodes are only updated with the queue lock held (see get_stats())
+        with self._queue_cond:
+            node = self.nodes.get(src_id)
+
+            if node is None:
+                node = WlanExpLogStreamNode(src_id)
+                self.nodes[src_id] = node
+
+            node.num_pkts += 1
+            node.last_time = time.time()
+
+            # Entries of late packets are still written (out of order)
+            node.update_seq_num(seq_num)
+
+            if ((self._queued_bytes + len(entries)) > self.max_queued_bytes):
+                self.num_dropped += 1
+                node.num_dropped += 1
+                return
+
+            node.num_bytes += len(entries)
+
+            self._queue.append((node, entries))
+            self._queued_bytes += len(entries)
+            self._queue_cond.notify()
+
+
+    def _write_thread(self):
+        """Internal method to write the queued entries to the segment files."""
+        while True:
+            with self._queue_cond:
+                while not self._queue and self._running:
+                    self._queue_cond.wait(0.1)
+
+                if not self._queue:
+                    break
+
+                batch = list(self._queue)
+                self._queue.clear()
+                self._queued_bytes = 0
+
+            for (node, entries) in batch:
+                self._write_entries(node, entries)
+
+
+    def _write_entries(self, node, entries):
+        """Internal method to write the entries of a node to its current
+        segment file (starting a new segment file if necessary)."""
+        if (node._file is None) or (node._file_bytes >= self.segment_size):
+            self._close_segment(node)
+            self._open_segment(node)
+
+        try:
+            node._file.write(entries)
+            node._file_bytes += len(entries)
+        except IOError as err:
+            print("Error writing log stream: {0}".format(err))
+
+
+    def _open_segment(self, node):
+        """Internal method to start a new segment file of a node."""
+        filename = os.path.join(self.directory,
+                                "{0}_node{1:05d}_{2:06d}.bin".format(self.prefix, node.node_id,
+                                                                    node.num_segments))
+        node._file = open(filename, 'wb')
+        node._file_bytes = 0
+
+        with self._queue_cond:
+            node.segments.append(filename)
+            node.num_segments += 1
+
+            # Delete the oldest segment files of the node
+            if self.max_segments is not None:
+                num_removed = max(0, len(node.segments) - self.max_segments)
+            else:
+                num_removed = 0
+
+            removed = node.segments[:num_removed]
+            del node.segments[:num_removed]
+
+        for old_filename in removed:
+            try:
+                os.remove(old_filename)
+            except OSError as err:
+                print("Error deleting log stream segment: {0}".format(err))
+
+
+    def _close_segment(self, node):
+        """Internal method to close the current segment file of a node."""
+        if node._file is not None:
+            node._file.close()
+            node._file = None
+
+
+# End Class WlanExpLogStreamReceiver
@@ -32,6 +32,7 @@ pleasemake sure that the values of these hardware parameters are not reused.
 
 """
 
+import mmap
 
 import warpnet.wn_node as wn_node
 import warpnet.wn_message as wn_message
@@ -41,6 +42,7 @@ import warpnet.wn_exception as ex
 from . import wlan_exp_defaults
 from . import wlan_exp_cmds
 from . import wlan_exp_config
+from . import wlan_exp_log
 from . import wlan_exp_util
 
 
@@ -83,6 +85,9 @@ class WlanExpNode(wn_node.WnNode):
         max_associations -- Maximum associations of the node
         event_log_size -- Size of event log (in bytes)
         event_log -- Event log object
+        log_cursor -- Index (in bytes) of the next byte of the event log to
+                      get with get_log_tail() (None starts at the oldest
+                      event in the log)
 
         wlan_exp_ver_major -- WLAN Exp version running on this node
         wlan_exp_ver_minor
@@ -92,6 +97,7 @@ class WlanExpNode(wn_node.WnNode):
     max_statistics        = None
     event_log_size        = None
     event_log             = None
+    log_cursor            = None
 
     wlan_exp_ver_major    = None
     wlan_exp_ver_minor    = None
@@ -108,42 +114,178 @@ class WlanExpNode(wn_node.WnNode):
         self.max_associations = 0
         self.max_statistics = 0
         self.event_log = None
+        self.log_cursor = None
 
 
-    def configure_node(self, jumbo_frame_support=False):
+    def configure_node(self, jumbo_frame_support=False, node_cache=None):
         """Get remaining information from the node and set remaining parameters."""
         # Call WarpNetNode apply_configuration method
-        super(WlanExpNode, self).configure_node(jumbo_frame_support)
+        super(WlanExpNode, self).configure_node(jumbo_frame_support, node_cache)
         
         # Set description
         self.description = str("WLAN EXP " + self.description)
 
 
+    def get_descriptor(self):
+        """Return a dictionary of the information that configure_node() gets
+        from the node (see WnNodeCache)."""
+        descriptor = super(WlanExpNode, self).get_descriptor()
+        descriptor['event_log_size']   = self.event_log_size
+        descriptor['max_associations'] = self.max_associations
+        descriptor['max_statistics']   = self.max_statistics
+        return descriptor
+
+
     #-------------------------------------------------------------------------
     # WLAN Exp Commands for the Node
     #-------------------------------------------------------------------------
-    def get_log(self, file_name=None):
+    def get_log(self, file_name=None, write_index=False):
         """Get the entire log file as a WnBuffer.  
         
-        Optionally, save the contents to the provided file name."""
+        Optionally, save the contents to the provided file name and, if 
+        write_index is True, write the index file of the log next to it
+        (see wlan_exp_log.log_read_index())."""
         resp  = None
         start = self.get_log_start()
         end   = self.get_log_end()
         
+        for (range_start, range_end) in self._get_log_ranges(start, end):
+            temp = self.get_log_events((range_end - range_start), range_start)
+            if resp is None:
+                resp = temp
+            else:
+                resp.append(temp)
+
+        if not file_name is None:
+            self._write_log_file(resp, file_name, write_index)
+
+        return resp
+
+    def get_log_to_file(self, file_name, write_index=False):
+        """Get the entire log directly into the provided file.  Returns the
+        number of bytes written.
+        
+        The file is created with the size of the log and memory mapped, and
+        the data of each response is written directly into the file at its
+        offset.  Unlike get_log(), the host memory used does not depend on
+        the size of the log and a wrapped log is not copied to be put in 
+        order.
+        
+        If write_index is True, the index file of the log is written next
+        to the file (see wlan_exp_log.log_read_index()).
+        """
+        start = self.get_log_start()
+        end   = self.get_log_end()
+        
         if (start < end):
-            resp = self.get_log_events((end - start), start)
+            ranges = [(start, end)]
         else:
-            resp = self.get_log_events((self.event_log_size - start), start)
-            temp = self.get_log_events(start, 0)
-            resp.append(temp)
+            ranges = [(start, self.event_log_size), (0, end)]
 
-        if not file_name is None:
-            file_byte_array = resp.get_bytes()
-            try:
-                with open(file_name, 'wb') as data_file:
-                    data_file.write(file_byte_array)
-            except IOError as err:
-                print("Error writing config file: {0}".format(err))
+        size = sum([(range_end - range_start) for (range_start, range_end) in ranges])
+
+        with open(file_name, 'w+b') as data_file:
+            data_file.truncate(size)
+
+            # An empty file cannot be memory mapped
+            if (size > 0):
+                log_map = mmap.mmap(data_file.fileno(), size)
+
+                try:
+                    offset = 0
+
+                    for (range_start, range_end) in ranges:
+                        range_size = range_end - range_start
+
+                        if (range_size > 0):
+                            storage = memoryview(log_map)[offset:(offset + range_size)]
+                            try:
+                                self.send_cmd_chunked(self._get_log_events_cmd(range_size, range_start),
+                                                      storage=storage)
+                            finally:
+                                # The mmap cannot be closed while a view exists
+                                storage.release()
+
+                        offset += range_size
+
+                    log_map.flush()
+                finally:
+                    log_map.close()
+
+        if write_index:
+            wlan_exp_log.log_write_index(file_name)
+
+        return size
+
+    def get_log_tail(self, file_name=None):
+        """Get the bytes of the log since the last call as a WnBuffer (or 
+        None if there are no new bytes) and advance log_cursor.
+        
+        The first call (ie log_cursor is None) gets the entire log.  If the
+        log wrapped since the last call, the bytes from log_cursor to the 
+        end of the log buffer and the bytes from the start of the log buffer
+        are returned in order.  If the log was reset (see reset_log()), the
+        bytes from the start of the log are returned.
+        
+        An empty log cannot be told apart from a full log that wrapped to 
+        exactly the oldest entry (the start and end of the log are equal),
+        so the first call returns None in that case.
+        
+        Optionally, append the contents to the provided file name.  The 
+        log_cursor is only advanced once the contents are appended, so if 
+        the file cannot be written, the IOError is raised and the next call
+        gets the same bytes again.
+        
+        NOTE:  If more than event_log_size bytes were written to a wrapping
+        log since the last call, the overwritten entries are lost.  Call 
+        get_log_tail() often enough that this does not happen.  Use 
+        WlanExpLogCursors to keep log_cursor across restarts of the script.
+        """
+        start  = self.get_log_start()
+        end    = self.get_log_end()
+        cursor = self.log_cursor
+        ranges = []
+
+        if (start < end):
+            # Log has not wrapped; a cursor outside of the log means that 
+            #   the log was reset
+            if (cursor is None) or (cursor < start) or (cursor > end):
+                cursor = start
+            ranges.append((cursor, end))
+        elif (start == end) and (cursor is None):
+            # Log is empty (or exactly full):  nothing to get
+            pass
+        else:
+            # Log has wrapped; a cursor between the end and the start of the
+            #   log points to entries that have been overwritten
+            if (cursor is not None) and (end < cursor < start):
+                print("WARNING:  Node {0}: log entries between".format(self.node_id),
+                      "{0} and {1} were overwritten.".format(cursor, start))
+                cursor = None
+
+            if (cursor is not None) and (cursor <= end):
+                ranges.append((cursor, end))
+            else:
+                if (cursor is None):
+                    cursor = start
+                ranges.append((cursor, self.event_log_size))
+                ranges.append((0, end))
+
+        resp = None
+
+        for (range_start, range_end) in ranges:
+            if (range_end > range_start):
+                temp = self.get_log_events((range_end - range_start), range_start)
+                if resp is None:
+                    resp = temp
+                else:
+                    resp.append(temp)
+
+        if (resp is not None) and (file_name is not None):
+            with open(file_name, 'ab') as data_file:
+                data_file.write(resp.get_bytes())
+
+        self.log_cursor = end
 
         return resp
 
@@ -160,16 +302,20 @@ class WlanExpNode(wn_node.WnNode):
         
         NOTE:  Log reads are not destructive.  Log entries will only be
         destroyed by a log reset or if the log wraps.
+        
+        NOTE:  Large reads are split into chunks with several chunks 
+        requested at a time (see WnNode.send_cmd_chunked()).
         """
-        return self.send_cmd(wlan_exp_cmds.WlanExpCmdLogGetEvents(size, start_byte))
+        return self.send_cmd_chunked(self._get_log_events_cmd(size, start_byte))
 
     def reset_log(self):
         """Reset the event log on the node."""
-        self.send_cmd(wlan_exp_cmds.WlanExpCmdResetLog())
+        self.send_cmd(self._reset_log_cmd())
+        self.log_cursor = 0
 
     def get_log_start(self):
         """Get the index of the oldest event in the log."""
-        return self.send_cmd(wlan_exp_cmds.WlanExpCmdGetLogOldestIdx())
+        return self.send_cmd(self._get_log_start_cmd())
 
     def get_log_end(self):
         """Get the index of the end of the log.
@@ -178,7 +324,7 @@ class WlanExpNode(wn_node.WnNode):
         increment until the log is full.  If wrapping is enabled, then 
         eventually, the value of the log end will be less than log start.
         """
-        return self.send_cmd(wlan_exp_cmds.WlanExpCmdGetLogCurrIdx())
+        return self.send_cmd(self._get_log_end_cmd())
 
 
     def get_statistics(self):
@@ -190,7 +336,7 @@ class WlanExpNode(wn_node.WnNode):
     
     def write_statistics_to_log(self):
         """Write the current statistics to the log."""
-        return self.send_cmd(wlan_exp_cmds.WlanExpCmdAddStatsToLog())
+        return self.send_cmd(self._write_statistics_to_log_cmd())
     
     def write_exp_info_to_log(self, reason, message=None):
         """Write the experiment information provided to the log.
@@ -209,42 +355,36 @@ class WlanExpNode(wn_node.WnNode):
         Attributes:
             time -- Time to send to the board (either float in sec or int in us)
         """
-        self.send_cmd(wlan_exp_cmds.WlanExpCmdNodeTime(time))
+        self.send_cmd(self._set_time_cmd(time))
     
 
     def get_time(self):
         """Gets the time in microseconds from the node."""
-        return self.send_cmd(wlan_exp_cmds.WlanExpCmdNodeTime(0x0000FFFF0000FFFF))
+        return self.send_cmd(self._get_time_cmd())
 
 
     def set_channel(self, channel):
         """Sets the channel of the node and returns the channel that was set."""
-        return self.send_cmd(wlan_exp_cmds.WlanExpCmdNodeChannel(channel))
+        return self.send_cmd(self._set_channel_cmd(channel))
     
 
     def get_channel(self):
         """Gets the current channel of the node."""
-        return self.send_cmd(wlan_exp_cmds.WlanExpCmdNodeChannel(0xFFFF))
+        return self.send_cmd(self._get_channel_cmd())
         
 
     def stream_log_entries(self, port, ip_address=None, host_id=None):
         """Configure the node to stream log entries to the given port."""
-        config       = wn_config.WnConfiguration()
-
-        if (ip_address is None):
-            ip_address = config.get_param('network', 'host_address')
-            
-        if (host_id is None):
-            host_id = config.get_param('network', 'host_id')
+        (ip_address, host_id) = self._get_host_address(ip_address, host_id)
         
-        self.send_cmd(wlan_exp_cmds.WlanExpCmdStreamLogEntries(1, host_id, ip_address, port))
+        self.send_cmd(self._stream_log_entries_cmd(port, ip_address, host_id))
         print("Node {0}:".format(self.node_id),
               "Streaming Log Entries to {0} ({1})".format(ip_address, port))
 
 
     def disable_log_entries_stream(self):
         """Configure the node to disable log entries stream."""
-        self.send_cmd(wlan_exp_cmds.WlanExpCmdStreamLogEntries(0, 0, 0, 0))
+        self.send_cmd(self._disable_log_entries_stream_cmd())
         print("Node {0}:".format(self.node_id), "Disable log entry stream.")
 
 
@@ -253,13 +393,93 @@ class WlanExpNode(wn_node.WnNode):
 
         NOTE:  Defaults to demo mode deactivated.        
         """
-        self.send_cmd(wlan_exp_cmds.WlanExpCmdConfigDemo(flags, sleep_time))
+        self.send_cmd(self._config_demo_cmd(flags, sleep_time))
         print("Node {0}:".format(self.node_id), 
               "flags = {0}".format(flags), 
               "packet wait time = {0}".format(sleep_time))
 
 
 
+    #-------------------------------------------------------------------------
+    # WLAN Exp Command Builders
+    #   Return the command sent by the method of the same name (these are 
+    #   shared with WlanExpNodeAsync)
+    #-------------------------------------------------------------------------
+    def _get_log_events_cmd(self, size, start_byte=0):
+        return wlan_exp_cmds.WlanExpCmdLogGetEvents(size, start_byte)
+
+    def _reset_log_cmd(self):
+        return wlan_exp_cmds.WlanExpCmdResetLog()
+
+    def _get_log_start_cmd(self):
+        return wlan_exp_cmds.WlanExpCmdGetLogOldestIdx()
+
+    def _get_log_end_cmd(self):
+        return wlan_exp_cmds.WlanExpCmdGetLogCurrIdx()
+
+    def _write_statistics_to_log_cmd(self):
+        return wlan_exp_cmds.WlanExpCmdAddStatsToLog()
+
+    def _set_time_cmd(self, time):
+        return wlan_exp_cmds.WlanExpCmdNodeTime(time)
+
+    def _get_time_cmd(self):
+        return wlan_exp_cmds.WlanExpCmdNodeTime(0x0000FFFF0000FFFF)
+
+    def _set_channel_cmd(self, channel):
+        return wlan_exp_cmds.WlanExpCmdNodeChannel(channel)
+
+    def _get_channel_cmd(self):
+        return wlan_exp_cmds.WlanExpCmdNodeChannel(0xFFFF)
+
+    def _stream_log_entries_cmd(self, port, ip_address=None, host_id=None):
+        (ip_address, host_id) = self._get_host_address(ip_address, host_id)
+        return wlan_exp_cmds.WlanExpCmdStreamLogEntries(1, host_id, ip_address, port)
+
+    def _disable_log_entries_stream_cmd(self):
+        return wlan_exp_cmds.WlanExpCmdStreamLogEntries(0, 0, 0, 0)
+
+    def _config_demo_cmd(self, flags=0, sleep_time=0):
+        return wlan_exp_cmds.WlanExpCmdConfigDemo(flags, sleep_time)
+
+
+    #-------------------------------------------------------------------------
+    # Internal helper methods
+    #-------------------------------------------------------------------------
+    def _get_host_address(self, ip_address=None, host_id=None):
+        """Internal method to return (ip_address, host_id) with the host 
+        address and ID of the WARPNet configuration as defaults."""
+        config = wn_config.WnConfiguration()
+
+        if (ip_address is None):
+            ip_address = config.get_param('network', 'host_address')
+            
+        if (host_id is None):
+            host_id = config.get_param('network', 'host_id')
+
+        return (ip_address, host_id)
+
+    def _get_log_ranges(self, start, end):
+        """Internal method to return the list of (start, end) byte ranges of
+        the log buffer that hold the entire log (see get_log())."""
+        if (start < end):
+            return [(start, end)]
+        else:
+            return [(start, self.event_log_size), (0, start)]
+
+    def _write_log_file(self, resp, file_name, write_index=False):
+        """Internal method to write the WnBuffer resp of a log to the file
+        (and, if write_index is True, its index file)."""
+        try:
+            with open(file_name, 'wb') as data_file:
+                data_file.write(resp.get_bytes())
+        except IOError as err:
+            print("Error writing config file: {0}".format(err))
+
+        if write_index:
+            wlan_exp_log.log_write_index(file_name)
+
+
     #-------------------------------------------------------------------------
     # WARPNet Parameter Framework
     #   Allows for processing of hardware parameters
@@ -338,17 +558,23 @@ class WlanExpNodeFactory(wn_node.WnNodeFactory):
                 self.add_node_class(wn_node_type, section[wn_node_type])
 
     
-    def create_node(self):
+    def create_node(self, raise_errors=False):
         """Based on the WARPNet Node Type, dynamically create and return 
-        the correct WARPNet node."""        
+        the correct WARPNet node.
+        
+        Attributes:
+            raise_errors -- Raise a WnTransportError (node is not responding)
+                            or WnNodeError (unknown WARPNet type) exception
+                            instead of printing the error and returning None
+        """        
         node = None
 
-        # Send broadcast command to initialize WARPNet node
-        self.setup_node_network_inf()
-
         try:
+            # Send broadcast command to initialize WARPNet node
+            self.setup_node_network_inf()
+
             # Send unicast command to get the WARPNet type
-            wn_node_type = self.get_warpnet_node_type()
+            (wn_node_type, node_info) = self.get_node_type_info()
             
             # Get the node class from the Factory dictionary
             node_class = self.get_node_class(wn_node_type)
@@ -362,12 +588,21 @@ class WlanExpNodeFactory(wn_node.WnNodeFactory):
                                             ip_address=self.transport.ip_address,
                                             unicast_port=self.transport.unicast_port,
                                             bcast_port=self.transport.bcast_port)
+                node._node_info = node_info
             else:
-                print("ERROR:  Unknown WARPNet type: {0}".format(wn_node_type))
-                print("    Unable to initialize node", 
-                      "W3-a-{0:05d}".format(self.serial_number))
+                raise ex.WnNodeError("W3-a-{0:05d}".format(self.serial_number),
+                                     "Unknown WARPNet type: {0}".format(wn_node_type))
+
+        except ex.WnNodeError as err:
+            if raise_errors:
+                raise
+            print("ERROR:  {0}".format(err.message))
+            print("    Unable to initialize node", 
+                  "W3-a-{0:05d}".format(self.serial_number))
 
         except ex.WnTransportError as err:
+            if raise_errors:
+                raise
             print(err)
             print("ERROR:  Node W3-a-{0:05d}".format(self.serial_number),
                   "is not responding.")
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+------------------------------------------------------------------------------
+WLAN Experiment Node - asyncio Interface
+------------------------------------------------------------------------------
+Authors:   Chris Hunter (chunter [at] mangocomm.com)
+           Patrick Murphy (murphpo [at] mangocomm.com)
+           Erik Welsh (welsh [at] mangocomm.com)
+License:   Copyright 2014, Mango Communications. All rights reserved.
+           Distributed under the WARP license (http://warpproject.org/license)
+------------------------------------------------------------------------------
+MODIFICATION HISTORY:
+
+Ver   Who  Date     Changes
+----- ---- -------- -----------------------------------------------------
+1.00a ejw  10/17/26 Initial release
+
+------------------------------------------------------------------------------
+
+This module provides an asyncio interface for WLAN Exp nodes (Python 3 only).
+See warpnet.wn_node_async for more information.
+
+For example, to set the channel of all nodes concurrently:
+
+    async def main(nodes):
+        async_nodes = await wlan_exp_node_async.create_nodes(nodes)
+        await asyncio.gather(*[n.set_channel(4) for n in async_nodes])
+
+Functions (see below for more information):
+    WlanExpNodeAsync() -- asyncio interface for a WLAN Exp node
+    create_nodes() -- Coroutine to create a WlanExpNodeAsync for each node
+
+"""
+
+import warpnet.wn_node_async as wn_node_async
+
+from . import wlan_exp_node
+
+
+__all__ = ['WlanExpNodeAsync', 'create_nodes']
+
+
+def _send_cmd_method(name):
+    """Return a coroutine method that sends the command built by the 
+    _<name>_cmd() method of the wrapped WlanExpNode (see WlanExpNode.<name>()).
+    """
+    builder = '_{0}_cmd'.format(name)
+
+    async def send_cmd_method(self, *args, **kwargs):
+        return await self.send_cmd(getattr(self.node, builder)(*args, **kwargs))
+
+    send_cmd_method.__name__ = name
+    send_cmd_method.__doc__  = getattr(wlan_exp_node.WlanExpNode, name).__doc__
+
+    return send_cmd_method
+
+# End of _send_cmd_method()
+
+
+
+class WlanExpNodeAsync(wn_node_async.WnNodeAsync):
+    """Class for the asyncio interface of a WLAN Experiment node.
+
+    The commands are built by the wrapped WlanExpNode (see WlanExpNode for
+    a description of each command).  Unlike WlanExpNode.get_log_events(), 
+    get_log_events() requests the buffer with a single command (see 
+    WnNodeAsync.send_cmd()).
+    """
+
+    #-------------------------------------------------------------------------
+    # WLAN Exp Commands for the Node
+    #-------------------------------------------------------------------------
+    get_log_events             = _send_cmd_method('get_log_events')
+    get_log_start              = _send_cmd_method('get_log_start')
+    get_log_end                = _send_cmd_method('get_log_end')
+    write_statistics_to_log    = _send_cmd_method('write_statistics_to_log')
+    set_time                   = _send_cmd_method('set_time')
+    get_time                   = _send_cmd_method('get_time')
+    set_channel                = _send_cmd_method('set_channel')
+    get_channel                = _send_cmd_method('get_channel')
+    stream_log_entries         = _send_cmd_method('stream_log_entries')
+    disable_log_entries_stream = _send_cmd_method('disable_log_entries_stream')
+    config_demo                = _send_cmd_method('config_demo')
+
+    async def get_log(self, file_name=None, write_index=False):
+        """Get the entire log file as a WnBuffer (see WlanExpNode.get_log())."""
+        resp  = None
+        start = await self.get_log_start()
+        end   = await self.get_log_end()
+
+        for (range_start, range_end) in self.node._get_log_ranges(start, end):
+            temp = await self.get_log_events((range_end - range_start), range_start)
+            if resp is None:
+                resp = temp
+            else:
+                resp.append(temp)
+
+        if not file_name is None:
+            self.node._write_log_file(resp, file_name, write_index)
+
+        return resp
+
+    async def reset_log(self):
+        """Reset the event log on the node."""
+        await self.send_cmd(self.node._reset_log_cmd())
+        self.node.log_cursor = 0
+
+
+# End Class WlanExpNodeAsync
+
+
+
+async def create_nodes(nodes, transport=None):
+    """Coroutine that returns a list of WlanExpNodeAsync objects (one for
+    each of the initialized WlanExpNode objects) that share one transport.
+    """
+    return await wn_node_async.create_nodes(nodes, transport, WlanExpNodeAsync)
+
+# End of create_nodes()
@@ -41,10 +41,10 @@ class WlanExpNodeSta(wlan_exp_node.WlanExpNode):
         self.node_type = self.node_type + wlan_exp_defaults.WLAN_EXP_STA
 
 
-    def configure_node(self, jumbo_frame_support=False):
+    def configure_node(self, jumbo_frame_support=False, node_cache=None):
         """Get remaining information from the node and set remaining parameters."""
         # Call WarpNetNode apply_configuration method
-        super(WlanExpNodeSta, self).configure_node(jumbo_frame_support)
+        super(WlanExpNodeSta, self).configure_node(jumbo_frame_support, node_cache)
         
         # Set description
         self.description = str("STA " + self.description)
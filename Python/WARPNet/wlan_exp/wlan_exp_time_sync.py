@@ -0,0 +1,499 @@
+# -*- coding: utf-8 -*-
+"""
+------------------------------------------------------------------------------
+WLAN Experiment Time Synchronization
+------------------------------------------------------------------------------
+Authors:   Chris Hunter (chunter [at] mangocomm.com)
+           Patrick Murphy (murphpo [at] mangocomm.com)
+           Erik Welsh (welsh [at] mangocomm.com)
+License:   Copyright 2014, Mango Communications. All rights reserved.
+           Distributed under the WARP license (http://warpproject.org/license)
+------------------------------------------------------------------------------
+MODIFICATION HISTORY:
+
+Ver   Who  Date     Changes
+----- ---- -------- -----------------------------------------------------
+1.00a ejw  10/17/26 Initial release
+
+------------------------------------------------------------------------------
+
+This module provides the synchronization of the time of WLAN Exp nodes to a
+common host timeline:
+
+    host time (in us) = time_base + (time_get_host_clock() - start_time) * 10**6
+
+The offset of a node (host time - node time) is measured NTP style.  Each
+exchange is a get time command (see WlanExpCmdNodeTime):
+
+    t0 = host time;  T = node time;  t1 = host time
+    delay  = t1 - t0
+    offset = (t0 + t1) / 2 - T
+
+The error of the offset of an exchange is at most delay / 2, so only the
+exchanges with the smallest delays are kept and the offset is the median of
+their offsets.  To synchronize a node, the host time plus half of the
+minimum delay (ie the one way delay of the set time command) is sent to the
+node (a set time command with a round trip delay of more than twice the 
+minimum delay is repeated), the offset is measured again, and the remaining
+offset is added to the next set time command until it is within the 
+tolerance (or the error of the measurement).
+
+All nodes are synchronized in parallel (one thread per node, up to
+max_workers) to the same host timeline, so the time of the last node does
+not depend on the time it took to synchronize the other nodes.  The threads
+share the Python interpreter, so more workers increase the delays of the
+exchanges; the residual offset and error returned for each node show the 
+accuracy that was reached.
+
+    results = wlan_exp_time_sync.time_sync_nodes(nodes)
+
+    for (serial_number, result) in results.items():
+        print(serial_number, result['offset'], result['max_error'])
+
+Node clocks drift apart during long experiments.  A WlanExpTimeTracker
+measures the offset of each node in a background thread every interval 
+seconds and fits a linear model of the offset of each node (offset at a
+reference time and skew) to the recent measurements.  The model corrects
+the timestamps of the log entries of the node to the host timeline.  If a
+resync threshold is given, a node whose offset exceeds the threshold is 
+synchronized again (and its model restarts).
+
+The tracker sends its commands on its own socket per node, so it does not
+interfere with the commands of the experiment:
+
+    tracker = wlan_exp_time_sync.WlanExpTimeTracker(nodes, time_base, start_time)
+    tracker.start()
+    ...
+    timestamps = tracker.correct_timestamps(node.serial_number, tx['timestamp'])
+    tracker.stop()
+
+Functions (see below for more information):
+    time_get_host_clock() -- Host clock (in sec)
+    time_measure_offset() -- Measure the offset of the time of a node
+    time_sync_nodes() -- Synchronize the time of nodes to the host
+    WlanExpTimeTracker() -- Background drift tracking of nodes
+
+Integer constants:
+    TIME_SYNC_NUM_EXCHANGES -- Default number of exchanges per measurement
+    TIME_SYNC_NUM_KEEP -- Default number of minimum delay exchanges kept
+    TIME_SYNC_MAX_ITERATIONS -- Default maximum number of set time commands
+    TIME_SYNC_TOLERANCE -- Default tolerance of the offset (in us)
+    TIME_SYNC_MAX_WORKERS -- Default number of nodes synchronized in parallel
+    TIME_TRACK_INTERVAL -- Default interval of the tracker (in sec)
+    TIME_TRACK_NUM_EXCHANGES -- Default number of exchanges per measurement
+                                of the tracker
+    TIME_TRACK_MAX_SAMPLES -- Default number of measurements per node used
+                              for the model of the tracker
+
+"""
+
+import copy
+import math
+import time
+import threading
+import collections
+
+import warpnet.wn_util as wn_util
+import warpnet.wn_stats as wn_stats
+import warpnet.wn_transport_eth_udp_py as wn_transport_eth_udp_py
+
+
+__all__ = ['time_get_host_clock', 'time_measure_offset', 'time_sync_nodes',
+           'WlanExpTimeTracker']
+
+
+TIME_SYNC_NUM_EXCHANGES      = 16
+TIME_SYNC_NUM_KEEP           = 4
+TIME_SYNC_MAX_ITERATIONS     = 3
+TIME_SYNC_TOLERANCE          = 10
+TIME_SYNC_MAX_WORKERS        = 16
+
+TIME_TRACK_INTERVAL          = 10.0
+TIME_TRACK_NUM_EXCHANGES     = 8
+TIME_TRACK_MAX_SAMPLES       = 360
+
+
+def time_get_host_clock():
+    """Return the host clock (in sec).  The host clock is monotonic (if
+    supported by the version of Python) and its start is arbitrary."""
+    try:
+        return time.perf_counter()
+    except AttributeError:
+        return time.time()
+
+# End of time_get_host_clock()
+
+
+def time_measure_offset(node, host_time, num_exchanges=TIME_SYNC_NUM_EXCHANGES,
+                        num_keep=TIME_SYNC_NUM_KEEP):
+    """Measure the offset of the time of a node.
+
+    Returns a dictionary with the keys:
+        'offset' -- Host time - node time (in us)
+        'delay' -- Minimum round trip delay (in us)
+        'jitter' -- RMS deviation of the offsets of the kept exchanges from
+                    the offset (in us)
+        'max_error' -- Bound of the error of the offset (in us, ie half of
+                       the round trip delay of the kept exchanges)
+
+    Attributes:
+        node -- WlanExpNode
+        host_time -- Function that returns the host time (in us)
+        num_exchanges -- Number of get time exchanges
+        num_keep -- Number of exchanges with the smallest delays that are
+                    used for the offset
+    """
+    samples = []
+
+    for _ in range(num_exchanges):
+        t0        = host_time()
+        node_time = node.get_time()
+        t1        = host_time()
+
+        samples.append((t1 - t0, ((t0 + t1) / 2.0) - node_time))
+
+    samples.sort()
+    samples = samples[:max(1, num_keep)]
+    offsets = sorted([offset for (_, offset) in samples])
+    offset  = offsets[len(offsets) // 2]
+    jitter  = math.sqrt(sum([(x - offset) ** 2 for x in offsets]) / len(offsets))
+
+    return {'offset'    : offset,
+            'delay'     : samples[0][0],
+            'jitter'    : jitter,
+            'max_error' : samples[-1][0] / 2.0}
+
+# End of time_measure_offset()
+
+
+def time_sync_nodes(nodes, time_base=0, start_time=None,
+                    num_exchanges=TIME_SYNC_NUM_EXCHANGES, num_keep=TIME_SYNC_NUM_KEEP,
+                    max_iterations=TIME_SYNC_MAX_ITERATIONS, tolerance=TIME_SYNC_TOLERANCE,
+                    max_workers=TIME_SYNC_MAX_WORKERS):
+    """Synchronize the time of the nodes to the host timeline.
+
+    Returns a dictionary of serial number to a dictionary with the residual
+    offset of the node after synchronization (see time_measure_offset())
+    and the keys:
+        'start_time' -- Host clock (in sec) at time_base
+        'time_base' -- Host time (in sec) at start_time
+        'num_iterations' -- Number of set time commands
+        'error' -- Exception that caused the failure (or None; only the
+                   start_time and time_base are present for a failed node)
+
+    Attributes:
+        nodes -- List of WlanExpNode objects
+        time_base -- Host time (in sec) at start_time
+        start_time -- Host clock (in sec, see time_get_host_clock()) of the
+                      time base (optional; defaults to now)
+        num_exchanges -- Number of exchanges per measurement
+        num_keep -- Number of minimum delay exchanges kept per measurement
+        max_iterations -- Maximum number of set time commands per node
+        tolerance -- Tolerance of the residual offset (in us)
+        max_workers -- Maximum number of nodes synchronized in parallel
+    """
+    if start_time is None:
+        start_time = time_get_host_clock()
+
+    host_time = _get_host_time_function(time_base, start_time)
+    outputs   = wn_util.wn_map_parallel(lambda node: _sync_node(node, host_time, num_exchanges,
+                                                             num_keep, max_iterations, tolerance),
+                                        nodes, max_workers)
+    results   = {}
+
+    for (node, (result, error)) in zip(nodes, outputs):
+        if result is None:
+            result = {}
+
+        result['error']      = error
+        result['start_time'] = start_time
+        result['time_base']  = time_base
+
+        results[node.serial_number] = result
+
+    return results
+
+# End of time_sync_nodes()
+
+
+
+class WlanExpTimeTracker(object):
+    """Class to track the offset and skew of the time of nodes in a 
+    background thread.
+
+    The model of a node is a dictionary with the keys:
+        'offset' -- Host time - node time (in us) at ref_time
+        'skew' -- Change of the offset per host time (in us per us; the 
+                  node clock is slow by skew * 10**6 ppm)
+        'ref_time' -- Host time (in us) of the offset
+        'residual' -- RMS difference of the measurements from the model
+                      (in us)
+        'num_samples' -- Number of measurements of the model
+        'num_resyncs' -- Number of times the node was synchronized again
+
+    Attributes:
+        nodes -- List of WlanExpNode objects
+        time_base -- Host time (in sec) at start_time (see time_sync_nodes())
+        start_time -- Host clock (in sec) of the time base (optional; 
+                      defaults to now)
+        interval -- Time between the measurements of a node (in sec)
+        num_exchanges -- Number of exchanges per measurement
+        num_keep -- Number of minimum delay exchanges kept per measurement
+        max_samples -- Number of measurements per node used for the model
+        resync_threshold -- Offset (in us) above which a node is 
+                            synchronized again (optional; by default nodes
+                            are not synchronized again)
+        errors -- Dictionary of serial number to the last exception of the
+                  measurements of the node (or None)
+    """
+    nodes            = None
+    time_base        = None
+    start_time       = None
+    interval         = None
+    num_exchanges    = None
+    num_keep         = None
+    max_samples      = None
+    resync_threshold = None
+    errors           = None
+
+    def __init__(self, nodes, time_base=0, start_time=None, interval=TIME_TRACK_INTERVAL,
+                 num_exchanges=TIME_TRACK_NUM_EXCHANGES, num_keep=TIME_SYNC_NUM_KEEP,
+                 max_samples=TIME_TRACK_MAX_SAMPLES, resync_threshold=None):
+        if start_time is None:
+            start_time = time_get_host_clock()
+
+        self.nodes            = nodes
+        self.time_base        = time_base
+        self.start_time       = start_time
+        self.interval         = interval
+        self.num_exchanges    = num_exchanges
+        self.num_keep         = num_keep
+        self.max_samples      = max_samples
+        self.resync_threshold = resync_threshold
+        self.errors           = dict([(node.serial_number, None) for node in nodes])
+
+        self._host_time   = _get_host_time_function(time_base, start_time)
+        self._lock        = threading.Lock()
+        self._stop_event  = threading.Event()
+        self._thread      = None
+        self._probes      = {}
+        self._samples     = dict([(node.serial_number, collections.deque(maxlen=max_samples))
+                                  for node in nodes])
+        self._models      = dict([(node.serial_number, None) for node in nodes])
+        self._num_resyncs = dict([(node.serial_number, 0) for node in nodes])
+
+    def start(self):
+        """Start the tracker thread."""
+        if self._thread is None:
+            for node in self.nodes:
+                if node.serial_number not in self._probes:
+                    self._probes[node.serial_number] = _create_probe_node(node)
+
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._track_thread)
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        """Stop the tracker thread and close its sockets."""
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+
+        for probe in self._probes.values():
+            probe.transport.wn_close()
+
+        self._probes = {}
+
+    def update(self):
+        """Measure the offset of each node once and update the models."""
+        for node in self.nodes:
+            serial_number = node.serial_number
+
+            try:
+                probe = self._probes.get(serial_number, node)
+                self._update_node(probe, serial_number)
+                self.errors[serial_number] = None
+            except Exception as err:
+                # Record any error so that the other nodes are still tracked
+                self.errors[serial_number] = err
+
+    def get_model(self, serial_number):
+        """Return the model of a node (or None if the node has not been
+        measured yet)."""
+        with self._lock:
+            model = self._models[serial_number]
+
+        if model is not None:
+            model = dict(model)
+
+        return model
+
+    def get_offset(self, serial_number, host_time=None):
+        """Return the offset (host time - node time, in us) of a node at the
+        given host time (in us; defaults to now) from the model of the node
+        (or None if the node has not been measured yet)."""
+        model = self.get_model(serial_number)
+
+        if model is None:
+            return None
+
+        if host_time is None:
+            host_time = self._host_time()
+
+        return model['offset'] + model['skew'] * (host_time - model['ref_time'])
+
+    def correct_timestamps(self, serial_number, timestamps):
+        """Return the host times (in us) of node timestamps (in us, a 
+        number or a NumPy array) from the model of the node.
+
+        NOTE:  The model of a node restarts when the node is synchronized 
+        again, so timestamps from before a resync should be corrected with
+        a model from before the resync (see get_model()).
+        """
+        model = self.get_model(serial_number)
+
+        if model is None:
+            return timestamps
+
+        # host = node + offset + skew * (host - ref_time)
+        return ((timestamps + (model['offset'] - model['skew'] * model['ref_time'])) /
+                (1.0 - model['skew']))
+
+    def __str__(self):
+        msg = "Time tracker:\n"
+        for node in self.nodes:
+            model = self.get_model(node.serial_number)
+            if model is None:
+                msg += "    W3-a-{0:05d}: no samples\n".format(node.serial_number)
+            else:
+                msg += "    W3-a-{0:05d}: offset {1:10.1f} us, skew {2:8.3f} ppm, ".format(
+                           node.serial_number, self.get_offset(node.serial_number),
+                           model['skew'] * (10**6))
+                msg += "residual {0:6.1f} us, {1} resyncs\n".format(model['residual'],
+                                                                     model['num_resyncs'])
+        return msg
+
+
+    #-------------------------------------------------------------------------
+    # Internal helper methods
+    #-------------------------------------------------------------------------
+    def _track_thread(self):
+        """Internal method to measure all nodes every interval."""
+        while not self._stop_event.is_set():
+            self.update()
+            self._stop_event.wait(self.interval)
+
+    def _update_node(self, probe, serial_number):
+        """Internal method to measure the offset of a node and update its
+        model."""
+        t0     = self._host_time()
+        result = time_measure_offset(probe, self._host_time, self.num_exchanges, self.num_keep)
+        t1     = self._host_time()
+
+        if ((self.resync_threshold is not None) and
+                (abs(result['offset']) > self.resync_threshold)):
+            result = _sync_node(probe, self._host_time, self.num_exchanges, self.num_keep,
+                                TIME_SYNC_MAX_ITERATIONS, TIME_SYNC_TOLERANCE)
+            t1     = self._host_time()
+
+            self._samples[serial_number].clear()
+            self._num_resyncs[serial_number] += 1
+
+        samples = self._samples[serial_number]
+        samples.append(((t0 + t1) / 2.0, result['offset']))
+
+        model = _fit_model(samples)
+        model['num_resyncs'] = self._num_resyncs[serial_number]
+
+        with self._lock:
+            self._models[serial_number] = model
+
+# End Class WlanExpTimeTracker
+
+
+
+#-----------------------------------------------------------------------------
+# Internal helper methods
+#-----------------------------------------------------------------------------
+def _sync_node(node, host_time, num_exchanges, num_keep, max_iterations, tolerance):
+    """Internal method to synchronize the time of a node and return the
+    residual offset (see time_measure_offset())."""
+    result     = time_measure_offset(node, host_time, num_exchanges, num_keep)
+    correction = 0.0
+    iteration  = 0
+
+    while (iteration < max_iterations):
+        # Repeat a set time command that took much longer than the minimum
+        #   delay, since its one way delay is unknown
+        for _ in range(num_exchanges):
+            t0 = host_time()
+            node.set_time(int(round(t0 + (result['delay'] / 2.0) + correction)))
+
+            if ((host_time() - t0) <= (2 * result['delay'])):
+                break
+
+        iteration += 1
+
+        result = time_measure_offset(node, host_time, num_exchanges, num_keep)
+
+        # A residual offset within the error of the measurement is not
+        #   corrected
+        if (abs(result['offset']) <= max(tolerance, result['max_error'])):
+            break
+
+        correction += result['offset']
+
+    result['num_iterations'] = iteration
+    return result
+
+
+def _get_host_time_function(time_base, start_time):
+    """Internal method to return a function that returns the host time (in
+    us) of the timeline of time_base (in sec) at start_time (in sec)."""
+    time_base_us = int(round(time_base * (10**6)))
+
+    def host_time():
+        return time_base_us + (time_get_host_clock() - start_time) * (10**6)
+
+    return host_time
+
+
+def _create_probe_node(node):
+    """Internal method to return a copy of a node that sends its commands on
+    its own socket (so that it can be used from another thread)."""
+    transport = wn_transport_eth_udp_py.WnTransportEthUdpPy()
+    transport.wn_open(node.transport.ip_address, node.transport.unicast_port)
+    transport.hdr.set_src_id(node.transport.hdr.src_id)
+    transport.hdr.set_dest_id(node.transport.hdr.dest_id)
+
+    probe = copy.copy(node)
+    probe.transport       = transport
+    probe.transport_bcast = None
+    probe.stats           = wn_stats.WnNodeStats()
+
+    return probe
+
+
+def _fit_model(samples):
+    """Internal method to return the least squares fit of a linear model to
+    the (host time, offset) samples."""
+    num_samples = len(samples)
+    ref_time    = sum([t for (t, _) in samples]) / num_samples
+    mean_offset = sum([x for (_, x) in samples]) / num_samples
+    var_time    = sum([(t - ref_time) ** 2 for (t, _) in samples])
+
+    if (var_time > 0):
+        skew = sum([(t - ref_time) * (x - mean_offset) for (t, x) in samples]) / var_time
+    else:
+        skew = 0.0
+
+    residual = math.sqrt(sum([(x - mean_offset - skew * (t - ref_time)) ** 2
+                              for (t, x) in samples]) / num_samples)
+
+    return {'offset'      : mean_offset,
+            'skew'        : skew,
+            'ref_time'    : ref_time,
+            'residual'    : residual,
+            'num_samples' : num_samples}
@@ -25,6 +25,7 @@ Functions (see below for more information):
     wlan_exp_init_nodes() -- Initialize nodes
     wlan_exp_init_time() -- Initialize the timebase on all nodes to be as 
                             similar as possible
+    wlan_exp_get_log_tails() -- Get the new bytes of the log of each node
     wlan_exp_setup() -- Set up wlan_exp_config.ini file
 
 Integer constants:
@@ -41,7 +42,8 @@ import inspect
 from . import wlan_exp_exception as ex
 
 
-__all__ = ['wlan_exp_ver', 'wlan_exp_ver_str', 'wlan_exp_init_nodes']
+__all__ = ['wlan_exp_ver', 'wlan_exp_ver_str', 'wlan_exp_init_nodes',
+           'wlan_exp_get_log_tails']
 
 
 # WARPNet Version defines
@@ -150,11 +152,14 @@ def wlan_exp_ver_str(major=WLAN_EXP_MAJOR, minor=WLAN_EXP_MINOR,
 # End of wn_ver_str()
 
 
-def wlan_exp_init_nodes(nodes_config):
+def wlan_exp_init_nodes(nodes_config, max_workers=1, node_cache=None):
     """Initalize WLAN Exp nodes.
 
     Attributes:
        nodes_config -- A WnNodesConfiguration describing the nodes
+       max_workers -- Number of nodes to initialize in parallel (optional)
+       node_cache -- A WnNodeCache of the node descriptors (optional, see 
+                     wn_util.wn_init_nodes())
     """
     # Create and initialize a WnNodeFactory
     from . import wlan_exp_node
@@ -162,19 +167,44 @@ def wlan_exp_init_nodes(nodes_config):
 
     # Use the WARPNet utility, wn_init_nodes, to initialize the nodes
     import warpnet.wn_util as wn_util
-    return wn_util.wn_init_nodes(nodes_config, node_factory)
+    return wn_util.wn_init_nodes(nodes_config, node_factory, max_workers=max_workers,
+                                 node_cache=node_cache)
 
 # End of wlan_exp_init_nodes()
 
 
-def wlan_exp_init_time(nodes, time_base=0, output=False, verbose=False, repeat=1):
+def wlan_exp_init_time(nodes, time_base=0, output=False, verbose=False, repeat=1, sync=False):
     """Initialize the time on all of the WLAN Exp nodes.
     
+    If sync is True, the nodes are synchronized in parallel with round trip
+    delay compensation (see wlan_exp_time_sync.time_sync_nodes()) and the 
+    dictionary of serial number to the residual offset of each node is 
+    returned.
+    
     Attributes:
         nodes -- A list of nodes on which to initialize the time.
         time_base -- optional time base 
         output -- optional output to see jitter across nodes
+        sync -- optional synchronization with delay compensation
     """
+    if sync:
+        from . import wlan_exp_time_sync
+
+        results = wlan_exp_time_sync.time_sync_nodes(nodes, time_base)
+
+        if verbose:
+            for node in nodes:
+                result = results[node.serial_number]
+                if result['error'] is None:
+                    print("Node {0}: \n".format(node.serial_number),
+                          "    Offset              = {0:8.1f}\n".format(result['offset']),
+                          "    Round Trip Delay    = {0:8.1f}\n".format(result['delay']),
+                          "    Max Error           = {0:8.1f}\n".format(result['max_error']))
+                else:
+                    print("Node {0}: {1}".format(node.serial_number, result['error']))
+
+        return results
+
     return_times       = None
     node_start_times   = []
 
@@ -212,6 +242,47 @@ def wlan_exp_init_time(nodes, time_base=0, output=False, verbose=False, repeat=1
 # End of wlan_exp_init_time()
 
 
+def wlan_exp_get_log_tails(nodes, log_cursors=None, file_name_format=None):
+    """Get the bytes of the log of each node since the last call (see 
+    WlanExpNode.get_log_tail()).  Returns a dictionary of serial number to 
+    WnBuffer (or None if there are no new bytes).
+    
+    If the new bytes of a node cannot be appended to its file, the IOError
+    is raised before the cursor of the node is saved.
+    
+    Attributes:
+        nodes -- A list of WlanExpNode objects
+        log_cursors -- A WlanExpLogCursors (optional).  Nodes without a 
+                       log_cursor start at the stored cursor and the new
+                       cursors are saved after each node.
+        file_name_format -- Format of the name of the file to append the new
+                            bytes of each node to (optional).  For example,
+                            'log_W3-a-{serial_number:05d}.bin' 
+    """
+    output = {}
+
+    for node in nodes:
+        if (log_cursors is not None) and (node.log_cursor is None):
+            node.log_cursor = log_cursors.get_cursor(node)
+
+        file_name = None
+        if file_name_format is not None:
+            file_name = file_name_format.format(serial_number=node.serial_number,
+                                                node_id=node.node_id)
+
+        output[node.serial_number] = node.get_log_tail(file_name)
+
+        # Save the cursor with the data so that a restart does not get the 
+        #   same bytes again
+        if log_cursors is not None:
+            log_cursors.set_cursor(node, node.log_cursor)
+            log_cursors.save_config()
+
+    return output
+
+# End of wlan_exp_get_log_tails()
+
+
 def wlan_exp_time():
     """WLAN Exp time function to handle differences between Python 2.7 and 3.3"""
     try:
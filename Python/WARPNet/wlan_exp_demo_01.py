@@ -19,6 +19,7 @@ import wlan_exp
 from wlan_exp import wlan_exp_util
 from wlan_exp import wlan_exp_node_ap
 from wlan_exp import wlan_exp_node_sta
+from wlan_exp import wlan_exp_log_stream
 
 
 # TOP Level script variables
@@ -27,13 +28,16 @@ IP_ADDRESS        = '10.0.0.250'
 PORT              = 9999
 HOST_ID           = 0xBEEF
 EXPERIMENT_TIME   = 10
+LOG_DIRECTORY     = 'log_stream'
 
 
 nodes = []
+receiver = None
 
 def run_experiment():
     """WLAN Experiment.""" 
     global nodes
+    global receiver
     nodes_cfg_ini       = r"nodes_config.ini"
 
     # Print initial message
@@ -46,6 +50,10 @@ def run_experiment():
     nodes = wlan_exp_util.wlan_exp_init_nodes(nodes_config)
     times = wlan_exp_util.wlan_exp_init_time(nodes);
 
+    # Receive the log entry streams of all nodes into LOG_DIRECTORY
+    receiver = wlan_exp_log_stream.WlanExpLogStreamReceiver(PORT, LOG_DIRECTORY)
+    receiver.start()
+
     # For each node:
     #   Reset the Log
     #   Set the channel
@@ -70,6 +78,10 @@ def end_experiment():
     for node in nodes:
         node.disable_log_entries_stream()
 
+    if receiver is not None:
+        receiver.stop()
+        print(receiver)
+
 
 if __name__ == '__main__':
     # Run WLAN Setup